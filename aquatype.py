@@ -0,0 +1,78 @@
+"""
+AquaType 命令行
+把请求转发给正在运行的翻译助手（毫秒级，复用已预热的连接和缓存）
+
+用法：
+    python aquatype.py translate "要翻译的中文" [--target ja]
+    echo 要翻译的中文 | python aquatype.py translate
+    python aquatype.py show          # 唤起悬浮窗
+    python aquatype.py ping          # 检查是否在运行
+
+没有运行中的实例时，translate 退回到在本进程中直接翻译（冷启动，较慢），其余命令返回 1。
+--target 不是已配置的翻译目标时返回 1。
+"""
+
+import sys
+import argparse
+
+import single_instance
+
+
+def _fallback_translate(text: str, target_name: str = None) -> str:
+    """没有运行中的实例：本进程直接翻译（同样先查预热缓存）
+
+    Raises:
+        ValueError: 未知的翻译目标
+    """
+    from translation_service import get_service
+
+    service = get_service()
+    targets = service.translator.targets
+    target = next((t for t in targets if t.name == target_name), None) if target_name else targets[0]
+    if target is None:
+        raise ValueError(f"未知翻译目标 {target_name}，可用: {', '.join(t.name for t in targets)}")
+    return service.translate(text, target, feature="cli")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="aquatype", description="翻译输入助手命令行")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    translate = sub.add_parser("translate", help="翻译文本并输出到标准输出")
+    translate.add_argument("text", nargs="?", help="要翻译的文本（省略时从标准输入读取）")
+    translate.add_argument("--target", help="翻译目标名（默认主目标）")
+    translate.add_argument("--timeout", type=float, default=60, help="等待结果的最长秒数")
+    sub.add_parser("show", help="唤起悬浮窗")
+    sub.add_parser("ping", help="检查是否在运行")
+    args = parser.parse_args()
+
+    if args.cmd == "translate":
+        text = args.text if args.text is not None else sys.stdin.read()
+        if not text.strip():
+            return 0
+        reply = single_instance.send({"cmd": "translate", "text": text, "target": args.target}, args.timeout)
+        if reply is None:
+            print("[aquatype] 没有运行中的实例，直接翻译", file=sys.stderr)
+            try:
+                print(_fallback_translate(text, args.target))
+            except Exception as e:
+                print(f"翻译失败: {e}", file=sys.stderr)
+                return 1
+            return 0
+    else:
+        reply = single_instance.send({"cmd": "activate" if args.cmd == "show" else args.cmd})
+        if reply is None:
+            print("[aquatype] 没有运行中的实例", file=sys.stderr)
+            return 1
+
+    if not reply.get("ok"):
+        print(f"失败: {reply.get('error')}", file=sys.stderr)
+        return 1
+    if args.cmd == "translate":
+        print(reply["result"])
+    elif args.cmd == "ping":
+        print(f"运行中 (PID {reply['result']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,276 @@
+"""
+热路径微基准 - 每次轮询 / 按键都会执行的纯函数，带提交到仓库的基线和回归检查
+Hot Path Micro-benchmarks
+
+用例（合成输入，多种长度）：
+- extract_chinese:  keyboard_monitor.ChineseInputCapture._extract_chinese（CHINESE_PATTERN）
+- think_strip:      Translator 返回前去掉 <think>…</think>（think_filter.THINK_PATTERN）
+- think_filter:     流式输出逐块经过 ThinkFilter
+- hotkey_match:     HotkeyManager 使用的组合键判断（hotkey_matcher.ComboMatcher）
+- hook_push:        HookEventQueue.push（在系统钩子线程里执行，越短越好）
+- normalize_key:    translation_cache.normalize_key
+- stabilizer:       InputStabilizer.observe（捕获循环每次轮询调用）
+
+计时：每个用例自动选择循环次数（单轮至少 MIN_ROUND 秒），重复 REPEATS 轮取最快一轮的单次耗时；
+超过阈值的用例会再测 RETRIES 次确认。不同机器速度不同，基线同时记录一个纯 Python 校准循环的耗时，
+比较时按校准结果换算。个别用例可在 baselines.json 的 "thresholds" 中单独设置阈值。
+缺少依赖的用例跳过并注明原因；--check 时 baselines.json 中有基线的用例被跳过也算失败，
+避免回归因为环境缺依赖而被漏掉。
+
+运行方法：
+    python benchmarks/bench_hot_paths.py              # 运行并与基线对比
+    python benchmarks/bench_hot_paths.py --check      # 有用例慢于基线超过阈值时返回 1
+    python benchmarks/bench_hot_paths.py --update     # 把本次结果写入基线（只更新跑到的用例）
+    python benchmarks/bench_hot_paths.py -k think     # 只跑名称包含 think 的用例
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+REPEATS = 15
+MIN_ROUND = 0.02
+# 默认允许比基线慢多少（比例）；微基准在共享机器上抖动不小，阈值针对的是明显变慢
+DEFAULT_THRESHOLD = 0.5
+# 超过阈值时再测几次，取最快的结果，排除偶发抖动
+RETRIES = 2
+
+COMMON_CHARS = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行"
+
+
+def _mixed_text(length, seed):
+    """中英文、标点、空白混合的文本"""
+    rng = random.Random(seed)
+    pieces = []
+    while sum(len(p) for p in pieces) < length:
+        roll = rng.random()
+        if roll < 0.5:
+            pieces.append("".join(rng.choice(COMMON_CHARS) for _ in range(rng.randint(1, 6))))
+        elif roll < 0.7:
+            pieces.append(rng.choice(("hello ", "API ", "v2.1 ", "OK", "abc")))
+        elif roll < 0.85:
+            pieces.append(rng.choice("，。！？、 \n\t"))
+        else:
+            pieces.append("  ")
+    return "".join(pieces)[:length]
+
+
+# ---- 用例 ----
+# 每个构造函数返回 {用例名: 无参函数}，导入失败时抛出 ImportError
+
+def cases_extract_chinese():
+    from keyboard_monitor import ChineseInputCapture
+    capture = ChineseInputCapture(lambda text: None)
+    cases = {}
+    for length in (16, 256, 4096):
+        text = _mixed_text(length, length)
+        cases[f"extract_chinese[{length}]"] = lambda text=text: capture._extract_chinese(text)
+    return cases
+
+
+def cases_think():
+    from think_filter import THINK_PATTERN, ThinkFilter
+    cases = {}
+    for length in (64, 2048):
+        body = _mixed_text(length, length + 1)
+        plain = body
+        thinking = "<think>" + _mixed_text(length * 2, length + 2) + "</think>\n\n" + body
+        cases[f"think_strip[plain,{length}]"] = lambda raw=plain: THINK_PATTERN.sub('', raw).strip()
+        cases[f"think_strip[think,{length}]"] = lambda raw=thinking: THINK_PATTERN.sub('', raw).strip()
+
+    raw = "<think>" + _mixed_text(600, 7) + "</think>\n" + _mixed_text(400, 8)
+    deltas = [raw[i:i + 4] for i in range(0, len(raw), 4)]
+
+    def stream():
+        visible = ThinkFilter()
+        for delta in deltas:
+            visible.feed(delta)
+        visible.flush()
+
+    cases[f"think_filter[{len(deltas)} 块]"] = stream
+    return cases
+
+
+def cases_hotkey():
+    from hotkey_matcher import ComboMatcher
+    # 键用字符串代替 pynput 的 Key / KeyCode（同样是可哈希对象，判断逻辑一致）
+    matcher = ComboMatcher(("ctrl_l", "ctrl_r"), "space")
+    typing = list("nihao shijie")
+    events = []
+    for key in typing:
+        events += [(True, key), (False, key)]
+    combo = [(True, "ctrl_l"), (True, "space"), (False, "space"), (False, "ctrl_l")]
+
+    def type_keys():
+        for pressed, key in events:
+            matcher.handle(0.0, pressed, key)
+
+    def press_combo():
+        # 时间戳不变，第一次之后都落在防抖窗口内，不会反复触发
+        for pressed, key in combo:
+            matcher.handle(0.0, pressed, key)
+
+    press_combo()
+    return {f"hotkey_match[打字 {len(events)} 事件]": type_keys, "hotkey_match[组合键]": press_combo}
+
+
+def cases_hook_push():
+    from hook_queue import HookEventQueue
+    events = HookEventQueue(lambda timestamp, *event: None, name="基准-钩子队列")
+
+    def push():
+        events.push(True, "a")
+
+    return {"hook_push": push}
+
+
+def cases_normalize_key():
+    from translation_cache import normalize_key
+    cases = {}
+    for length in (16, 256, 4096):
+        text = "  " + _mixed_text(length, length + 3) + " \n"
+        cases[f"normalize_key[{length}]"] = lambda text=text: normalize_key(text)
+    return cases
+
+
+def cases_stabilizer():
+    from input_stabilizer import InputStabilizer
+    clock = [0.0]
+    stabilizer = InputStabilizer(clock=lambda: clock[0], name="基准-输入稳定")
+    sentence = _mixed_text(40, 11).replace("。", "")
+    frames = [sentence[:i] for i in range(1, len(sentence) + 1)] + [sentence] * 10
+
+    def poll():
+        for text in frames:
+            clock[0] += 0.2
+            stabilizer.observe(text, 1)
+        stabilizer.reset()
+
+    return {f"stabilizer[{len(frames)} 次轮询]": poll}
+
+
+CASE_BUILDERS = (
+    cases_extract_chinese, cases_think, cases_hotkey, cases_hook_push, cases_normalize_key, cases_stabilizer,
+)
+
+
+# ---- 计时 ----
+
+def measure(func) -> float:
+    """单次调用耗时（纳秒），取最快一轮"""
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_ROUND:
+            break
+        loops *= 2 if elapsed == 0 else max(2, int(MIN_ROUND / elapsed * 1.2))
+    best = elapsed / loops
+    for _ in range(REPEATS - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter() - start) / loops)
+    return best * 1e9
+
+
+def calibrate() -> float:
+    """纯 Python 校准循环，用于换算不同机器上的结果"""
+    def work():
+        total = 0
+        for i in range(1000):
+            total += i * i % 7
+        return total
+    return min(measure(work) for _ in range(3))
+
+
+def _format_ns(ns: float) -> str:
+    if ns >= 1e6:
+        return f"{ns / 1e6:8.2f} ms"
+    if ns >= 1e3:
+        return f"{ns / 1e3:8.2f} µs"
+    return f"{ns:8.0f} ns"
+
+
+def load_baselines() -> dict:
+    if not os.path.exists(BASELINE_PATH):
+        return {"calibration_ns": None, "threshold": DEFAULT_THRESHOLD, "cases": {}}
+    with open(BASELINE_PATH, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="热路径微基准")
+    parser.add_argument("--check", action="store_true", help="慢于基线超过阈值时返回 1")
+    parser.add_argument("--update", action="store_true", help="把本次结果写入基线")
+    parser.add_argument("--threshold", type=float, help=f"允许变慢的比例（默认取基线文件中的值或 {DEFAULT_THRESHOLD}）")
+    parser.add_argument("-k", dest="keyword", default="", help="只运行名称包含该关键字的用例")
+    args = parser.parse_args()
+
+    baselines = load_baselines()
+    threshold = args.threshold if args.threshold is not None else baselines.get("threshold", DEFAULT_THRESHOLD)
+    calibration = calibrate()
+    scale = calibration / baselines["calibration_ns"] if baselines.get("calibration_ns") else 1.0
+    print(f"校准循环 {_format_ns(calibration)}（本机 / 基线机器 = {scale:.2f}），阈值 +{threshold:.0%}")
+
+    results = {}
+    regressions = []
+    for builder in CASE_BUILDERS:
+        try:
+            cases = builder()
+        except ImportError as e:
+            print(f"{builder.__name__[6:]:<32} 跳过：缺少依赖 {e.name}")
+            continue
+        for name, func in cases.items():
+            if args.keyword not in name:
+                continue
+            ns = measure(func)
+            results[name] = ns
+            line = f"{name:<32} {_format_ns(ns)}"
+            baseline = baselines["cases"].get(name)
+            if baseline:
+                case_threshold = baselines.get("thresholds", {}).get(name, threshold)
+                for _ in range(RETRIES):
+                    if ns <= baseline * scale * (1 + case_threshold):
+                        break
+                    ns = min(ns, measure(func))
+                results[name] = ns
+                line = f"{name:<32} {_format_ns(ns)}"
+                ratio = ns / (baseline * scale)
+                line += f"  基线 {_format_ns(baseline * scale)}  {ratio - 1:+7.1%}"
+                if ratio > 1 + case_threshold:
+                    line += "  ← 变慢"
+                    regressions.append(name)
+            else:
+                line += "  （无基线）"
+            print(line)
+
+    if args.update:
+        # 先把已有基线换算到本机，再写入本次结果，保持同一校准下可比
+        cases = {name: round(ns * scale, 1) for name, ns in baselines["cases"].items()}
+        cases.update({name: round(ns, 1) for name, ns in results.items()})
+        baselines.update(calibration_ns=round(calibration, 1), threshold=threshold, cases=dict(sorted(cases.items())))
+        with open(BASELINE_PATH, 'w', encoding='utf-8') as f:
+            json.dump(baselines, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+        print(f"已更新基线 {BASELINE_PATH}（{len(results)} 个用例）")
+
+    skipped = [name for name in baselines["cases"] if args.keyword in name and name not in results]
+    if skipped:
+        print(f"\n{len(skipped)} 个有基线的用例没有运行: {', '.join(skipped)}")
+    if regressions:
+        print(f"\n{len(regressions)} 个用例慢于基线超过 {threshold:.0%}: {', '.join(regressions)}")
+    if args.check and (regressions or skipped):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
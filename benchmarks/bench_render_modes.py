@@ -0,0 +1,109 @@
+"""
+渲染模式基准 - 唤起到可见的延迟 / 每帧绘制耗时
+Render Mode Benchmark
+
+对 quality 和 performance 两种模式分别测量：
+- activate: FloatingInputWindow.activate() 到首次绘制完成的时间（模拟热键唤起）
+- paint:    窗口同步重绘 (repaint) 一帧的耗时
+- fade:     ResultWindow 淡入动画的帧间隔（性能模式无动画）
+
+运行方法：python benchmarks/bench_render_modes.py [重复次数]
+"""
+
+import os
+import sys
+import time
+import statistics
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QObject, QEvent
+
+from ui import render_mode
+from ui.floating_input import FloatingInputWindow
+from ui.result_window import ResultWindow
+
+
+class PaintProbe(QObject):
+    """记录窗口收到 Paint 事件的时间"""
+
+    def __init__(self):
+        super().__init__()
+        self.painted_at = None
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and self.painted_at is None:
+            self.painted_at = time.perf_counter()
+        return False
+
+
+def _summary(samples_ms):
+    samples_ms = sorted(samples_ms)
+    p95 = samples_ms[min(len(samples_ms) - 1, int(len(samples_ms) * 0.95))]
+    return f"median {statistics.median(samples_ms):7.2f} ms | p95 {p95:7.2f} ms"
+
+
+def bench_activate(app, repeat):
+    samples = []
+    for _ in range(repeat):
+        window = FloatingInputWindow()
+        probe = PaintProbe()
+        window.installEventFilter(probe)
+        start = time.perf_counter()
+        window.activate()
+        while probe.painted_at is None and time.perf_counter() - start < 2:
+            app.processEvents()
+        samples.append(((probe.painted_at or time.perf_counter()) - start) * 1000)
+        window.hide()
+        window.deleteLater()
+        app.processEvents()
+    return samples
+
+
+def bench_paint(app, repeat):
+    window = FloatingInputWindow()
+    window.activate()
+    window.show_translation("Let's meet at three this afternoon to discuss the release plan.")
+    app.processEvents()
+    samples = []
+    for _ in range(repeat * 10):
+        start = time.perf_counter()
+        window.repaint()
+        samples.append((time.perf_counter() - start) * 1000)
+    window.hide()
+    return samples
+
+
+def bench_fade(app):
+    manager = render_mode.render_manager()
+    manager.frame_times.clear()
+    window = ResultWindow()
+    window.show_translation("今天下午三点开会", "Let's meet at three this afternoon.")
+    start = time.perf_counter()
+    while time.perf_counter() - start < 0.5:
+        app.processEvents()
+    window.auto_hide_timer.stop()
+    window.hide()
+    return list(manager.frame_times)
+
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    app = QApplication(sys.argv)
+
+    for mode in (render_mode.QUALITY, render_mode.PERFORMANCE):
+        render_mode.configure(mode)
+        print(f"== {mode} ==")
+        print(f"activate → 可见: {_summary(bench_activate(app, repeat))}")
+        print(f"paint / 帧     : {_summary(bench_paint(app, repeat))}")
+        frames = bench_fade(app)
+        if frames:
+            print(f"淡入帧间隔     : {_summary(frames)}")
+        else:
+            print("淡入帧间隔     : (无动画)")
+
+
+if __name__ == "__main__":
+    main()
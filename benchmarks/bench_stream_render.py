@@ -0,0 +1,115 @@
+"""
+流式渲染基准 - 快速流式输出时 GUI 线程每秒占用的 CPU 时间
+Stream Render Benchmark
+
+工作线程以固定速率产生 delta（模拟流式译文），对比：
+- naive:     每个 delta 通过信号回到 GUI 线程，对自动换行的 QLabel setText 全文 / QTextEdit setPlainText 全文
+- coalesced: StreamRenderer 按帧率合并（QLabel 每帧 setText 一次，QTextEdit 用 QTextCursor 追加）
+
+GUI 线程耗时用 time.thread_time() 统计（只计 GUI 线程自身的 CPU 时间，含排版和绘制）。
+
+运行方法：python benchmarks/bench_stream_render.py [每秒 delta 数] [秒数] [帧率]
+"""
+
+import os
+import sys
+import time
+import threading
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QApplication, QLabel, QTextEdit, QVBoxLayout, QWidget
+
+from ui.stream_renderer import StreamRenderer
+
+
+WORDS = ("The quick review of the quarterly release plan ", "covers translation latency, ",
+         "cache hit rates and the new glossary. ")
+
+
+class _Bridge(QObject):
+    delta = pyqtSignal(str)
+
+
+def _producer(emit, rate, seconds, done):
+    interval = 1.0 / rate
+    next_at = time.perf_counter()
+    end = next_at + seconds
+    i = 0
+    while next_at < end:
+        emit(WORDS[i % len(WORDS)])
+        i += 1
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    done.set()
+
+
+def _run(app, widget, mode, rate, seconds, hz):
+    """返回 (GUI 线程 CPU 毫秒/秒, 刷新次数)"""
+    done = threading.Event()
+    text = [""]
+    updates = [0]
+
+    if mode == "naive":
+        bridge = _Bridge()
+
+        def on_delta(delta):
+            text[0] += delta
+            if isinstance(widget, QTextEdit):
+                widget.setPlainText(text[0])
+            else:
+                widget.setText(text[0])
+            updates[0] += 1
+
+        bridge.delta.connect(on_delta)
+        emit = bridge.delta.emit
+        renderer = None
+    else:
+        renderer = StreamRenderer(hz)
+        renderer.begin(widget)
+        emit = lambda delta: renderer.feed(widget, delta)
+
+    cpu_start, wall_start = time.thread_time(), time.perf_counter()
+    threading.Thread(target=_producer, args=(emit, rate, seconds, done), daemon=True).start()
+    while not done.is_set():
+        app.processEvents()
+        time.sleep(0.001)
+    app.processEvents()
+    cpu = time.thread_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    if renderer is not None:
+        updates[0] = renderer.frames
+        renderer.finish(widget)
+    widget.clear()
+    return cpu / wall * 1000, updates[0]
+
+
+def main():
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    hz = float(sys.argv[3]) if len(sys.argv) > 3 else 30
+
+    app = QApplication(sys.argv)
+    window = QWidget()
+    layout = QVBoxLayout(window)
+    label = QLabel()
+    label.setWordWrap(True)
+    edit = QTextEdit()
+    layout.addWidget(label)
+    layout.addWidget(edit)
+    window.resize(480, 600)
+    window.show()
+
+    print(f"{rate} delta/秒，{seconds:.0f} 秒，合并帧率 {hz:.0f} Hz")
+    for name, widget in (("QLabel", label), ("QTextEdit", edit)):
+        for mode in ("naive", "coalesced"):
+            busy, updates = _run(app, widget, mode, rate, seconds, hz)
+            print(f"{name:<10} {mode:<10} GUI 线程 {busy:7.1f} ms/秒 | 刷新 {updates / seconds:6.0f} 次/秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+样式切换微基准 - 每次按键的耗时
+Style State Micro-benchmark
+
+对比两种方式：
+- legacy: 旧实现，每次按键对结果标签 setStyleSheet 整段 CSS
+- states: 新实现，FloatingInputWindow._on_text_changed（动态属性 + 一次性样式表）
+
+运行方法：python benchmarks/bench_style_states.py [按键次数]
+"""
+
+import os
+import sys
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt5.QtWidgets import QApplication
+
+from ui.floating_input import FloatingInputWindow
+
+
+LEGACY_TRANSLATING_STYLE = """
+    QLabel {
+        background-color: #313244;
+        border-radius: 8px;
+        padding: 12px 16px;
+        font-size: 14px;
+        color: #6c7086;
+        font-family: "Microsoft YaHei", "Segoe UI";
+        min-height: 40px;
+    }
+"""
+
+SAMPLE = "今天下午三点开会讨论新版本的发布计划"
+
+
+def _keystrokes(count):
+    """模拟逐字输入，输满一句后清空重来"""
+    text = ""
+    for i in range(count):
+        if len(text) >= len(SAMPLE):
+            text = ""
+        text += SAMPLE[len(text)]
+        yield text
+
+
+def bench_legacy(window, app, count):
+    label = window.result_label
+
+    def on_text_changed(text):
+        label.setText("⏳ 翻译中...")
+        label.setStyleSheet(LEGACY_TRANSLATING_STYLE)
+
+    start = time.perf_counter()
+    for text in _keystrokes(count):
+        on_text_changed(text)
+        app.processEvents()
+    return (time.perf_counter() - start) / count
+
+
+def bench_states(window, app, count):
+    start = time.perf_counter()
+    for text in _keystrokes(count):
+        window._on_text_changed(text)
+        app.processEvents()
+    elapsed = (time.perf_counter() - start) / count
+    window._translate_timer.stop()
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    app = QApplication(sys.argv)
+
+    window = FloatingInputWindow()
+    window.show()
+    app.processEvents()
+
+    # 预热
+    bench_states(window, app, 50)
+    legacy = bench_legacy(window, app, count)
+
+    window = FloatingInputWindow()
+    window.show()
+    app.processEvents()
+    bench_states(window, app, 50)
+    states = bench_states(window, app, count)
+
+    print(f"按键次数: {count}")
+    print(f"legacy (setStyleSheet): {legacy * 1e6:8.1f} µs/按键")
+    print(f"states (动态属性)     : {states * 1e6:8.1f} µs/按键")
+    print(f"加速比: {legacy / states:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
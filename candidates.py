@@ -0,0 +1,173 @@
+"""
+Candidates
+一次请求生成多个候选译文（如口语 / 正式），以 JSON 对象输出，流式解析
+
+- build_prompt: 在翻译目标的系统提示词后追加输出格式要求 {"casual": "...", "formal": "..."}
+- FieldStream: 增量 JSON 解析器，只关心顶层对象的字符串字段，
+  每个字段的值一结束（遇到收尾引号）就返回，不必等整个对象
+- parse_candidates: 流结束后的整体解析，容忍代码块包裹和前后多余文字
+
+配置示例：
+"candidates": {
+    "enabled": true,
+    "response_format": false,
+    "styles": [
+        {"name": "casual", "label": "😊 口语", "style": "口语化、轻松自然"},
+        {"name": "formal", "label": "👔 正式", "style": "正式、书面、礼貌"}
+    ]
+}
+response_format 为 true 时请求带 {"type": "json_object"}（服务商支持时输出更稳定）。
+"""
+
+import json
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+
+class CandidateStyle(NamedTuple):
+    """一种候选译文风格"""
+    name: str
+    label: str
+    style: str
+
+
+DEFAULT_STYLES = [
+    CandidateStyle("casual", "😊 口语", "口语化、轻松自然"),
+    CandidateStyle("formal", "👔 正式", "正式、书面、礼貌"),
+]
+
+PROMPT_TEMPLATE = """
+
+本次请同时给出 {count} 种译文，只输出一个 JSON 对象，不要输出其他内容：
+{{{fields}}}
+各字段要求：
+{requirements}"""
+
+
+def build_styles(config: dict) -> List[CandidateStyle]:
+    """根据配置生成候选风格列表"""
+    styles = [
+        CandidateStyle(item['name'], item.get('label', item['name']), item.get('style', ''))
+        for item in (config.get('styles') or [])
+    ]
+    return styles or list(DEFAULT_STYLES)
+
+
+def build_prompt(styles: List[CandidateStyle]) -> str:
+    """追加在系统提示词之后的输出格式要求"""
+    fields = ", ".join(f'"{s.name}": "..."' for s in styles)
+    requirements = "\n".join(f"- {s.name}: {s.style}" for s in styles)
+    return PROMPT_TEMPLATE.format(count=len(styles), fields=fields, requirements=requirements)
+
+
+# FieldStream 的状态
+_BEFORE, _KEY_WAIT, _KEY, _COLON, _VALUE_WAIT, _STRING, _OTHER, _AFTER_VALUE, _END = range(9)
+
+
+class FieldStream:
+    """顶层 JSON 对象的增量解析：feed(片段) 返回本次新完成的 (字段名, 字符串值)
+
+    非字符串的值（数字、嵌套对象等）跳过；对象开始前的文字（如 ```json）忽略。
+    """
+
+    def __init__(self):
+        self._state = _BEFORE
+        self._buf: List[str] = []  # 当前字符串的原始字符（含转义）
+        self._escape = False
+        self._key = ""
+        self._depth = 0  # 跳过非字符串值时的嵌套深度
+        self._in_nested_string = False
+        self.fields: Dict[str, str] = {}
+
+    def _finish_string(self) -> str:
+        raw, self._buf = "".join(self._buf), []
+        try:
+            return json.loads(f'"{raw}"')
+        except ValueError:
+            return raw
+
+    def feed(self, chunk: str) -> List[Tuple[str, str]]:
+        completed = []
+        for ch in chunk:
+            state = self._state
+            if state in (_KEY, _STRING):
+                if self._escape:
+                    self._escape = False
+                    self._buf.append(ch)
+                elif ch == '\\':
+                    self._escape = True
+                    self._buf.append(ch)
+                elif ch == '"':
+                    text = self._finish_string()
+                    if state == _KEY:
+                        self._key = text
+                        self._state = _COLON
+                    else:
+                        self.fields[self._key] = text
+                        completed.append((self._key, text))
+                        self._state = _AFTER_VALUE
+                else:
+                    self._buf.append(ch)
+            elif state == _BEFORE:
+                if ch == '{':
+                    self._state = _KEY_WAIT
+            elif state == _KEY_WAIT:
+                if ch == '"':
+                    self._state = _KEY
+                elif ch == '}':
+                    self._state = _END
+            elif state == _COLON:
+                if ch == ':':
+                    self._state = _VALUE_WAIT
+            elif state == _VALUE_WAIT:
+                if ch == '"':
+                    self._state = _STRING
+                elif not ch.isspace():
+                    self._state = _OTHER
+                    self._depth = 1 if ch in '{[' else 0
+            elif state == _OTHER:
+                if self._in_nested_string:
+                    if self._escape:
+                        self._escape = False
+                    elif ch == '\\':
+                        self._escape = True
+                    elif ch == '"':
+                        self._in_nested_string = False
+                elif ch == '"':
+                    self._in_nested_string = True
+                elif ch in '{[':
+                    self._depth += 1
+                elif ch in '}]' and self._depth > 0:
+                    self._depth -= 1
+                elif self._depth == 0 and ch == ',':
+                    self._state = _KEY_WAIT
+                elif self._depth == 0 and ch == '}':
+                    self._state = _END
+            elif state == _AFTER_VALUE:
+                if ch == ',':
+                    self._state = _KEY_WAIT
+                elif ch == '}':
+                    self._state = _END
+        return completed
+
+    @property
+    def done(self) -> bool:
+        return self._state == _END
+
+
+def parse_candidates(raw: str, styles: List[CandidateStyle]) -> Dict[str, str]:
+    """整体解析输出；不是 JSON 时整段作为第一种风格的译文"""
+    start, end = raw.find('{'), raw.rfind('}')
+    data: Optional[dict] = None
+    if start != -1 and end > start:
+        try:
+            data = json.loads(raw[start:end + 1])
+        except ValueError:
+            data = None
+    if not isinstance(data, dict):
+        stream = FieldStream()
+        stream.feed(raw)
+        data = stream.fields
+    result = {s.name: str(data[s.name]).strip() for s in styles if data.get(s.name)}
+    if not result and raw.strip():
+        result[styles[0].name] = raw.strip()
+    return result
@@ -0,0 +1,240 @@
+"""
+Config Manager
+配置文件热加载与多配置方案 (profiles)
+
+配置格式（兼容旧的单一配置）：
+{
+    "api_base": "...", "api_key": "...", "model": "...",   # 顶层字段为所有方案的默认值
+    "active_profile": "fast",
+    "profiles": {
+        "fast":     {"model": "fast-model"},
+        "accurate": {"model": "strong-model", "api_base": "https://other/v1", "api_key": "..."}
+    }
+}
+没有 profiles 时，顶层配置即为名为 default 的方案。
+
+后台线程轮询文件修改时间，变化后重新加载；新配置校验通过才生效，
+校验失败时打印错误并保留旧配置。
+"""
+
+import os
+import copy
+import json
+import time
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+DEFAULT_PROFILE = "default"
+
+# 这些字段属于方案本身，其余顶层字段是全局配置
+PROFILE_KEYS = ("api_base", "api_key", "model", "timeouts", "retry", "circuit_breaker", "router")
+
+
+class ConfigError(ValueError):
+    """配置校验失败"""
+
+
+def _check_positive(section: dict, name: str, where: str):
+    for key, value in section.items():
+        if not isinstance(value, (int, float)) or isinstance(value, bool) or value <= 0:
+            raise ConfigError(f"{where}.{name}.{key} 必须是正数")
+
+
+def validate_profile(name: str, profile: dict) -> dict:
+    """校验单个方案
+
+    Args:
+        name: 方案名
+        profile: 合并顶层默认值之后的方案配置
+
+    Returns:
+        校验通过的方案配置
+
+    Raises:
+        ConfigError: 缺少字段或取值非法
+    """
+    where = f"profiles.{name}"
+    for key in ("api_key", "api_base", "model"):
+        value = profile.get(key)
+        if not isinstance(value, str) or not value.strip():
+            raise ConfigError(f"{where}.{key} 不能为空")
+    if not profile['api_base'].startswith(("http://", "https://")):
+        raise ConfigError(f"{where}.api_base 必须以 http:// 或 https:// 开头")
+    for section in ("timeouts", "retry", "circuit_breaker"):
+        value = profile.get(section, {})
+        if not isinstance(value, dict):
+            raise ConfigError(f"{where}.{section} 必须是对象")
+        _check_positive(value, section, where)
+    router = profile.get('router')
+    if router is not None and not isinstance(router, dict):
+        raise ConfigError(f"{where}.router 必须是对象")
+    return profile
+
+
+def validate_config(raw: dict) -> dict:
+    """校验整个配置并展开为方案表
+
+    Returns:
+        在原配置基础上补全 profiles（每个方案已合并顶层默认值）和 active_profile
+    """
+    if not isinstance(raw, dict):
+        raise ConfigError("配置文件顶层必须是对象")
+
+    defaults = {k: raw[k] for k in PROFILE_KEYS if k in raw}
+    raw_profiles = raw.get('profiles') or {DEFAULT_PROFILE: {}}
+    if not isinstance(raw_profiles, dict):
+        raise ConfigError("profiles 必须是对象")
+
+    profiles = {}
+    for name, overrides in raw_profiles.items():
+        if not isinstance(overrides, dict):
+            raise ConfigError(f"profiles.{name} 必须是对象")
+        merged = copy.deepcopy(defaults)
+        merged.update(copy.deepcopy(overrides))
+        profiles[name] = validate_profile(name, merged)
+
+    targets = raw.get('targets', [])
+    if not isinstance(targets, list):
+        raise ConfigError("targets 必须是数组")
+    names = set()
+    for i, target in enumerate(targets):
+        if not isinstance(target, dict) or not isinstance(target.get('name'), str) or not target['name']:
+            raise ConfigError(f"targets[{i}] 必须包含 name")
+        if target['name'] in names:
+            raise ConfigError(f"targets 中 name '{target['name']}' 重复")
+        names.add(target['name'])
+
+    router = raw.get('router', {})
+    if not isinstance(router, dict) or not isinstance(router.get('models', []), list):
+        raise ConfigError("router.models 必须是数组")
+    for i, model in enumerate(router.get('models', [])):
+        if not isinstance(model, dict) or not model.get('model'):
+            raise ConfigError(f"router.models[{i}] 必须包含 model")
+
+    active = raw.get('active_profile') or next(iter(profiles))
+    if active not in profiles:
+        raise ConfigError(f"active_profile '{active}' 不存在")
+
+    config = dict(raw)
+    config['profiles'] = profiles
+    config['active_profile'] = active
+    return config
+
+
+class ConfigManager:
+    """配置管理器 - 文件监控 + 方案切换"""
+
+    def __init__(self, path: str = "config.json", poll_interval: float = 1.0):
+        """初始化并加载配置
+
+        Args:
+            path: 配置文件路径
+            poll_interval: 文件检查间隔（秒）
+
+        Raises:
+            ConfigError: 首次加载的配置不合法
+        """
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[dict], None]] = []
+        self._active_override: Optional[str] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._mtime = os.stat(path).st_mtime_ns
+        self._config = self._load()
+
+    def _load(self) -> dict:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            try:
+                raw = json.load(f)
+            except json.JSONDecodeError as e:
+                raise ConfigError(f"JSON 格式错误: {e}") from e
+        return validate_config(raw)
+
+    @property
+    def config(self) -> dict:
+        """当前生效的配置（只读使用）"""
+        with self._lock:
+            return self._config
+
+    @property
+    def profiles(self) -> Dict[str, dict]:
+        return self.config['profiles']
+
+    @property
+    def active_profile(self) -> str:
+        with self._lock:
+            if self._active_override in self._config['profiles']:
+                return self._active_override
+            return self._config['active_profile']
+
+    def get(self, key: str, default=None):
+        return self.config.get(key, default)
+
+    def subscribe(self, callback: Callable[[dict], None]):
+        """注册配置变化回调（在监控线程或调用 set_active_profile 的线程中调用）"""
+        self._listeners.append(callback)
+
+    def _notify(self):
+        config = self.config
+        for callback in list(self._listeners):
+            try:
+                callback(config)
+            except Exception as e:
+                print(f"[配置] 回调出错: {e}")
+
+    def set_active_profile(self, name: str):
+        """切换当前方案（仅运行时生效，不改写配置文件）
+
+        Raises:
+            ConfigError: 方案不存在
+        """
+        with self._lock:
+            if name not in self._config['profiles']:
+                raise ConfigError(f"方案 '{name}' 不存在")
+            self._active_override = name
+        print(f"[配置] 切换到方案: {name}")
+        self._notify()
+
+    def reload(self) -> bool:
+        """重新加载配置文件
+
+        Returns:
+            新配置是否生效
+        """
+        try:
+            config = self._load()
+        except (OSError, ConfigError) as e:
+            print(f"[配置] 重新加载失败，保留旧配置: {e}")
+            return False
+        with self._lock:
+            self._config = config
+        print(f"[配置] 已重新加载 ({', '.join(config['profiles'])})")
+        self._notify()
+        return True
+
+    def _watch_loop(self):
+        while self._running:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError:
+                mtime = self._mtime
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self.reload()
+            time.sleep(self.poll_interval)
+
+    def start(self):
+        """启动文件监控"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._watch_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """停止文件监控"""
+        self._running = False
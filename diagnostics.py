@@ -0,0 +1,99 @@
+"""
+Diagnostics
+进程诊断信息 - 内存占用与各模块注册的状态报告
+"""
+
+import os
+import sys
+import ctypes
+from typing import Callable, Dict, Optional
+
+
+_providers: Dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, provider: Callable[[], dict]):
+    """注册一个诊断信息来源
+
+    Args:
+        name: 分节名称
+        provider: 返回 {指标: 值} 的函数
+    """
+    _providers[name] = provider
+
+
+def unregister(name: str):
+    _providers.pop(name, None)
+
+
+def current_rss() -> Optional[int]:
+    """当前进程常驻内存 (字节)，无法获取时返回 None"""
+    try:
+        if sys.platform == "win32":
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [
+                    ("cb", ctypes.c_ulong),
+                    ("PageFaultCount", ctypes.c_ulong),
+                    ("PeakWorkingSetSize", ctypes.c_size_t),
+                    ("WorkingSetSize", ctypes.c_size_t),
+                    ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                    ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                    ("PagefileUsage", ctypes.c_size_t),
+                    ("PeakPagefileUsage", ctypes.c_size_t),
+                ]
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize
+            return None
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def release_os_memory():
+    """让操作系统回收已释放的内存（Windows 清空工作集，glibc 归还堆空闲页）"""
+    try:
+        if sys.platform == "win32":
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            ctypes.windll.psapi.EmptyWorkingSet(handle)
+        elif sys.platform.startswith("linux"):
+            ctypes.CDLL("libc.so.6").malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+def format_bytes(size: Optional[int]) -> str:
+    if size is None:
+        return "未知"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def collect() -> Dict[str, dict]:
+    """收集所有诊断信息"""
+    sections = {"进程": {"RSS": format_bytes(current_rss()), "PID": os.getpid()}}
+    for name, provider in list(_providers.items()):
+        try:
+            sections[name] = provider()
+        except Exception as e:
+            sections[name] = {"错误": str(e)}
+    return sections
+
+
+def report() -> str:
+    """文本格式的诊断报告"""
+    lines = []
+    for section, values in collect().items():
+        lines.append(f"[{section}]")
+        for key, value in values.items():
+            lines.append(f"  {key}: {value}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    print(report())
@@ -0,0 +1,170 @@
+"""
+Document Mode
+长文档并行翻译 - 按段落切分，有限并发翻译，按原文顺序交付结果
+
+- 切分：按换行切段并保留原有的换行 / 空行；超长段落在句末标点处继续切开
+- 并发：固定大小的线程池，每段走 TranslationService（缓存、同文去重、用量统计）
+- 顺序：完成顺序任意，on_ready 只按段落顺序回调（前面的段落没完成时后面的先暂存），
+  界面可以直接追加，总耗时接近最慢的几段而不是所有段落之和
+
+配置示例：
+"document": {"min_chars": 300, "chunk_chars": 800, "workers": 4}
+"""
+
+import re
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+# 段落分隔（保留原样以便还原排版）
+PARAGRAPH_BREAK = re.compile(r'(\s*\n\s*)')
+# 句末位置（中英文句号、问号、叹号、分号之后）
+SENTENCE_END = re.compile(r'(?<=[。！？；.!?;])')
+
+# 段落状态
+WAITING, RUNNING, DONE, FAILED = "waiting", "running", "done", "failed"
+
+
+class Chunk(NamedTuple):
+    """一个翻译单元：原文和它后面的分隔符"""
+    text: str
+    separator: str
+
+
+def _split_long(paragraph: str, chunk_chars: int) -> List[str]:
+    """在句末把超长段落切成不超过 chunk_chars 的几块（单句超长时硬切）"""
+    parts, current = [], ""
+    for sentence in SENTENCE_END.split(paragraph):
+        while len(sentence) > chunk_chars:
+            if current:
+                parts.append(current)
+                current = ""
+            parts.append(sentence[:chunk_chars])
+            sentence = sentence[chunk_chars:]
+        if current and len(current) + len(sentence) > chunk_chars:
+            parts.append(current)
+            current = ""
+        current += sentence
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_document(text: str, chunk_chars: int = 800) -> List[Chunk]:
+    """切分文档，"".join(c.text + c.separator) 还原原文（去掉首尾空白）"""
+    pieces = PARAGRAPH_BREAK.split(text.strip())
+    chunks: List[Chunk] = []
+    for i in range(0, len(pieces), 2):
+        paragraph = pieces[i]
+        separator = pieces[i + 1] if i + 1 < len(pieces) else ""
+        if not paragraph:
+            continue
+        parts = _split_long(paragraph, chunk_chars)
+        chunks.extend(Chunk(part, "") for part in parts[:-1])
+        chunks.append(Chunk(parts[-1], separator))
+    return chunks
+
+
+def is_document(text: str, min_chars: int = 300) -> bool:
+    """是否按文档模式处理：足够长且不止一段"""
+    text = text.strip()
+    return len(text) >= min_chars and "\n" in text
+
+
+class DocumentJob:
+    """一次文档翻译（线程安全，回调在工作线程中调用）"""
+
+    def __init__(self, service, text: str, target=None, chunk_chars: int = 800, workers: int = 4,
+                 on_ready: Optional[Callable[[int, str, str], None]] = None,
+                 on_state: Optional[Callable[[int, str], None]] = None,
+                 on_finished: Optional[Callable[[], None]] = None):
+        """初始化
+
+        Args:
+            service: TranslationService
+            target: 翻译目标，None 为主目标
+            workers: 同时翻译的段落数上限
+            on_ready: (序号, 译文, 分隔符)，严格按段落顺序调用；失败的段落译文为 "❌ ..."
+            on_state: (序号, 状态)，段落开始 / 完成 / 失败时调用
+            on_finished: 全部段落交付后调用（取消后不调用）
+        """
+        self.service = service
+        self.target = target
+        self.chunks = split_document(text, chunk_chars)
+        self.states = [WAITING] * len(self.chunks)
+        self.durations: List[float] = [0.0] * len(self.chunks)
+        self.on_ready = on_ready
+        self.on_state = on_state
+        self.on_finished = on_finished
+        self._lock = threading.Lock()
+        self._done: Dict[int, str] = {}
+        self._next = 0
+        self._cancelled = False
+        self._started = 0.0
+        self.elapsed = 0.0
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="document")
+
+    def start(self) -> "DocumentJob":
+        self._started = time.perf_counter()
+        for index in range(len(self.chunks)):
+            self._pool.submit(self._run, index)
+        self._pool.shutdown(wait=False)
+        if not self.chunks and self.on_finished:
+            self.on_finished()
+        return self
+
+    def cancel(self):
+        """停止交付结果，尚未开始的段落不再请求（进行中的请求照常完成并进入缓存）"""
+        with self._lock:
+            self._cancelled = True
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def progress(self) -> tuple:
+        """(已完成段数, 总段数)"""
+        with self._lock:
+            return sum(1 for s in self.states if s in (DONE, FAILED)), len(self.chunks)
+
+    def _set_state(self, index: int, state: str):
+        with self._lock:
+            self.states[index] = state
+        if self.on_state:
+            self.on_state(index, state)
+
+    def _run(self, index: int):
+        if self._cancelled:
+            return
+        self._set_state(index, RUNNING)
+        start = time.perf_counter()
+        try:
+            result = self.service.translate(self.chunks[index].text, self.target, feature="document")
+            state = DONE
+        except Exception as e:
+            result = f"❌ 第 {index + 1} 段翻译失败: {e}"
+            state = FAILED
+        self.durations[index] = time.perf_counter() - start
+        if self._cancelled:
+            return
+        self._set_state(index, state)
+        self._deliver(index, result)
+
+    def _deliver(self, index: int, result: str):
+        """暂存结果，把从 _next 开始已连续完成的段落按顺序交出去"""
+        with self._lock:
+            self._done[index] = result
+            ready = []
+            while self._next in self._done:
+                ready.append((self._next, self._done.pop(self._next)))
+                self._next += 1
+            finished = self._next == len(self.chunks)
+            if finished:
+                self.elapsed = time.perf_counter() - self._started
+            # 在锁内回调，保证多个工作线程交付的顺序
+            for i, text in ready:
+                if self.on_ready and not self._cancelled:
+                    self.on_ready(i, text, self.chunks[i].separator)
+        if finished and self.on_finished and not self._cancelled:
+            self.on_finished()
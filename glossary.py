@@ -0,0 +1,217 @@
+"""
+Glossary
+术语表 - 把术语编译成 Aho-Corasick 自动机，线性时间扫描输入，只把命中的术语对注入请求
+
+源文件：UTF-8 文本，每行 "中文<Tab>译法"，# 开头为注释
+编译文件（源文件旁的 .bin，源文件更新后自动重建）：
+    header  '<4sIII'  magic, 术语数, 状态数, 转移数
+    keys    int64[转移数]   state * KEY_BASE + 字符码，升序
+    nexts   int32[转移数]   转移目标状态
+    fail    int32[状态数]   失配指针
+    out     int32[状态数]   在此状态结束的术语编号，无则 -1
+    link    int32[状态数]   沿失配链最近的有输出状态，无则 0
+    offsets uint32[术语数 * 2 + 1]  术语 / 译法在 blob 中的偏移
+    blob    UTF-8 字符串
+加载时数组直接 frombytes，只需用 keys / nexts 建一次转移字典；字符串命中时才解码。
+"""
+
+import os
+import struct
+import sys
+import hashlib
+from array import array
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+MAGIC = b'GLS1'
+HEADER = struct.Struct('<4sIII')
+KEY_BASE = 0x110000  # 大于最大 Unicode 码位
+
+# 注入提示词的格式
+PROMPT_HEADER = "\n\n术语表（以下术语必须使用给定译法）："
+
+
+class Glossary:
+    """编译后的术语表（只读，线程安全）"""
+
+    def __init__(self, keys: array, nexts: array, fail: array, out: array, link: array, offsets: array, blob: bytes):
+        self._goto: Dict[int, int] = dict(zip(keys, nexts))
+        self._arrays = (keys, nexts, fail, out, link, offsets)
+        self._fail = fail
+        self._out = out
+        self._link = link
+        self._offsets = offsets
+        self._blob = blob
+        # 内容摘要：术语或译法变化后随提示词版本一起变化，旧的缓存译文视为过期
+        self.digest = hashlib.sha1(offsets.tobytes() + blob).hexdigest()[:8]
+
+    def __len__(self) -> int:
+        return (len(self._offsets) - 1) // 2
+
+    def _string(self, index: int) -> str:
+        return self._blob[self._offsets[index]:self._offsets[index + 1]].decode('utf-8')
+
+    def term(self, term_id: int) -> Tuple[str, str]:
+        """术语编号 -> (术语, 译法)"""
+        return self._string(term_id * 2), self._string(term_id * 2 + 1)
+
+    def scan(self, text: str) -> List[int]:
+        """扫描文本，按首次出现顺序返回命中的术语编号（去重）"""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        link = self._link
+        found = {}
+        state = 0
+        for ch in text:
+            code = ord(ch)
+            while True:
+                nxt = goto.get(state * KEY_BASE + code)
+                if nxt is not None:
+                    state = nxt
+                    break
+                if state == 0:
+                    break
+                state = fail[state]
+            s = state if out[state] >= 0 else link[state]
+            while s:
+                found.setdefault(out[s], None)
+                s = link[s]
+        return list(found)
+
+    def matches(self, text: str) -> List[Tuple[str, str]]:
+        """命中的 (术语, 译法)"""
+        return [self.term(i) for i in self.scan(text)]
+
+    def prompt_for(self, text: str, max_terms: int = 50) -> str:
+        """生成要追加到系统提示词的术语段，无命中时为空字符串"""
+        ids = self.scan(text)
+        if not ids:
+            return ""
+        # 较长的术语更具体，超出上限时优先保留
+        if len(ids) > max_terms:
+            ids = sorted(ids, key=lambda i: -len(self._string(i * 2)))[:max_terms]
+        lines = [f"{term} → {translation}" for term, translation in map(self.term, ids)]
+        return PROMPT_HEADER + "\n" + "\n".join(lines)
+
+    def save(self, path: str):
+        """写入编译文件（先写临时文件再替换）"""
+        keys, nexts, fail, out, link, offsets = self._arrays
+        tmp = path + '.tmp'
+        with open(tmp, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, len(self), len(fail), len(keys)))
+            for data in (keys, nexts, fail, out, link, offsets):
+                if sys.byteorder != 'little':
+                    data = array(data.typecode, data)
+                    data.byteswap()
+                data.tofile(f)
+            f.write(self._blob)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> "Glossary":
+        """读取编译文件"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        magic, terms, states, edges = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError(f"不是术语表编译文件: {path}")
+        pos = HEADER.size
+        arrays = []
+        for typecode, count in (('q', edges), ('i', edges), ('i', states), ('i', states), ('i', states),
+                                ('I', terms * 2 + 1)):
+            item = array(typecode)
+            size = item.itemsize * count
+            item.frombytes(data[pos:pos + size])
+            if sys.byteorder != 'little':
+                item.byteswap()
+            arrays.append(item)
+            pos += size
+        return cls(*arrays, data[pos:])
+
+
+def compile_glossary(pairs: Iterable[Tuple[str, str]]) -> Glossary:
+    """把 (术语, 译法) 编译成自动机；重复术语以最后一次为准"""
+    terms: Dict[str, str] = {}
+    for term, translation in pairs:
+        term = term.strip()
+        if term:
+            terms[term] = translation.strip()
+
+    # 字典树
+    children: List[Dict[int, int]] = [{}]
+    out = array('i', [-1])
+    for term_id, term in enumerate(terms):
+        state = 0
+        for ch in term:
+            code = ord(ch)
+            nxt = children[state].get(code)
+            if nxt is None:
+                nxt = len(children)
+                children[state][code] = nxt
+                children.append({})
+                out.append(-1)
+            state = nxt
+        out[state] = term_id
+
+    # 按广度优先计算失配指针和输出链
+    fail = array('i', [0]) * len(children)
+    link = array('i', [0]) * len(children)
+    queue = deque(children[0].values())
+    while queue:
+        state = queue.popleft()
+        for code, child in children[state].items():
+            f = fail[state]
+            while f and code not in children[f]:
+                f = fail[f]
+            target = children[f].get(code, 0)
+            fail[child] = target if target != child else 0
+            link[child] = fail[child] if out[fail[child]] >= 0 else link[fail[child]]
+            queue.append(child)
+
+    edges = sorted(
+        (state * KEY_BASE + code, nxt)
+        for state, edges in enumerate(children)
+        for code, nxt in edges.items()
+    )
+    keys = array('q', (key for key, _ in edges))
+    nexts = array('i', (nxt for _, nxt in edges))
+
+    offsets = array('I', [0])
+    blob = bytearray()
+    for term, translation in terms.items():
+        for text in (term, translation):
+            blob += text.encode('utf-8')
+            offsets.append(len(blob))
+    return Glossary(keys, nexts, fail, out, link, offsets, bytes(blob))
+
+
+def read_source(path: str) -> List[Tuple[str, str]]:
+    """读取 "中文<Tab>译法" 源文件"""
+    pairs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line.strip() or line.startswith('#') or '\t' not in line:
+                continue
+            term, translation = line.split('\t', 1)
+            pairs.append((term, translation))
+    return pairs
+
+
+def load_glossary(path: str) -> Optional[Glossary]:
+    """加载术语表：编译文件比源文件新时直接读取，否则重新编译并写入；源文件不存在时返回 None"""
+    if not os.path.exists(path):
+        return None
+    compiled = path + '.bin'
+    try:
+        if os.path.getmtime(compiled) >= os.path.getmtime(path):
+            return Glossary.load(compiled)
+    except (OSError, ValueError, struct.error):
+        pass
+    glossary = compile_glossary(read_source(path))
+    try:
+        glossary.save(compiled)
+    except OSError as e:
+        print(f"[术语表] 写入编译文件失败: {e}")
+    return glossary
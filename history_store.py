@@ -0,0 +1,419 @@
+"""
+Translation History Store
+只追加的翻译历史存储
+
+文件布局（位于 history 目录）：
+- history.dat  - 压缩块，每块 BLOCK_RECORDS 条记录，zlib 压缩
+- history.idx  - 每块一条定长索引（偏移、长度、条数、时间范围、布隆过滤器的位置），mmap 读取
+- history.blm  - 每块的单字 + 二元组布隆过滤器，按块内容大小分配（每个字 / 字符对约 BLOOM_BITS_PER_GRAM 位），mmap 读取
+- history.tail - 尚未凑满一块的未压缩记录，凑满后压缩写入 .dat 并清空
+- history.ver  - 索引格式和布隆过滤器哈希的版本；与当前版本不同时启动时按数据文件重建索引
+
+追加为常数时间；搜索时先用索引中的布隆过滤器跳过不可能命中的块（单字查询按字过滤），
+只解压候选块，从新到旧返回结果。空闲时只占用未满块的少量记录。
+
+封块时依次写数据、索引、清空 tail；在清空 tail 前异常退出时，重新打开会发现 tail 开头
+就是最后一块的内容并把它去掉，不会重复记录。
+"""
+
+import os
+import mmap
+import time
+import zlib
+import struct
+import threading
+from collections import OrderedDict
+from typing import Callable, List, NamedTuple, Optional
+
+
+BLOCK_RECORDS = 32
+# 布隆过滤器按块内不同的字 / 字符对数量分配：每个约 10 位、置 2 位（单字查询误判率约 3%），
+# 上下限避免极短块过滤失效、极长块占用过多；大小取 16 字节的倍数，搜索时同样大小的块共用检查位置
+BLOOM_BITS_PER_GRAM = 10
+BLOOM_SIZE_STEP = 16
+BLOOM_MIN_BYTES = 16
+BLOOM_MAX_BYTES = 512
+BLOOM_VERSION = "3"
+
+# 记录头: 时间戳(秒), 原文字节数, 译文字节数
+RECORD_HEADER = struct.Struct('<IHH')
+# 索引项: 数据偏移, 压缩长度, 记录条数, 首条时间, 末条时间, 布隆过滤器偏移, 布隆过滤器字节数
+INDEX_HEADER = struct.Struct('<QIIIIQH')
+INDEX_ENTRY_SIZE = INDEX_HEADER.size
+# 版本 1、2 的索引项：同样以数据偏移、压缩长度开头，后接固定 512 字节的布隆过滤器
+LEGACY_INDEX_ENTRY_SIZE = struct.calcsize('<QIIII') + 512
+# 重建索引只需要每项开头的数据偏移和压缩长度
+BLOCK_LOCATION = struct.Struct('<QI')
+# 索引项末尾的布隆过滤器偏移和字节数
+BLOOM_LOCATION = struct.Struct('<QH')
+BLOOM_LOCATION_OFFSET = INDEX_HEADER.size - BLOOM_LOCATION.size
+
+MAX_FIELD_BYTES = 0xFFFF
+
+
+class HistoryEntry(NamedTuple):
+    """一条翻译历史"""
+    timestamp: int
+    original: str
+    translated: str
+
+
+def _fmix32(h: int) -> int:
+    """MurmurHash3 的 32 位终混，让相近的输入（如 ASCII 字符对）均匀分散"""
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & 0xFFFFFFFF
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & 0xFFFFFFFF
+    return h ^ (h >> 16)
+
+
+def _grams(text: str) -> set:
+    """文本中的字符和相邻字符对（大小写不敏感）"""
+    text = text.casefold()
+    grams = set(text)
+    grams.update(text[i:i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _gram_hash(gram: str) -> int:
+    """单字或字符对的 32 位哈希，由 _bloom_bits 展开成过滤器中的位置"""
+    if len(gram) == 1:
+        return _fmix32(ord(gram) | 0x80000000)
+    return _fmix32((ord(gram[0]) * 0x9E3779B1 + ord(gram[1])) & 0x7FFFFFFF)
+
+
+def _bloom_bits(h: int, bits: int):
+    """哈希在 bits 位过滤器中的 2 个位置（以哈希为起点、高 16 位为步长的双重哈希）"""
+    return h % bits, (h + ((h >> 16) | 1)) % bits
+
+
+def _bloom_size(gram_count: int) -> int:
+    """按不同的字 / 字符对数量决定过滤器字节数，取 BLOOM_SIZE_STEP 的整数倍"""
+    size = -(-gram_count * BLOOM_BITS_PER_GRAM // (8 * BLOOM_SIZE_STEP)) * BLOOM_SIZE_STEP
+    return min(BLOOM_MAX_BYTES, max(BLOOM_MIN_BYTES, size))
+
+
+def _bloom(entries: List["HistoryEntry"]) -> bytes:
+    grams = set()
+    for e in entries:
+        grams |= _grams(e.original)
+        grams |= _grams(e.translated)
+    size = _bloom_size(len(grams))
+    bloom = bytearray(size)
+    for gram in grams:
+        for bit in _bloom_bits(_gram_hash(gram), size * 8):
+            bloom[bit >> 3] |= 1 << (bit & 7)
+    return bytes(bloom)
+
+
+def _bloom_probes(hashes: List[int], size: int) -> List[tuple]:
+    """查询在 size 字节的过滤器中要检查的 (字节序号, 掩码)"""
+    masks = {}
+    for h in hashes:
+        for bit in _bloom_bits(h, size * 8):
+            masks[bit >> 3] = masks.get(bit >> 3, 0) | (1 << (bit & 7))
+    return list(masks.items())
+
+
+def _encode_field(text: str) -> bytes:
+    data = text.encode('utf-8')
+    if len(data) > MAX_FIELD_BYTES:
+        data = data[:MAX_FIELD_BYTES].decode('utf-8', 'ignore').encode('utf-8')
+    return data
+
+
+def _encode_record(entry: HistoryEntry) -> bytes:
+    original = _encode_field(entry.original)
+    translated = _encode_field(entry.translated)
+    return RECORD_HEADER.pack(entry.timestamp, len(original), len(translated)) + original + translated
+
+
+def _decode_records(data: bytes) -> List[HistoryEntry]:
+    """解码连续记录，末尾不完整的记录被忽略"""
+    entries = []
+    pos = 0
+    size = len(data)
+    while pos + RECORD_HEADER.size <= size:
+        ts, len_o, len_t = RECORD_HEADER.unpack_from(data, pos)
+        start = pos + RECORD_HEADER.size
+        end = start + len_o + len_t
+        if end > size:
+            break
+        entries.append(HistoryEntry(
+            ts,
+            data[start:start + len_o].decode('utf-8', 'replace'),
+            data[start + len_o:end].decode('utf-8', 'replace')
+        ))
+        pos = end
+    return entries
+
+
+class HistoryStore:
+    """只追加的翻译历史"""
+
+    def __init__(self, directory: str = "history", block_cache_size: int = 512):
+        """初始化
+
+        Args:
+            directory: 存储目录
+            block_cache_size: 最多缓存多少个已解压的块（默认约 1.6 万条，覆盖常用的搜索范围；
+                              空闲时由 trim 清空）
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._dat_path = os.path.join(directory, "history.dat")
+        self._idx_path = os.path.join(directory, "history.idx")
+        self._tail_path = os.path.join(directory, "history.tail")
+        self._blm_path = os.path.join(directory, "history.blm")
+        self._ver_path = os.path.join(directory, "history.ver")
+        self._lock = threading.Lock()
+        self._block_cache: "OrderedDict[int, List[HistoryEntry]]" = OrderedDict()
+        self._block_cache_size = block_cache_size
+        # 路径 -> (mmap, 文件对象)
+        self._mmaps = {}
+
+        self._recover()
+        with open(self._tail_path, 'rb') as f:
+            self._pending = _decode_records(f.read())
+
+    def _recover(self):
+        """修复异常退出留下的半截索引、数据或重复的 tail，必要时升级索引"""
+        for path in (self._dat_path, self._idx_path, self._blm_path, self._tail_path):
+            if not os.path.exists(path):
+                open(path, 'wb').close()
+
+        version = None
+        if os.path.exists(self._ver_path):
+            with open(self._ver_path, 'r') as f:
+                version = f.read().strip()
+        if version != BLOOM_VERSION:
+            if os.path.getsize(self._idx_path):
+                # 目前只有版本 1、2 两种旧格式，索引项都是 LEGACY_INDEX_ENTRY_SIZE 字节
+                self._rebuild_index(LEGACY_INDEX_ENTRY_SIZE)
+            with open(self._ver_path, 'w') as f:
+                f.write(BLOOM_VERSION)
+
+        idx_size = os.path.getsize(self._idx_path)
+        if idx_size % INDEX_ENTRY_SIZE:
+            idx_size -= idx_size % INDEX_ENTRY_SIZE
+            os.truncate(self._idx_path, idx_size)
+
+        data_end = bloom_end = 0
+        if idx_size:
+            with open(self._idx_path, 'rb') as f:
+                f.seek(idx_size - INDEX_ENTRY_SIZE)
+                offset, length, _, _, _, bloom_offset, bloom_size = INDEX_HEADER.unpack(f.read(INDEX_ENTRY_SIZE))
+            data_end = offset + length
+            bloom_end = bloom_offset + bloom_size
+        if os.path.getsize(self._dat_path) > data_end:
+            os.truncate(self._dat_path, data_end)
+        if os.path.getsize(self._blm_path) > bloom_end:
+            os.truncate(self._blm_path, bloom_end)
+
+        if idx_size and os.path.getsize(self._tail_path):
+            with open(self._dat_path, 'rb') as f:
+                f.seek(offset)
+                sealed = zlib.decompress(f.read(length))
+            with open(self._tail_path, 'rb') as f:
+                tail = f.read()
+            if tail.startswith(sealed):
+                # 封块时写完索引、清空 tail 之前退出：这些记录已经在最后一块里
+                with open(self._tail_path, 'wb') as f:
+                    f.write(tail[len(sealed):])
+
+    def _rebuild_index(self, entry_size: int):
+        """按数据文件重新生成索引和布隆过滤器（旧格式或旧哈希的过滤器会漏掉结果）
+
+        Args:
+            entry_size: 现有索引文件每项的字节数
+        """
+        start = time.perf_counter()
+        with open(self._idx_path, 'rb') as f:
+            old_index = f.read()
+        index = bytearray()
+        blooms = bytearray()
+        with open(self._dat_path, 'rb') as data:
+            for pos in range(0, len(old_index) - entry_size + 1, entry_size):
+                offset, length = BLOCK_LOCATION.unpack_from(old_index, pos)
+                data.seek(offset)
+                compressed = data.read(length)
+                if len(compressed) < length:
+                    break
+                entries = _decode_records(zlib.decompress(compressed))
+                bloom = _bloom(entries)
+                index += INDEX_HEADER.pack(
+                    offset, length, len(entries), entries[0].timestamp, entries[-1].timestamp,
+                    len(blooms), len(bloom)
+                )
+                blooms += bloom
+        for path, content in ((self._blm_path, blooms), (self._idx_path, index)):
+            with open(path + '.tmp', 'wb') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+        print(f"[历史] 已重建索引 {len(index) // INDEX_ENTRY_SIZE} 块 ({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            blocks = os.path.getsize(self._idx_path) // INDEX_ENTRY_SIZE
+            if not blocks:
+                return len(self._pending)
+            index = self._map(self._idx_path)
+            count = INDEX_HEADER.unpack_from(index, (blocks - 1) * INDEX_ENTRY_SIZE)[2]
+            return (blocks - 1) * BLOCK_RECORDS + count + len(self._pending)
+
+    def append(self, original: str, translated: str, timestamp: Optional[int] = None):
+        """追加一条历史
+
+        Args:
+            original: 原文
+            translated: 译文
+            timestamp: 时间戳（秒），默认当前时间
+        """
+        entry = HistoryEntry(int(timestamp if timestamp is not None else time.time()), original, translated)
+        record = _encode_record(entry)
+        with self._lock:
+            with open(self._tail_path, 'ab') as f:
+                f.write(record)
+            self._pending.append(entry)
+            if len(self._pending) >= BLOCK_RECORDS:
+                self._seal_block()
+
+    def _seal_block(self):
+        """把未满块压缩写入数据文件"""
+        raw = b''.join(_encode_record(e) for e in self._pending)
+        compressed = zlib.compress(raw, 6)
+
+        offset = os.path.getsize(self._dat_path)
+        bloom_offset = os.path.getsize(self._blm_path)
+        bloom = _bloom(self._pending)
+        for path, content in ((self._dat_path, compressed), (self._blm_path, bloom)):
+            with open(path, 'ab') as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+        header = INDEX_HEADER.pack(
+            offset, len(compressed), len(self._pending),
+            self._pending[0].timestamp, self._pending[-1].timestamp,
+            bloom_offset, len(bloom)
+        )
+        # 索引项写入后才算封块完成；清空 tail 前退出由 _recover 去重
+        with open(self._idx_path, 'ab') as f:
+            f.write(header)
+            f.flush()
+            os.fsync(f.fileno())
+        open(self._tail_path, 'wb').close()
+        self._pending = []
+
+    def _map(self, path: str):
+        """获取（文件变长时重新映射）索引或布隆过滤器文件的 mmap，空文件返回 None"""
+        size = os.path.getsize(path)
+        mapped = self._mmaps.get(path)
+        if mapped is not None and len(mapped[0]) != size:
+            self._close_mmap(path)
+            mapped = None
+        if mapped is None and size:
+            f = open(path, 'rb')
+            mapped = self._mmaps[path] = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), f)
+        return mapped[0] if mapped else None
+
+    def _close_mmap(self, path: str):
+        mapped = self._mmaps.pop(path, None)
+        if mapped is not None:
+            mapped[0].close()
+            mapped[1].close()
+
+    def _load_block(self, index, block_no: int) -> List[HistoryEntry]:
+        cached = self._block_cache.get(block_no)
+        if cached is not None:
+            self._block_cache.move_to_end(block_no)
+            return cached
+        offset, length = BLOCK_LOCATION.unpack_from(index, block_no * INDEX_ENTRY_SIZE)
+        with open(self._dat_path, 'rb') as f:
+            f.seek(offset)
+            entries = _decode_records(zlib.decompress(f.read(length)))
+        self._block_cache[block_no] = entries
+        if len(self._block_cache) > self._block_cache_size:
+            self._block_cache.popitem(last=False)
+        return entries
+
+    def search(self, query: str = "", limit: int = 50,
+               cancelled: Optional[Callable[[], bool]] = None) -> List[HistoryEntry]:
+        """子串搜索原文和译文，从新到旧返回
+
+        Args:
+            query: 查询文本，空字符串返回最近的记录
+            limit: 最多返回条数
+            cancelled: 每解压一个候选块前调用，返回 True 时停止（查询已过期），返回已找到的部分
+
+        Returns:
+            匹配的历史记录列表
+        """
+        needle = query.strip().casefold()
+        hashes = list({_gram_hash(gram) for gram in _grams(needle)})
+        results: List[HistoryEntry] = []
+
+        def collect(entries):
+            for e in reversed(entries):
+                if not needle or needle in e.original.casefold() or needle in e.translated.casefold():
+                    results.append(e)
+                    if len(results) >= limit:
+                        return True
+            return False
+
+        with self._lock:
+            if collect(self._pending):
+                return results
+            index = self._map(self._idx_path)
+            if index is None:
+                return results
+            blooms = self._map(self._blm_path)
+            probes = {}
+            for block_no in range(len(index) // INDEX_ENTRY_SIZE - 1, -1, -1):
+                bloom_start, bloom_size = BLOOM_LOCATION.unpack_from(
+                    index, block_no * INDEX_ENTRY_SIZE + BLOOM_LOCATION_OFFSET)
+                checks = probes.get(bloom_size)
+                if checks is None:
+                    checks = probes[bloom_size] = _bloom_probes(hashes, bloom_size)
+                if any(blooms[bloom_start + i] & mask != mask for i, mask in checks):
+                    continue
+                if cancelled is not None and cancelled():
+                    break
+                if collect(self._load_block(index, block_no)):
+                    break
+        return results
+
+    def recent(self, limit: int = 50) -> List[HistoryEntry]:
+        """最近的历史记录"""
+        return self.search("", limit)
+
+    def trim(self):
+        """释放解压缓存和索引映射（空闲时调用）"""
+        with self._lock:
+            self._block_cache.clear()
+            for path in list(self._mmaps):
+                self._close_mmap(path)
+
+    def close(self):
+        self.trim()
+
+
+if __name__ == "__main__":
+    import sys
+    import tempfile
+
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(tmp)
+        start = time.perf_counter()
+        for i in range(count):
+            store.append(f"第{i}条测试消息，今天天气真不错", f"Test message number {i}, nice weather today")
+        elapsed = time.perf_counter() - start
+        print(f"追加 {count} 条: {elapsed:.2f}s ({elapsed / count * 1e6:.1f} µs/条)")
+        index_kb = (os.path.getsize(store._idx_path) + os.path.getsize(store._blm_path)) / 1024
+        print(f"数据 {os.path.getsize(store._dat_path) / 1024:.0f} KB, 索引 {index_kb:.0f} KB")
+
+        for query in ("天气", "number 4242", "第99999条", "not present", "zz", "x", "雪", "下雪"):
+            store.trim()
+            start = time.perf_counter()
+            hits = store.search(query, limit=20)
+            print(f"搜索 {query!r}: {len(hits)} 条, {(time.perf_counter() - start) * 1000:.2f} ms")
+        store.close()
@@ -0,0 +1,97 @@
+"""
+Hook Event Queue
+全局键盘钩子的回调只做一件事：把带时间戳的事件放进有界队列，其余逻辑在工作线程执行
+
+低级键盘钩子在系统的按键路径上同步运行，回调慢会拖慢每一次按键，
+超时过多时 Windows 会静默移除钩子。这里同时记录每次回调（入队）的耗时，
+通过 stats() 和诊断信息给出最坏值与 p99。
+"""
+
+import queue
+import threading
+import time
+from typing import Callable
+
+import diagnostics
+
+
+class HookEventQueue:
+    """钩子事件队列 + 工作线程"""
+
+    def __init__(self, handler: Callable, name: str = "钩子", maxsize: int = 1024, samples: int = 4096):
+        """初始化
+
+        Args:
+            handler: 工作线程中处理事件的函数 handler(timestamp, *event)，timestamp 为 perf_counter 秒
+            name: 名称（诊断信息分节名、线程名）
+            maxsize: 队列上限，满时丢弃新事件并计数
+            samples: 保留最近多少次回调耗时用于计算 p99
+        """
+        self.handler = handler
+        self.name = name
+        self.maxsize = maxsize
+        self._queue = queue.SimpleQueue()  # C 实现，put 不经过 Python 层的锁
+        self._durations = [0] * samples  # 纳秒，环形缓冲
+        self._count = 0
+        self._dropped = 0
+        self._worst_ns = 0
+        self._thread = threading.Thread(target=self._run, name=f"hook-{name}", daemon=True)
+        self._thread.start()
+        diagnostics.register(name, self.stats)
+
+    def push(self, *event):
+        """在钩子线程中调用：入队并返回，不做任何其他工作"""
+        start = time.perf_counter_ns()
+        if self._queue.qsize() < self.maxsize:
+            self._queue.put((start, event))
+        else:
+            self._dropped += 1
+        duration = time.perf_counter_ns() - start
+        count = self._count
+        self._durations[count % len(self._durations)] = duration
+        self._count = count + 1
+        if duration > self._worst_ns:
+            self._worst_ns = duration
+
+    def _run(self):
+        while True:
+            start, event = self._queue.get()
+            if event is None:
+                break
+            try:
+                self.handler(start / 1e9, *event)
+            except Exception as e:
+                print(f"[{self.name}] 事件处理失败: {e}")
+
+    def stop(self):
+        self._queue.put((0, None))
+        diagnostics.unregister(self.name)
+
+    def stats(self) -> dict:
+        """回调耗时统计（微秒）"""
+        samples = sorted(self._durations[:min(self._count, len(self._durations))])
+        p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] if samples else 0
+        return {
+            "回调次数": self._count,
+            "丢弃": self._dropped,
+            "积压": self._queue.qsize(),
+            "最坏耗时": f"{self._worst_ns / 1000:.1f} µs",
+            "p99 耗时": f"{p99 / 1000:.1f} µs",
+        }
+
+
+if __name__ == "__main__":
+    # 模拟钩子线程高频回调，处理逻辑故意放慢，验证回调耗时不受影响
+    handled = []
+
+    def slow_handler(timestamp, kind, key):
+        time.sleep(0.0005)
+        handled.append(key)
+
+    events = HookEventQueue(slow_handler, name="bench")
+    for i in range(20000):
+        events.push("press", i)
+    while len(handled) + events._dropped < 20000:
+        time.sleep(0.01)
+    for key, value in events.stats().items():
+        print(f"{key}: {value}")
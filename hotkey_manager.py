@@ -3,13 +3,16 @@
 Global Hotkey Manager
 
 使用 pynput 监听全局热键 Ctrl+Space 唤起翻译输入窗口
+钩子回调只把按键事件放进 HookEventQueue，组合键判断（ComboMatcher）和回调在工作线程执行
 """
 
-import threading
 from pynput import keyboard
-from typing import Callable, Set
+from typing import Callable
 import time
 
+from hook_queue import HookEventQueue
+from hotkey_matcher import ComboMatcher
+
 
 class HotkeyManager:
     """全局热键管理器"""
@@ -21,36 +24,24 @@ class HotkeyManager:
             on_activate: 热键触发时的回调函数
         """
         self.on_activate = on_activate
-        self._pressed_keys: Set = set()
         self._listener = None
-        self._last_trigger_time = 0
+        self._matcher = ComboMatcher((keyboard.Key.ctrl_l, keyboard.Key.ctrl_r), keyboard.Key.space)
+        self._events = HookEventQueue(self._handle, name="热键钩子")
         
     def _on_press(self, key):
-        """按键按下"""
-        # 记录按下的键
-        self._pressed_keys.add(key)
-        
-        # 检测 Ctrl + Space
-        has_ctrl = (
-            keyboard.Key.ctrl_l in self._pressed_keys or
-            keyboard.Key.ctrl_r in self._pressed_keys
-        )
-        has_space = keyboard.Key.space in self._pressed_keys
-        
-        if has_ctrl and has_space:
-            # 防抖动
-            current_time = time.time()
-            if current_time - self._last_trigger_time < 0.5:
-                return
-            self._last_trigger_time = current_time
+        """按键按下（钩子线程）"""
+        self._events.push(True, key)
             
+    def _on_release(self, key):
+        """按键释放（钩子线程）"""
+        self._events.push(False, key)
+        
+    def _handle(self, timestamp: float, pressed: bool, key):
+        """处理按键事件（工作线程）：检测 Ctrl + Space"""
+        if self._matcher.handle(timestamp, pressed, key):
             print("[热键] Ctrl+Space 触发")
             self.on_activate()
             
-    def _on_release(self, key):
-        """按键释放"""
-        self._pressed_keys.discard(key)
-        
     def start(self):
         """启动热键监听"""
         print("[热键] 启动监听 (Ctrl+Space)")
@@ -65,6 +56,10 @@ class HotkeyManager:
         if self._listener:
             self._listener.stop()
             self._listener = None
+            
+    def stats(self) -> dict:
+        """钩子回调耗时统计"""
+        return self._events.stats()
 
 
 if __name__ == "__main__":
@@ -82,5 +77,6 @@ if __name__ == "__main__":
         while True:
             time.sleep(1)
     except KeyboardInterrupt:
+        print(manager.stats())
         manager.stop()
         print("\n已退出")
@@ -0,0 +1,41 @@
+"""
+Hotkey Matcher
+组合键判断 - 根据按下 / 释放事件维护当前按住的键，修饰键之一与触发键同时按住时触发
+
+与键的类型无关（pynput 的 Key / KeyCode、字符串均可），不依赖任何钩子库，
+HotkeyManager 在工作线程中调用，基准测试直接使用。
+"""
+
+from typing import Hashable, Iterable, Set
+
+
+class ComboMatcher:
+    """修饰键 + 触发键组合判断（按事件时间防抖）"""
+
+    def __init__(self, modifiers: Iterable[Hashable], trigger: Hashable, debounce: float = 0.5):
+        """初始化
+
+        Args:
+            modifiers: 修饰键（按住其中任意一个即可，如左右 Ctrl）
+            trigger: 触发键
+            debounce: 两次触发的最小间隔（秒，按事件发生时间）
+        """
+        self.modifiers = frozenset(modifiers)
+        self.trigger = trigger
+        self.debounce = debounce
+        self._pressed: Set[Hashable] = set()
+        self._last_trigger_time = float('-inf')
+
+    def handle(self, timestamp: float, pressed: bool, key: Hashable) -> bool:
+        """处理一个按键事件，返回是否触发"""
+        if not pressed:
+            self._pressed.discard(key)
+            return False
+        self._pressed.add(key)
+        if self.trigger not in self._pressed or self.modifiers.isdisjoint(self._pressed):
+            return False
+        # 防抖动（按事件发生时间，不受排队延迟影响）
+        if timestamp - self._last_trigger_time < self.debounce:
+            return False
+        self._last_trigger_time = timestamp
+        return True
@@ -0,0 +1,312 @@
+"""
+HTTP Transport
+进程内共享的 HTTP 连接 - 所有方案、窗口、命令行和本机接口共用一个连接池
+
+- keep-alive：空闲连接保留 keepalive_seconds 秒，连续翻译不必重新握手
+- HTTP/2：安装了 h2 时开启，服务商支持时经 ALPN 协商使用，一个连接上并发多个请求；
+  不支持时自动使用 HTTP/1.1
+- 连接池上限：max_connections（总连接数）/ max_keepalive（保留的空闲连接数）
+- DNS 缓存：解析结果缓存 dns_ttl_seconds 秒，连接失败时丢弃该域名的缓存
+- 代理：proxy 为空时按环境变量 HTTP_PROXY / HTTPS_PROXY / ALL_PROXY / NO_PROXY（Windows 上还有系统设置）
+  选择代理，与 httpx 默认行为一致；设置 proxy 后所有请求都经过该代理
+
+连接池按端点区分连接，方案之间互不影响。诊断信息「HTTP 连接」给出请求数、
+新建连接数、连接复用率、连接池占用和 DNS 缓存命中。
+
+DNS 缓存、建连统计和只回收空闲连接需要访问 httpcore 连接池的内部属性，
+requirements.txt 固定了对应的 httpcore 版本范围；属性不存在时这几项自动停用，请求照常。
+
+配置示例（修改后重启生效）：
+"http": {
+    "http2": true,
+    "max_connections": 20,
+    "max_keepalive": 10,
+    "keepalive_seconds": 90,
+    "dns_ttl_seconds": 300,
+    "proxy": null
+}
+"""
+
+import time
+import socket
+import ipaddress
+import threading
+import importlib.util
+import urllib.request
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+import httpcore
+
+import diagnostics
+
+
+def environment_proxies() -> Dict[str, Optional[str]]:
+    """环境变量中的代理设置 → httpx mounts 的 {URL 模式: 代理地址}，None 表示该模式直连
+
+    给 httpx.Client 传入 transport 后它不再读取代理环境变量，这里按 httpx 的规则自己读取。
+    """
+    info = urllib.request.getproxies()
+    mounts: Dict[str, Optional[str]] = {}
+    for scheme in ("http", "https", "all"):
+        url = info.get(scheme)
+        if url:
+            mounts[f"{scheme}://"] = url if "://" in url else f"http://{url}"
+    if not mounts:
+        return {}
+    for host in (h.strip() for h in info.get("no", "").split(",")):
+        if host == "*":
+            return {}
+        if not host:
+            continue
+        if "://" in host:
+            mounts[host] = None
+            continue
+        try:
+            ip = ipaddress.ip_address(host)
+        except ValueError:
+            # .example.com 只排除子域名，example.com 同时排除自身和子域名
+            mounts[f"all://{host}" if host == "localhost" else f"all://*{host}"] = None
+        else:
+            mounts[f"all://[{host}]" if ip.version == 6 else f"all://{host}"] = None
+    return mounts
+
+
+class DNSCache:
+    """域名解析缓存（线程安全）"""
+
+    def __init__(self, ttl: float = 300.0):
+        """初始化
+
+        Args:
+            ttl: 解析结果缓存多少秒，0 表示不缓存
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def resolve(self, host: str, port: int) -> List[str]:
+        """返回地址列表（按系统解析顺序，已去重）
+
+        Raises:
+            OSError: 解析失败
+        """
+        try:
+            ipaddress.ip_address(host)
+            return [host]
+        except ValueError:
+            pass
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get((host, port))
+            if cached is not None and cached[0] > now:
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+        infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[(host, port)] = (now + self.ttl, addresses)
+        return addresses
+
+    def invalidate(self, host: str):
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == host]:
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _CachingBackend(httpcore.NetworkBackend):
+    """包装 httpcore 的网络层：先查 DNS 缓存再建连，并统计新建连接数
+
+    TLS 握手仍按原域名校验证书（server_hostname 取自请求的 URL）。
+    """
+
+    def __init__(self, inner, dns: DNSCache, on_connect: Callable[[], None]):
+        self._inner = inner
+        self._dns = dns
+        self._on_connect = on_connect
+
+    def connect_tcp(self, host, port, timeout=None, local_address=None, socket_options=None):
+        try:
+            addresses = self._dns.resolve(host, port)
+        except OSError as e:
+            raise httpcore.ConnectError(f"无法解析 {host}: {e}") from e
+        error = None
+        for address in addresses:
+            try:
+                stream = self._inner.connect_tcp(address, port, timeout, local_address, socket_options)
+            except httpcore.ConnectError as e:
+                error = e  # 换下一个地址；超时不重试，避免成倍拉长连接时间
+                continue
+            self._on_connect()
+            return stream
+        self._dns.invalidate(host)
+        raise error or httpcore.ConnectError(f"{host} 没有可用地址")
+
+    def connect_unix_socket(self, path, timeout=None, socket_options=None):
+        stream = self._inner.connect_unix_socket(path, timeout, socket_options)
+        self._on_connect()
+        return stream
+
+    def sleep(self, seconds):
+        self._inner.sleep(seconds)
+
+
+class HttpTransport:
+    """共享的 HTTP 客户端和连接池"""
+
+    def __init__(self, http2: bool = True, max_connections: int = 20, max_keepalive: int = 10,
+                 keepalive: float = 90.0, dns_ttl: float = 300.0, proxy: Optional[str] = None):
+        """初始化
+
+        Args:
+            http2: 是否启用 HTTP/2（未安装 h2 时忽略）
+            max_connections: 连接总数上限
+            max_keepalive: 保留的空闲连接数上限
+            keepalive: 空闲连接保留秒数
+            dns_ttl: DNS 缓存秒数，0 表示不缓存
+            proxy: 代理地址，None 表示按环境变量选择
+        """
+        if http2 and importlib.util.find_spec("h2") is None:
+            print("[HTTP] 未安装 h2，使用 HTTP/1.1（pip install httpx[http2]）")
+            http2 = False
+        self.http2 = http2
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive
+        )
+        self.dns = DNSCache(dns_ttl)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connects = 0
+
+        self.proxy = proxy
+        self._transport = httpx.HTTPTransport(
+            http2=http2, limits=self.limits, proxy=httpx.Proxy(proxy) if proxy else None
+        )
+        # httpx 没有公开设置网络层的参数，替换连接池的网络层以接入 DNS 缓存和建连统计
+        self._pool = getattr(self._transport, '_pool', None)
+        backend = getattr(self._pool, '_network_backend', None)
+        self._counting = backend is not None
+        if self._counting:
+            self._pool._network_backend = _CachingBackend(backend, self.dns, self._on_connect)
+        else:
+            print("[HTTP] 当前 httpx 版本无法接入 DNS 缓存，使用系统解析")
+
+        self.client = httpx.Client(
+            transport=self._transport,
+            mounts=self._proxy_mounts() if proxy is None else None,
+            timeout=httpx.Timeout(60.0, connect=5.0),
+            follow_redirects=True,
+            event_hooks={"request": [self._on_request]}
+        )
+
+    def _proxy_mounts(self) -> Dict[str, Optional[httpx.HTTPTransport]]:
+        """环境变量中的代理：每个代理一个连接池（不经过 DNS 缓存和统计），直连的走共享连接池"""
+        mounts = {}
+        for pattern, url in environment_proxies().items():
+            if url is None:
+                mounts[pattern] = None
+                continue
+            try:
+                mounts[pattern] = httpx.HTTPTransport(http2=self.http2, limits=self.limits, proxy=httpx.Proxy(url))
+            except Exception as e:  # 如 SOCKS 代理缺少 socksio
+                print(f"[HTTP] 代理 {url} 不可用，{pattern} 直连: {e}")
+        if any(mounts.values()):
+            print(f"[HTTP] 使用环境变量中的代理: {', '.join(p for p, t in mounts.items() if t is not None)}")
+        return mounts
+
+    def _on_request(self, request):
+        with self._lock:
+            self._requests += 1
+
+    def _on_connect(self):
+        with self._lock:
+            self._connects += 1
+
+    def release(self) -> int:
+        """关闭空闲连接（空闲回收），进行中的请求不受影响；下次请求时重新建连
+
+        Returns:
+            关闭的连接数
+        """
+        pool = self._pool
+        lock = getattr(pool, '_optional_thread_lock', None)
+        if lock is None or not hasattr(pool, '_connections') or not hasattr(pool, '_requests'):
+            return 0  # 当前 httpcore 版本无法区分空闲连接，宁可不回收也不打断请求
+        with lock:
+            # 已分配给请求但尚未开始收发的连接仍显示为空闲，一并排除
+            assigned = {id(r.connection) for r in pool._requests if r.connection is not None}
+            idle = [c for c in pool._connections if c.is_idle() and id(c) not in assigned]
+            for connection in idle:
+                pool._connections.remove(connection)
+        for connection in idle:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        return len(idle)
+
+    def stats(self) -> dict:
+        with self._lock:
+            requests, connects = self._requests, self._connects
+        stats = {
+            "协议": "HTTP/2 / HTTP/1.1" if self.http2 else "HTTP/1.1",
+            "请求": requests,
+        }
+        if self._counting:
+            reused = max(0, requests - connects)
+            stats["新建连接"] = connects
+            stats["连接复用"] = f"{reused} ({reused / requests:.0%})" if requests else "-"
+            stats["DNS 缓存"] = f"{self.dns.hits} 命中 / {self.dns.misses} 解析"
+        connections = list(getattr(self._pool, 'connections', []))
+        in_use = sum(1 for c in connections if not c.is_idle())
+        stats["连接池"] = (f"{in_use} 使用中 / {len(connections)} 个"
+                          f"（上限 {self.limits.max_connections}，占用 {in_use / self.limits.max_connections:.0%}）")
+        if self.http2:
+            stats["HTTP/2 连接"] = sum(1 for c in connections if "HTTP/2" in c.info())
+        return stats
+
+
+_options: dict = {}
+_transport: Optional[HttpTransport] = None
+_lock = threading.Lock()
+
+
+def configure(options: dict):
+    """设置连接参数（配置中的 http 段）；连接池创建之后的修改在重启后生效"""
+    global _options
+    with _lock:
+        if _transport is not None and options != _options:
+            print("[HTTP] 连接设置已修改，重启后生效")
+        _options = dict(options)
+
+
+def get_transport() -> HttpTransport:
+    """进程内共享的 HTTP 连接（首次调用时按 configure 的参数创建）"""
+    global _transport
+    with _lock:
+        if _transport is None:
+            _transport = HttpTransport(
+                http2=bool(_options.get('http2', True)),
+                max_connections=int(_options.get('max_connections', 20)),
+                max_keepalive=int(_options.get('max_keepalive', 10)),
+                keepalive=float(_options.get('keepalive_seconds', 90)),
+                dns_ttl=float(_options.get('dns_ttl_seconds', 300)),
+                proxy=_options.get('proxy') or None
+            )
+            diagnostics.register("HTTP 连接", _transport.stats)
+        return _transport
+
+
+def release():
+    """关闭共享连接池中的空闲连接（未创建时不做任何事）"""
+    if _transport is not None:
+        _transport.release()
@@ -0,0 +1,105 @@
+"""
+Idle Trimmer
+空闲内存回收 - 托盘常驻进程隐藏一段时间后释放缓存、连接池和隐藏的重量级窗口
+
+各模块通过 register 注册回收步骤；回收后执行 GC 并让系统回收空闲内存。
+被释放的资源在下次热键唤醒时按需重建。
+"""
+
+import gc
+import time
+from typing import Callable, List, Tuple
+
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+import diagnostics
+
+
+class IdleTrimmer(QObject):
+    """空闲回收调度器"""
+
+    trimmed = pyqtSignal(dict)  # 回收报告
+    resumed = pyqtSignal()  # 回收后恢复使用（调用方据此重建连接等资源）
+
+    def __init__(self, is_idle: Callable[[], bool], trim_after_minutes: float = 10, check_seconds: int = 30):
+        """初始化
+
+        Args:
+            is_idle: 判断当前是否空闲（如主窗口隐藏）
+            trim_after_minutes: 持续空闲多少分钟后回收
+            check_seconds: 检查间隔（秒）
+        """
+        super().__init__()
+        self.is_idle = is_idle
+        self.trim_after = trim_after_minutes * 60
+        self._steps: List[Tuple[str, Callable[[], None]]] = []
+        self._last_activity = time.monotonic()
+        self._trimmed = False
+        self.last_report = {}
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._check)
+        self._timer.start(check_seconds * 1000)
+
+        diagnostics.register("空闲回收", self.stats)
+
+    def register(self, name: str, step: Callable[[], None]):
+        """注册一个回收步骤"""
+        self._steps.append((name, step))
+
+    def activity(self):
+        """有用户活动（热键、显示窗口），重新计时；此前已回收时发出 resumed"""
+        trimmed = self._trimmed
+        self._last_activity = time.monotonic()
+        self._trimmed = False
+        if trimmed:
+            self.resumed.emit()
+
+    def _check(self):
+        if not self.is_idle():
+            # 兜底：从未调用 activity 的显示途径也能恢复，之后照常计时回收
+            self.activity()
+            return
+        if self._trimmed:
+            return
+        if time.monotonic() - self._last_activity >= self.trim_after:
+            self.trim()
+
+    def trim(self) -> dict:
+        """立即执行回收"""
+        start = time.perf_counter()
+        rss_before = diagnostics.current_rss()
+        failed = []
+        for name, step in self._steps:
+            try:
+                step()
+            except Exception as e:
+                failed.append(name)
+                print(f"[空闲回收] {name} 失败: {e}")
+        collected = gc.collect()
+        diagnostics.release_os_memory()
+        rss_after = diagnostics.current_rss()
+
+        self._trimmed = True
+        self.last_report = {
+            "时间": time.strftime('%Y-%m-%d %H:%M:%S'),
+            "回收前 RSS": diagnostics.format_bytes(rss_before),
+            "回收后 RSS": diagnostics.format_bytes(rss_after),
+            "GC 对象": collected,
+            "耗时": f"{(time.perf_counter() - start) * 1000:.1f} ms",
+            "失败步骤": ", ".join(failed) or "无",
+        }
+        print(f"[空闲回收] {self.last_report['回收前 RSS']} → {self.last_report['回收后 RSS']}")
+        self.trimmed.emit(self.last_report)
+        return self.last_report
+
+    def stats(self) -> dict:
+        idle_for = time.monotonic() - self._last_activity
+        stats = {
+            "空闲回收阈值": f"{self.trim_after / 60:g} 分钟",
+            "已空闲": f"{idle_for / 60:.1f} 分钟" if self.is_idle() else "否",
+            "已回收": "是" if self._trimmed else "否",
+        }
+        for key, value in self.last_report.items():
+            stats[f"上次{key}"] = value
+        return stats
@@ -0,0 +1,134 @@
+"""
+Input Stabilizer
+输入稳定检测 - 捕获到的文本稳定后才交给翻译，过滤输入法中间态和焦点切换带来的重复
+
+捕获循环每次轮询都调用 observe(文本, 焦点窗口)，满足以下任一条件时返回要发出的文本：
+- 稳定：文本在一段时间内没有变化。时长随打字节奏自适应（最近若干次变化间隔的中位数 × factor，
+  限制在 min_interval ~ max_interval 之间），打字快时等得短，停顿多时等得长
+- 句末：以句号、问号、叹号、省略号等结尾，立即发出
+- 增量：与上次发出的文本相比长度变化达到 min_delta 个字，不再等待稳定
+
+焦点切换后读到的文本如果就是该窗口（或全局）上次发出的文本，视为回弹，不再发出。
+统计被抑制的变化数与发出数之比（诊断信息「输入稳定」）。
+"""
+
+import time
+import statistics
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+import diagnostics
+
+
+# 句末标点（结尾的引号、括号不影响判断）
+SENTENCE_FINAL = "。！？!?…"
+CLOSING = "」』”’）)】》"
+
+
+def ends_sentence(text: str) -> bool:
+    """是否以句末标点结尾"""
+    stripped = text.rstrip().rstrip(CLOSING)
+    return bool(stripped) and stripped[-1] in SENTENCE_FINAL
+
+
+class InputStabilizer:
+    """输入稳定检测（线程安全）"""
+
+    def __init__(
+        self,
+        min_interval: float = 0.4,
+        max_interval: float = 1.5,
+        factor: float = 2.5,
+        min_delta: int = 12,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = "输入稳定",
+    ):
+        """初始化
+
+        Args:
+            min_interval / max_interval: 稳定时长的上下限（秒）
+            factor: 稳定时长 = 最近变化间隔中位数 × factor
+            min_delta: 相比上次发出增减多少个字时直接发出
+            clock: 时钟（回放和测试时可替换）
+            name: 诊断信息分节名
+        """
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.factor = factor
+        self.min_delta = min_delta
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._gaps = deque(maxlen=16)  # 最近的变化间隔（秒）
+        self._pending = ""
+        self._changed_at = 0.0
+        self._focus = None
+        self._last_emitted = ""
+        self._emitted_by_focus: Dict[object, str] = {}
+        self.counters = {"变化": 0, "发出": 0, "抑制": 0, "焦点回弹": 0, "稳定": 0, "句末": 0, "增量": 0}
+        diagnostics.register(name, self.stats)
+
+    def stable_interval(self) -> float:
+        """当前的稳定时长（秒）"""
+        if not self._gaps:
+            return self.max_interval
+        interval = statistics.median(self._gaps) * self.factor
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    def observe(self, text: str, focus=None) -> Optional[str]:
+        """每次轮询调用，返回需要发出的文本（没有则为 None）"""
+        now = self.clock()
+        with self._lock:
+            if focus != self._focus:
+                self._focus = focus
+                if text and text in (self._emitted_by_focus.get(focus), self._last_emitted):
+                    # 切回窗口后读到的还是发出过的内容，视为已发出
+                    self._pending = text
+                    self._last_emitted = text
+                    self._changed_at = now
+                    self.counters["焦点回弹"] += 1
+                    self.counters["抑制"] += 1
+                    return None
+
+            if text != self._pending:
+                if self._pending:
+                    self._gaps.append(min(now - self._changed_at, self.max_interval))
+                self._pending = text
+                self._changed_at = now
+                if not text or text == self._last_emitted:
+                    return None
+                self.counters["变化"] += 1
+                if ends_sentence(text):
+                    return self._emit(text, focus, "句末")
+                if abs(len(text) - len(self._last_emitted)) >= self.min_delta:
+                    return self._emit(text, focus, "增量")
+                # 先记为抑制，稳定后发出时再扣回
+                self.counters["抑制"] += 1
+                return None
+
+            if text and text != self._last_emitted and now - self._changed_at >= self.stable_interval():
+                self.counters["抑制"] -= 1
+                return self._emit(text, focus, "稳定")
+            return None
+
+    def _emit(self, text: str, focus, reason: str) -> str:
+        self._last_emitted = text
+        self._emitted_by_focus[focus] = text
+        self.counters["发出"] += 1
+        self.counters[reason] += 1
+        return text
+
+    def reset(self):
+        """清空状态（缓冲区被清空后，同样的文本可以再次发出）"""
+        with self._lock:
+            self._pending = ""
+            self._last_emitted = ""
+            self._emitted_by_focus.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+            emitted = stats["发出"]
+            stats["抑制/发出"] = f"{stats['抑制'] / emitted:.1f}" if emitted else "-"
+            stats["当前稳定时长"] = f"{self.stable_interval() * 1000:.0f} ms"
+        return stats
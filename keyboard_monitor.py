@@ -11,8 +11,6 @@ Windows UI Automation Text Capture
 import re
 import time
 import threading
-import ctypes
-import ctypes.wintypes as wintypes
 from typing import Callable, Optional
 
 # 尝试导入 uiautomation
@@ -23,8 +21,8 @@ except ImportError:
     HAS_UIAUTOMATION = False
     print("[警告] 未安装 uiautomation，将使用备用方案")
 
-# Windows API
-user32 = ctypes.windll.user32
+from platform_backend import get_backend
+from input_stabilizer import InputStabilizer
 
 # 中文字符 Unicode 范围
 CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff，。！？、；：""''【】《》（）—…·]+')
@@ -33,13 +31,15 @@ CHINESE_PATTERN = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff，。！
 class ChineseInputCapture:
     """中文输入实时捕获器 - 使用 UI Automation"""
     
-    def __init__(self, on_chinese_input: Callable[[str], None]):
+    def __init__(self, on_chinese_input: Callable[[str], None], stabilizer: Optional[InputStabilizer] = None):
         """初始化
         
         Args:
-            on_chinese_input: 捕获到中文时的回调函数
+            on_chinese_input: 捕获到中文时的回调函数（文本稳定后才调用）
+            stabilizer: 输入稳定检测，默认按打字节奏自适应
         """
         self.on_chinese_input = on_chinese_input
+        self.stabilizer = stabilizer or InputStabilizer()
         self._buffer = ""
         self._last_text = ""
         self._thread: Optional[threading.Thread] = None
@@ -92,45 +92,14 @@ class ChineseInputCapture:
             
         return ""
     
-    def _get_edit_text_via_win32(self) -> str:
-        """使用 Win32 API 获取编辑控件文本"""
-        try:
-            # 获取前台窗口
-            hwnd = user32.GetForegroundWindow()
-            if not hwnd:
-                return ""
-            
-            # 获取焦点控件
-            thread_id = user32.GetWindowThreadProcessId(hwnd, None)
-            user32.AttachThreadInput(ctypes.windll.kernel32.GetCurrentThreadId(), thread_id, True)
-            
-            focus_hwnd = user32.GetFocus()
-            
-            user32.AttachThreadInput(ctypes.windll.kernel32.GetCurrentThreadId(), thread_id, False)
-            
-            if not focus_hwnd:
-                return ""
-            
-            # 获取控件文本
-            length = user32.SendMessageW(focus_hwnd, 0x000E, 0, 0)  # WM_GETTEXTLENGTH
-            if length > 0:
-                buffer = ctypes.create_unicode_buffer(length + 1)
-                user32.SendMessageW(focus_hwnd, 0x000D, length + 1, buffer)  # WM_GETTEXT
-                return buffer.value
-                
-        except Exception as e:
-            pass
-            
-        return ""
-    
     def _monitor_loop(self):
         """监控循环"""
         print("[文本捕获] 监控循环启动")
         
         while self._running:
             try:
-                # 首先尝试 Win32 API（更可靠）
-                current_text = self._get_edit_text_via_win32()
+                # 首先尝试平台接口（Windows 上为 WM_GETTEXT，更可靠）
+                current_text = get_backend().focused_text()
                 
                 # 如果失败，尝试 UI Automation
                 if not current_text and HAS_UIAUTOMATION:
@@ -138,12 +107,14 @@ class ChineseInputCapture:
                 
                 # 提取中文
                 chinese = self._extract_chinese(current_text)
-                
-                # 检测变化
-                if chinese and chinese != self._buffer:
+                if chinese:
                     self._buffer = chinese
-                    print(f"[文本捕获] 检测到中文: {chinese}")
-                    self.on_chinese_input(chinese)
+                
+                # 每次轮询都交给稳定检测（计时在其中完成），稳定后才回调
+                stable = self.stabilizer.observe(chinese, get_backend().foreground_window())
+                if stable:
+                    print(f"[文本捕获] 检测到中文: {stable}")
+                    self.on_chinese_input(stable)
                     
             except Exception as e:
                 pass
@@ -172,6 +143,7 @@ class ChineseInputCapture:
     def clear_buffer(self):
         """清空缓冲区"""
         self._buffer = ""
+        self.stabilizer.reset()
         self.on_chinese_input("")
 
 
@@ -0,0 +1,295 @@
+"""
+Local Server
+本机 OpenAI 兼容接口 - 让脚本、IDE 插件等本机工具共用 AquaType 已预热的连接池、译文缓存和限流
+
+接口：
+- GET  /v1/models             可用模型：aquatype（主翻译目标）和 aquatype/<目标名>
+- POST /v1/chat/completions   取最后一条 user 消息作为原文翻译，支持 "stream": true (SSE)
+
+只监听 127.0.0.1；配置了 token 时要求 Authorization: Bearer <token>。
+网页也能向 127.0.0.1 发请求，因此不论是否配置 token 都拒绝：Host 不是 127.0.0.1:<port> /
+localhost:<port> 的请求（DNS 重绑定）、带 Origin 头的请求（浏览器发出），以及
+Content-Type 不是 application/json 的 POST（表单等无需预检的跨站请求）。
+同时向上游发出的请求数受 max_concurrent 限制，缓存命中不占名额。
+
+配置示例：
+"server": {"enabled": true, "port": 8765, "token": null, "max_concurrent": 8}
+
+调用示例：
+    from openai import OpenAI
+    client = OpenAI(base_url="http://127.0.0.1:8765/v1", api_key="local")
+    client.chat.completions.create(model="aquatype", messages=[{"role": "user", "content": "你好"}])
+"""
+
+import json
+import time
+import uuid
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import diagnostics
+from usage_tracker import estimate_tokens
+
+
+MODEL_PREFIX = "aquatype"
+
+# TranslationError.kind -> (HTTP 状态码, OpenAI 错误类型)
+ERROR_STATUS = {
+    "rate_limited": (429, "rate_limit_error"),
+    "timeout": (504, "timeout"),
+    "circuit_open": (503, "service_unavailable"),
+    "budget": (429, "insufficient_quota"),
+    "auth": (502, "upstream_auth_error"),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # 非流式响应保持连接复用
+    server_version = "AquaType"
+
+    def log_message(self, format, *args):
+        pass  # 不逐条打印访问日志
+
+    # ---- 响应工具 ----
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(self, status: int, message: str, error_type: str, code: Optional[str] = None):
+        self._send_json(status, {"error": {"message": message, "type": error_type, "code": code}})
+
+    def _write_chunk(self, payload: str):
+        data = payload.encode('utf-8')
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _write_event(self, body: dict):
+        self._write_chunk("data: " + json.dumps(body, ensure_ascii=False) + "\n\n")
+
+    # ---- 路由 ----
+
+    def _reject(self, status: int, message: str, code: Optional[str] = None):
+        """在读取请求体之前拒绝：关闭连接，未读的请求体不会被当成下一个请求"""
+        self.close_connection = True
+        self._send_error(status, message, "invalid_request_error", code)
+
+    def _trusted(self, post: bool) -> bool:
+        """拒绝来自网页的请求（见模块说明）"""
+        port = self.server.server_address[1]
+        if self.headers.get("Host", "").lower() not in (f"127.0.0.1:{port}", f"localhost:{port}"):
+            self._reject(403, "Host 必须是 127.0.0.1 或 localhost")
+            return False
+        if self.headers.get("Origin") is not None:
+            self._reject(403, "不接受浏览器发起的请求")
+            return False
+        content_type = self.headers.get("Content-Type", "").split(';')[0].strip().lower()
+        if post and content_type != "application/json":
+            self._reject(415, "Content-Type 必须是 application/json")
+            return False
+        return True
+
+    def _authorized(self) -> bool:
+        token = self.server.owner.token
+        if not token:
+            return True
+        if self.headers.get("Authorization", "") == f"Bearer {token}":
+            return True
+        self._reject(401, "无效的 token", "invalid_api_key")
+        return False
+
+    def do_GET(self):
+        if not self._trusted(post=False) or not self._authorized():
+            return
+        if self.path.rstrip('/') == "/v1/models":
+            models = [{"id": name, "object": "model", "owned_by": "aquatype"} for name in self.server.owner.models()]
+            self._send_json(200, {"object": "list", "data": models})
+        else:
+            self._send_error(404, f"未知路径 {self.path}", "invalid_request_error")
+
+    def do_POST(self):
+        if not self._trusted(post=True) or not self._authorized():
+            return
+        if self.path.rstrip('/') != "/v1/chat/completions":
+            self._send_error(404, f"未知路径 {self.path}", "invalid_request_error")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            messages = request["messages"]
+            text = next(m["content"] for m in reversed(messages) if m.get("role") == "user")
+            if not isinstance(text, str):
+                # 多段内容只取文本部分
+                text = "".join(part.get("text", "") for part in text if part.get("type") == "text")
+        except (ValueError, KeyError, TypeError, StopIteration):
+            self._send_error(400, "需要 messages，且至少包含一条 user 消息", "invalid_request_error")
+            return
+
+        owner = self.server.owner
+        model = request.get("model") or MODEL_PREFIX
+        target = owner.target_for(model)
+        if target is None:
+            self._send_error(404, f"未知模型 {model}，可用: {', '.join(owner.models())}",
+                             "invalid_request_error", "model_not_found")
+            return
+
+        if request.get("stream"):
+            self._stream(owner, text, target, model)
+        else:
+            self._complete(owner, text, target, model)
+
+    def _complete(self, owner, text, target, model):
+        try:
+            result, cache = owner.translate(text, target)
+        except Exception as e:
+            status, error_type = ERROR_STATUS.get(getattr(e, 'kind', ''), (502, "upstream_error"))
+            self._send_error(status, str(e), error_type, getattr(e, 'kind', None))
+            return
+        prompt_tokens = estimate_tokens(text)
+        completion_tokens = estimate_tokens(result)
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": result},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }, {"X-AquaType-Cache": cache})
+
+    def _stream(self, owner, text, target, model):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        base = {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+        }
+
+        # 只有写本连接失败才算本客户端断开；同文请求共用的翻译中其他客户端断开
+        # 引起的异常要当作普通错误，照常结束本连接的事件流
+        disconnected = []
+
+        def event(delta: dict, finish_reason=None):
+            try:
+                self._write_event(dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": finish_reason}]))
+            except (BrokenPipeError, ConnectionResetError):
+                disconnected.append(True)
+                raise
+
+        try:
+            event({"role": "assistant", "content": ""})
+            owner.translate(text, target, lambda delta: event({"content": delta}))
+            event({}, "stop")
+        except Exception as e:
+            if disconnected:
+                owner.count("客户端断开")
+                return
+            error = {"message": str(e), "type": getattr(e, 'kind', None) or "upstream_error"}
+        else:
+            error = None
+        try:
+            if error is not None:
+                # 响应头已发出，错误以事件形式告知客户端
+                self._write_event({"error": error})
+            self._write_chunk("data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            owner.count("客户端断开")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class LocalServer:
+    """本机 OpenAI 兼容服务"""
+
+    def __init__(self, service, port: int = 8765, token: Optional[str] = None, max_concurrent: int = 8):
+        """初始化
+
+        Args:
+            service: TranslationService（共享缓存、连接池和调度）
+            port: 监听端口（只监听 127.0.0.1）
+            token: 访问令牌，None 表示不校验
+            max_concurrent: 同时向上游发出的请求上限
+        """
+        self.service = service
+        self.token = token
+        self._upstream = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self.counters = {"请求": 0, "缓存命中": 0, "上游请求": 0, "失败": 0, "客户端断开": 0}
+        self._httpd = _Server(("127.0.0.1", port), _Handler)
+        self._httpd.owner = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self._httpd.server_address[1]
+
+    def count(self, name: str):
+        with self._lock:
+            self.counters[name] += 1
+
+    def models(self):
+        targets = self.service.translator.targets
+        return [MODEL_PREFIX] + [f"{MODEL_PREFIX}/{t.name}" for t in targets]
+
+    def target_for(self, model: str):
+        """模型名 -> 翻译目标"""
+        targets = self.service.translator.targets
+        if model == MODEL_PREFIX:
+            return targets[0]
+        name = model[len(MODEL_PREFIX) + 1:] if model.startswith(MODEL_PREFIX + "/") else None
+        return next((t for t in targets if t.name == name), None)
+
+    def translate(self, text: str, target, on_delta=None):
+        """翻译并返回 (译文, 缓存状态 hit / miss)"""
+        self.count("请求")
+        if self.service.contains(text, target):
+            self.count("缓存命中")
+            return self.service.translate(text, target, on_delta), "hit"
+        with self._upstream:
+            self.count("上游请求")
+            try:
+                return self.service.translate(text, target, on_delta, feature="server"), "miss"
+            except Exception:
+                self.count("失败")
+                raise
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="local-server", daemon=True)
+        self._thread.start()
+        diagnostics.register("本机接口", self.stats)
+        print(f"[本机接口] http://127.0.0.1:{self.port}/v1")
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        diagnostics.unregister("本机接口")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters)
+        stats["地址"] = f"http://127.0.0.1:{self.port}/v1"
+        return stats
@@ -7,55 +7,55 @@
 import sys
 import json
 import threading
-import ctypes
 import time
 import pyperclip
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout,
-    QLabel, QLineEdit, QPushButton, QShortcut, QGraphicsDropShadowEffect,
-    QSystemTrayIcon, QMenu, QAction, QFrame
+    QLabel, QLineEdit, QPushButton, QShortcut,
+    QSystemTrayIcon, QMenu, QAction, QFrame, QMessageBox
 )
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QPoint, QPropertyAnimation, QEasingCurve, QEvent
 from PyQt5.QtGui import QFont, QColor, QCursor, QIcon, QPixmap, QPainter, QLinearGradient
 from PyQt5.QtWidgets import QGraphicsOpacityEffect
 
-from translator import Translator
-from pynput.keyboard import Key, Controller as KeyboardController
-import keyboard  # 引入 keyboard 库代替 pynput 全局热键
-
-user32 = ctypes.windll.user32
-kernel32 = ctypes.windll.kernel32
-
-def _force_activate_window(hwnd):
-    """强制激活窗口（绕过 Windows 限制）"""
-    try:
-        current_thread_id = kernel32.GetCurrentThreadId()
-        foreground_hwnd = user32.GetForegroundWindow()
-        foreground_thread_id = user32.GetWindowThreadProcessId(foreground_hwnd, None)
-        
-        # 附着线程输入
-        if current_thread_id != foreground_thread_id:
-            user32.AttachThreadInput(foreground_thread_id, current_thread_id, True)
-            
-        # 强制置前
-        user32.SetForegroundWindow(hwnd)
-        user32.ShowWindow(hwnd, 9)  # SW_RESTORE
-        user32.BringWindowToTop(hwnd)
-        
-        # 解除附着
-        if current_thread_id != foreground_thread_id:
-            user32.AttachThreadInput(foreground_thread_id, current_thread_id, False)
-            
-    except Exception as e:
-        print(f"强制激活失败: {e}")
+import diagnostics
+import single_instance
+from translator import TranslationError
+from translation_service import get_service
+from config_manager import ConfigManager, ConfigError
+from history_store import HistoryStore
+from idle_trimmer import IdleTrimmer
+from stall_watchdog import StallWatchdog
+from hook_queue import HookEventQueue
+from platform_backend import get_backend, select_backend
+from session_trace import tracer, start_recording, stop_recording
+from ui import render_mode
+from ui.render_mode import render_manager, apply_shadow, rounded_mask
+from ui.stream_renderer import stream_renderer
 
 
 class FloatingTranslator(QWidget):
     """简洁长条翻译窗口"""
     
     translation_done = pyqtSignal(str, str)  # (original, translated)
+    translation_failed = pyqtSignal(str, str, str)  # (original, kind, message)
+    config_reloaded = pyqtSignal()  # 配置文件重新加载或切换方案
+    target_done = pyqtSignal(str, str)  # (target name, translated) 非主目标的译文
+    translation_refreshed = pyqtSignal(str, str, str)  # (original, target name, translated) 过期缓存重新翻译后的新译文
+    candidate_ready = pyqtSignal(str, str, str)  # (original, style name, translated) 流中完整出现的一个候选
+    candidates_done = pyqtSignal(str, object)  # (original, {style name: translated})
+    hotkey_pressed = pyqtSignal()  # 全局热键（从钩子工作线程发出）
+    show_requested = pyqtSignal()  # 再次启动 / 命令行唤起（从 IPC 线程发出）
     
-    def __init__(self):
+    def __init__(self, config_manager=None, translator=None, history=None, global_hotkey=True):
+        """初始化
+        
+        Args:
+            config_manager: 共享的配置管理器
+            translator: 指定翻译器（回放 / 基准时传入 MockTranslator）
+            history: 指定历史存储
+            global_hotkey: 是否注册全局热键
+        """
         super().__init__()
         
         self._pinned = True
@@ -65,29 +65,59 @@ class FloatingTranslator(QWidget):
         self._last_original = ""
         self._last_translated = ""
         
-        self.translator = Translator('config.json')
-        self.keyboard = KeyboardController()
+        if translator is None:
+            # 与其他窗口、托盘、命令行和本机接口共用一个翻译服务（缓存、调度、连接池）
+            self.service = get_service(config_manager)
+            translator = self.service.translator
+        else:
+            self.service = None  # 回放 / 基准：直接调用传入的翻译器，不经过缓存
+        self.translator = translator
+        self.config_manager = translator.config_manager
+        if self.config_manager is not None:
+            self.config_manager.subscribe(lambda config: self.config_reloaded.emit())
+        self.translator.warm_up()
+        self.history = history if history is not None else HistoryStore('history')
+        self.idle_trimmer = None  # 由 main() 按配置创建
         
         self._init_ui()
         self._setup_shortcuts()
 
-        self._setup_global_hotkey()
+        if global_hotkey:
+            self._setup_global_hotkey()
         self.translation_done.connect(self._show_result)
+        self.translation_failed.connect(self._show_error)
+        self.target_done.connect(self._show_target_result)
+        self.translation_refreshed.connect(self._on_translation_refreshed)
+        self.candidate_ready.connect(self._show_candidate)
+        self.candidates_done.connect(self._show_candidates_done)
+        self.show_requested.connect(self._wake_up)
 
     def _setup_global_hotkey(self):
         """设置全局快捷键 Ctrl+Space"""
-        def on_activate():
-            # 在主线程执行显示逻辑
-            QTimer.singleShot(0, self._wake_up)
+        # 钩子线程只入队，记录轨迹和唤醒窗口在工作线程 / 主线程完成
+        self._hotkey_events = HookEventQueue(self._on_hotkey_event, name="热键钩子")
+        self.hotkey_pressed.connect(self._wake_up)
             
-        # 使用 keyboard 库，suppress=False 确保不拦截按键（允许输入法切换）
+        # 使用 keyboard 库，suppress=False 确保不拦截按键（允许输入法切换）；
+        # 用到时才导入，无界面环境（回放、基准）不需要安装
         try:
-            keyboard.add_hotkey('ctrl+space', on_activate, suppress=False)
+            import keyboard
+            keyboard.add_hotkey('ctrl+space', self._hotkey_events.push, suppress=False)
         except Exception as e:
             print(f"热键注册失败: {e}")
+            
+    def _on_hotkey_event(self, timestamp):
+        tracer().record("hotkey")
+        self.hotkey_pressed.emit()
+
+    def mark_active(self):
+        """窗口被唤起（热键、命令行、托盘）：重新计算空闲时间，已回收时由 resumed 重新建连"""
+        if self.idle_trimmer is not None:
+            self.idle_trimmer.activity()
 
     def _wake_up(self):
         """唤醒窗口"""
+        self.mark_active()
         hwnd = int(self.winId())
         
         # 1. 确保窗口可见
@@ -96,7 +126,7 @@ class FloatingTranslator(QWidget):
             self.show()
             
         # 2. 强制激活
-        _force_activate_window(hwnd)
+        get_backend().activate_window(hwnd)
         
         # 3. Qt 层面再次确认
         self.raise_()
@@ -110,20 +140,20 @@ class FloatingTranslator(QWidget):
             Qt.WindowStaysOnTopHint |
             Qt.Tool
         )
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        # 性能模式下不使用透明背景，改用圆角遮罩
+        self._translucent = not render_manager().performance
+        if self._translucent:
+            self.setAttribute(Qt.WA_TranslucentBackground)
         
         # 主容器
         self.container = QWidget(self)
         self.container.setObjectName("container")
         
-        # 阴影
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(25)
-        shadow.setColor(QColor(100, 200, 255, 50))
-        shadow.setOffset(0, 5)
-        self.container.setGraphicsEffect(shadow)
+        # 阴影与渐变（性能模式下换成纯色、无阴影）
+        self._apply_render_mode()
+        render_manager().mode_changed.connect(self._apply_render_mode)
         
-        # 安装事件过滤器以处理焦点丢失
+        # 安装事件过滤器以处理焦点丢失（输入框上的用于轨迹记录按键时间）
         self.installEventFilter(self)
         
         # 样式
@@ -139,6 +169,10 @@ class FloatingTranslator(QWidget):
                 border-radius: 30px;
                 border: 1.5px solid rgba(255, 255, 255, 0.9);
             }
+            #container[lowCost="true"] {
+                background: rgb(215, 237, 255);
+                border: none;
+            }
             QLabel {
                 color: #2c5282;
                 font-family: "Microsoft YaHei", "Segoe UI";
@@ -164,6 +198,19 @@ class FloatingTranslator(QWidget):
                 font-weight: bold;
                 color: #4a5568;
             }
+            QPushButton#candidateBtn {
+                background-color: rgba(66, 153, 225, 0.3);
+                color: #2b6cb0;
+                padding: 4px 10px;
+                font-size: 12px;
+            }
+            QPushButton#candidateBtn:hover {
+                background-color: rgba(66, 153, 225, 0.5);
+            }
+            QPushButton#candidateBtn:disabled {
+                background-color: rgba(160, 174, 192, 0.3);
+                color: rgba(74, 85, 104, 0.5);
+            }
             QLineEdit {
                 background-color: rgba(255, 255, 255, 0.5);
                 border: 2px solid rgba(100, 180, 220, 0.4);
@@ -244,7 +291,8 @@ class FloatingTranslator(QWidget):
         
         # 主布局
         main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(8, 8, 8, 8)
+        margin = 8 if self._translucent else 0
+        main_layout.setContentsMargins(margin, margin, margin, margin)
         main_layout.addWidget(self.container)
         
         # 容器布局
@@ -266,6 +314,7 @@ class FloatingTranslator(QWidget):
         self.input_box.setPlaceholderText("输入中文，按 Enter 翻译...")
         self.input_box.textChanged.connect(self._on_text_changed)
         self.input_box.returnPressed.connect(self._on_translate_and_paste)
+        self.input_box.installEventFilter(self)
         top_row.addWidget(self.input_box, 1)
         
         # 状态
@@ -306,7 +355,33 @@ class FloatingTranslator(QWidget):
         
         self.container_layout.addLayout(top_row)
         
-        # 双语对照框
+        # 双语对照框在第一次出结果时创建，空闲回收时释放
+        self.comparison_box = None
+        self.target_labels = {}
+        # 多候选（口语 / 正式等）：风格名 -> 译文标签 / 粘贴按钮，以及本次已收到的候选
+        self.candidate_labels = {}
+        self._candidate_buttons = {}
+        self._candidates = {}
+        self.config_reloaded.connect(self._build_target_labels)
+        
+    def _apply_render_mode(self, mode=None):
+        """按当前渲染模式设置阴影和背景"""
+        apply_shadow(self.container, 25, QColor(100, 200, 255, 50), 5)
+        self.container.setProperty("lowCost", render_manager().performance)
+        self.container.style().unpolish(self.container)
+        self.container.style().polish(self.container)
+        
+    def resizeEvent(self, event):
+        """不透明窗口用圆角遮罩裁掉四角"""
+        if not self._translucent:
+            self.setMask(rounded_mask(self.rect(), 30))
+        super().resizeEvent(event)
+        
+    def _ensure_comparison_box(self) -> QFrame:
+        """返回双语对照框，不存在时创建"""
+        if self.comparison_box is not None:
+            return self.comparison_box
+        
         self.comparison_box = QFrame()
         self.comparison_box.setObjectName("comparisonBox")
         self.comparison_box.setMaximumHeight(150)  # 限制最大高度
@@ -335,19 +410,90 @@ class FloatingTranslator(QWidget):
         # 译文区域
         translated_container = QVBoxLayout()
         translated_container.setSpacing(4)
-        translated_title = QLabel("🇬🇧 译文")
-        translated_title.setObjectName("translatedTitle")
+        self.translated_title = QLabel("🇬🇧 译文")
+        self.translated_title.setObjectName("translatedTitle")
         self.translated_text = QLabel("")
         self.translated_text.setObjectName("comparisonLabel")
         self.translated_text.setWordWrap(True)
-        translated_container.addWidget(translated_title)
+        translated_container.addWidget(self.translated_title)
         translated_container.addWidget(self.translated_text)
         comparison_layout.addLayout(translated_container, 1)
         
+        # 其余翻译目标（日语、正式/口语等）依次排在主译文下方
+        self._translated_container = translated_container
+        self._target_widgets = []
+        self.target_labels = {}
+        self._build_target_labels()
+        
         self.container_layout.addWidget(self.comparison_box)
         
-        # 初始隐藏对照框
         self.comparison_box.hide()
+        return self.comparison_box
+        
+    def _drop_comparison_box(self):
+        """空闲回收：释放隐藏中的对照框，下次出结果时重建"""
+        if self.comparison_box is None or self.isVisible():
+            return
+        self.container_layout.removeWidget(self.comparison_box)
+        self.comparison_box.deleteLater()
+        self.comparison_box = None
+        self.target_labels = {}
+        self._target_widgets = []
+        
+    def _build_target_labels(self):
+        """按配置的翻译目标重建对照框中的译文标签"""
+        if self.comparison_box is None:
+            return
+        for widget in self._target_widgets:
+            self._translated_container.removeWidget(widget)
+            widget.deleteLater()
+        self._target_widgets = []
+        self.target_labels = {}
+        self.candidate_labels = {}
+        self._candidate_buttons = {}
+        
+        targets = self.translator.targets
+        self.translated_title.setText(targets[0].label)
+        # 启用多候选时主目标按风格分行显示，每行带粘贴按钮
+        styles = self._candidate_styles()
+        self.translated_title.setVisible(not styles)
+        self.translated_text.setVisible(not styles)
+        for i, style in enumerate(styles):
+            row = QWidget()
+            row_layout = QVBoxLayout(row)
+            row_layout.setContentsMargins(0, 0, 0, 0)
+            row_layout.setSpacing(4)
+            header = QHBoxLayout()
+            title = QLabel(style.label)
+            title.setObjectName("translatedTitle")
+            button = QPushButton(f"粘贴 Alt+{i + 1}")
+            button.setObjectName("candidateBtn")
+            button.setCursor(Qt.PointingHandCursor)
+            button.setEnabled(False)
+            button.clicked.connect(lambda checked, name=style.name: self._paste_candidate(name))
+            header.addWidget(title)
+            header.addStretch()
+            header.addWidget(button)
+            label = QLabel("")
+            label.setObjectName("comparisonLabel")
+            label.setWordWrap(True)
+            row_layout.addLayout(header)
+            row_layout.addWidget(label)
+            self._translated_container.addWidget(row)
+            self._target_widgets.append(row)
+            self.candidate_labels[style.name] = label
+            self._candidate_buttons[style.name] = button
+        for target in targets[1:]:
+            title = QLabel(target.label)
+            title.setObjectName("translatedTitle")
+            label = QLabel("")
+            label.setObjectName("comparisonLabel")
+            label.setWordWrap(True)
+            self._translated_container.addWidget(title)
+            self._translated_container.addWidget(label)
+            self._target_widgets += [title, label]
+            self.target_labels[target.name] = label
+        self.comparison_box.setMaximumHeight(150 + 90 * (len(targets) - 1) + 90 * max(len(styles) - 1, 0))
         
     def _setup_shortcuts(self):
         paste = QShortcut(Qt.CTRL + Qt.Key_Return, self)
@@ -356,6 +502,11 @@ class FloatingTranslator(QWidget):
         esc = QShortcut(Qt.Key_Escape, self)
         esc.activated.connect(self.close)
         
+        # Alt+数字：粘贴对应的候选译文
+        for i in range(9):
+            shortcut = QShortcut(Qt.ALT + Qt.Key_1 + i, self)
+            shortcut.activated.connect(lambda i=i: self._paste_candidate_at(i))
+        
     def _toggle_pin(self):
         self._pinned = not self._pinned
         if self._pinned:
@@ -377,8 +528,8 @@ class FloatingTranslator(QWidget):
             self.auto_paste_btn.setObjectName("autoPasteBtnOff")
         self.auto_paste_btn.setStyle(self.auto_paste_btn.style())
         
-    def _on_text_changed(self):
-        pass
+    def _on_text_changed(self, text):
+        tracer().record("text", text=text)
         
     def _on_translate_and_paste(self):
         text = self.input_box.text().strip()
@@ -386,24 +537,206 @@ class FloatingTranslator(QWidget):
             self.status_label.setText("请输入")
             return
         
+        tracer().record("submit", text=text)
         self._last_original = text
         self.status_label.setText("翻译中...")
         self.action_btn.setEnabled(False)
-        threading.Thread(target=self._do_translate, args=(text,), daemon=True).start()
+        self._ensure_comparison_box()
+        for label in self.target_labels.values():
+            label.setText("⏳")
+        self._candidates = {}
+        for name, label in self.candidate_labels.items():
+            label.setText("⏳")
+            self._candidate_buttons[name].setEnabled(False)
+        if self.candidate_labels:
+            self.translated_text.hide()  # 上次失败时显示过错误信息
+        
+        # 译文边生成边显示：增量按帧率合并后刷到标签上
+        widgets = dict(self.target_labels)
+        widgets[self.translator.targets[0].name] = self.translated_text
+        renderer = stream_renderer()
+        for widget in widgets.values():
+            renderer.begin(widget, self._on_stream_update)
+        threading.Thread(target=self._do_translate, args=(text, widgets), daemon=True).start()
+        
+    def _on_stream_update(self, text):
+        """流式刷新后：第一帧时显示对照框，之后随译文变长调整高度"""
+        if self.comparison_box.isHidden():
+            self.original_text.setText(self._last_original)
+            self.comparison_box.show()
+        self.setMinimumHeight(0)
+        self.setMaximumHeight(16777215)
+        self.adjustSize()
+        
+    def _candidate_styles(self):
+        return getattr(self.translator, 'candidate_styles', None) or []
+        
+    def _do_translate(self, text, widgets=None):
+        """并发翻译所有目标，译文流式显示，每个目标完成后立即显示最终结果"""
+        widgets = widgets or {}
+        renderer = stream_renderer()
+        primary = self.translator.targets[0].name
+        
+        # 多候选：主目标单独一次请求拿到全部风格，其余目标照常翻译
+        pending = list(self.translator.targets)
+        styles = self._candidate_styles()
+        if styles:
+            pending = pending[1:]
+            threading.Thread(target=self._do_translate_candidates, args=(text, styles), daemon=True).start()
+            if not pending:
+                return
+        
+        trace = tracer()
+        request_id = trace.next_id()
+        trace.record("request", id=request_id, text=text)
+        
+        def on_result(target, result, error):
+            if target.name == primary:
+                if error:
+                    trace.record("response", id=request_id, ok=False, error=error.kind)
+                    print(f"[翻译] 失败 ({error.kind}): {error}")
+                    self.translation_failed.emit(text, error.kind, str(error))
+                else:
+                    trace.record("response", id=request_id, ok=True, text=result)
+                    self.translation_done.emit(text, result)
+            else:
+                self.target_done.emit(target.name, f"❌ {error}" if error else result)
+        
+        def on_delta(target, delta):
+            widget = widgets.get(target.name)
+            if widget is not None:
+                renderer.feed(widget, delta)
+        
+        # 命中缓存的目标立即显示（过期的在后台重新翻译，有变化时再悄悄更新）
+        if self.service is not None:
+            for target in list(pending):
+                result = self.service.cached(
+                    text, target,
+                    lambda fresh, name=target.name: self.translation_refreshed.emit(text, name, fresh)
+                )
+                if result is not None:
+                    pending.remove(target)
+                    on_result(target, result, None)
+            if not pending:
+                return
+        
+        served = {}  # 目标名 -> 实际给出译文的模型（启用路由时各目标可能不同）
+        
+        def on_translated(target, result, error):
+            if self.service is not None and not error:
+                self.service.store(text, result, target, model=served.get(target.name))
+            on_result(target, result, error)
         
-    def _do_translate(self, text):
         try:
-            result = self.translator.translate(text)
-            self.translation_done.emit(text, result)
+            self.translator.translate_targets(
+                text, on_translated, on_delta, pending,
+                on_model=lambda target, model: served.__setitem__(target.name, model)
+            )
         except Exception as e:
-            self.translation_done.emit(text, f"错误: {e}")
+            self.translation_failed.emit(text, "error", f"错误: {e}")
+            
+    def _do_translate_candidates(self, text, styles):
+        """一次请求生成所有候选，每个候选完整出现时立即显示"""
+        trace = tracer()
+        request_id = trace.next_id()
+        trace.record("request", id=request_id, text=text)
+        try:
+            results = self.translator.translate_candidates(
+                text, styles,
+                on_candidate=lambda name, result: self.candidate_ready.emit(text, name, result)
+            )
+        except TranslationError as e:
+            trace.record("response", id=request_id, ok=False, error=e.kind)
+            print(f"[翻译] 失败 ({e.kind}): {e}")
+            self.translation_failed.emit(text, e.kind, str(e))
+            return
+        except Exception as e:
+            self.translation_failed.emit(text, "error", f"错误: {e}")
+            return
+        trace.record("response", id=request_id, ok=True, text=json.dumps(results, ensure_ascii=False))
+        self.candidates_done.emit(text, results)
+        
+    def _show_candidate(self, original, name, result):
+        if original != self._last_original or name not in self.candidate_labels:
+            return
+        self._candidates[name] = result
+        self.candidate_labels[name].setText(result)
+        self._candidate_buttons[name].setEnabled(True)
+        self._on_stream_update(result)
+        
+    def _show_candidates_done(self, original, results):
+        """全部候选到齐：记入历史（第一种风格），等待用户选择粘贴哪一个"""
+        if original != self._last_original:
+            return
+        self.action_btn.setEnabled(True)
+        stream_renderer().finish(self.translated_text)
+        if not results:
+            self._show_error(original, "error", "没有得到候选译文")
+            return
+        for name, result in results.items():
+            self._show_candidate(original, name, result)
+        self._last_translated = next(iter(results.values()))
+        self.history.append(original, self._last_translated)
+        self.status_label.setText("选择要粘贴的译文（Alt+数字）")
+        self.input_box.setFocus()
+        
+    def _paste_candidate_at(self, index):
+        styles = self._candidate_styles()
+        if index < len(styles):
+            self._paste_candidate(styles[index].name)
+        
+    def _paste_candidate(self, name):
+        """复制选中的候选；自动粘贴开启时粘贴到之前的窗口"""
+        result = self._candidates.get(name)
+        if not result:
+            return
+        self._last_translated = result
+        pyperclip.copy(result)
+        if self._auto_paste:
+            self.status_label.setText("粘贴中...")
+            self._fade_out_and_paste()
+        else:
+            self.status_label.setText("已复制")
+            self.input_box.clear()
+            self.input_box.setFocus()
+        
+    def _on_translation_refreshed(self, original, name, result):
+        """后台重新翻译出的新译文：仍在显示同一原文时替换，不重新粘贴"""
+        if original != self._last_original or self.comparison_box is None:
+            return
+        if name == self.translator.targets[0].name:
+            self._last_translated = result
+            self.translated_text.setText(result)
+        elif name in self.target_labels:
+            self.target_labels[name].setText(result)
+        else:
+            return
+        self.status_label.setText("译文已更新")
+        self.adjustSize()
+        
+    def _show_target_result(self, name, result):
+        """显示非主目标的译文"""
+        label = self.target_labels.get(name)
+        if label is None:
+            return
+        stream_renderer().finish(label)
+        label.setText(result)
+        if self.comparison_box.isHidden():
+            self.original_text.setText(self._last_original)
+            self.comparison_box.show()
+        self.setMinimumHeight(0)
+        self.setMaximumHeight(16777215)
+        self.adjustSize()
             
     def _show_result(self, original, result):
         self.action_btn.setEnabled(True)
         self._last_original = original
         self._last_translated = result
+        self.history.append(original, result)
         
         # 更新对照框
+        self._ensure_comparison_box()
+        stream_renderer().finish(self.translated_text)
         self.original_text.setText(original)
         self.translated_text.setText(result)
         self.comparison_box.show()
@@ -424,8 +757,27 @@ class FloatingTranslator(QWidget):
             self.input_box.clear()
             self.input_box.setFocus()
     
+    def _show_error(self, original, kind, message):
+        """显示翻译错误（不复制、不粘贴）"""
+        self.action_btn.setEnabled(True)
+        self._ensure_comparison_box()
+        stream_renderer().finish(self.translated_text)
+        self.original_text.setText(original)
+        self.translated_text.setText(f"❌ {message}")
+        self.translated_text.show()
+        self.comparison_box.show()
+        self.setMinimumHeight(0)
+        self.setMaximumHeight(16777215)
+        self.adjustSize()
+        self.status_label.setText("超时" if kind == "timeout" else "失败")
+        self.input_box.setFocus()
+    
     def _fade_out_and_paste(self):
         """淡出动画后执行粘贴"""
+        if render_manager().performance:
+            self._on_fade_out_done()
+            return
+        
         # 创建透明度效果
         self._opacity_effect = QGraphicsOpacityEffect(self)
         self.setGraphicsEffect(self._opacity_effect)
@@ -437,6 +789,7 @@ class FloatingTranslator(QWidget):
         self._fade_anim.setEndValue(0.0)
         self._fade_anim.setEasingCurve(QEasingCurve.OutQuad)
         self._fade_anim.finished.connect(self._on_fade_out_done)
+        render_manager().watch_animation(self._fade_anim)
         self._fade_anim.start()
     
     def _on_fade_out_done(self):
@@ -449,17 +802,18 @@ class FloatingTranslator(QWidget):
     def _do_paste(self):
         """执行粘贴"""
         time.sleep(0.1)
-        self.keyboard.press(Key.ctrl)
-        time.sleep(0.05)
-        self.keyboard.press('v')
-        time.sleep(0.05)
-        self.keyboard.release('v')
-        self.keyboard.release(Key.ctrl)
+        get_backend().paste()
+        tracer().record("paste")
         print("[粘贴] 完成")
         QTimer.singleShot(200, self._fade_in_show)
         
     def _fade_in_show(self):
         """淡入显示窗口"""
+        if render_manager().performance:
+            self.show()
+            self._on_fade_in_done()
+            return
+        
         # 先设置透明
         self._opacity_effect = QGraphicsOpacityEffect(self)
         self._opacity_effect.setOpacity(0.0)
@@ -473,6 +827,7 @@ class FloatingTranslator(QWidget):
         self._fade_anim.setEndValue(1.0)
         self._fade_anim.setEasingCurve(QEasingCurve.InQuad)
         self._fade_anim.finished.connect(self._on_fade_in_done)
+        render_manager().watch_animation(self._fade_anim)
         self._fade_anim.start()
     
     def _on_fade_in_done(self):
@@ -499,6 +854,10 @@ class FloatingTranslator(QWidget):
         self.hide()
 
     def eventFilter(self, obj, event):
+        if obj is self.input_box:
+            if event.type() == QEvent.KeyPress:
+                tracer().record("key")
+            return False
         # 监听窗口失焦事件（非置顶模式下自动隐藏）
         if obj == self and event.type() == QEvent.WindowDeactivate:
             if not self._pinned and self.isVisible():
@@ -513,6 +872,8 @@ class FloatingTranslator(QWidget):
 class SystemTray:
     def __init__(self, window):
         self.window = window
+        self._history_window = None
+        self._main_window = None
         
         pixmap = QPixmap(64, 64)
         pixmap.fill(QColor(0, 0, 0, 0))
@@ -538,6 +899,29 @@ class SystemTray:
         show_action.triggered.connect(self._show_window)
         menu.addAction(show_action)
         
+        main_window_action = QAction("主控制窗口", menu)
+        main_window_action.triggered.connect(self._show_main_window)
+        menu.addAction(main_window_action)
+        
+        history_action = QAction("历史记录", menu)
+        history_action.triggered.connect(self._show_history)
+        menu.addAction(history_action)
+        
+        diagnostics_action = QAction("诊断信息", menu)
+        diagnostics_action.triggered.connect(self._show_diagnostics)
+        menu.addAction(diagnostics_action)
+        
+        if getattr(self.window.translator, 'usage', None) is not None:
+            usage_action = QAction("用量报告", menu)
+            usage_action.triggered.connect(self._show_usage)
+            menu.addAction(usage_action)
+        
+        # 配置方案子菜单（配置重新加载后重建）
+        self.profile_menu = menu.addMenu("配置方案")
+        self._rebuild_profile_menu()
+        self.window.config_reloaded.connect(self._rebuild_profile_menu)
+        self.window.config_reloaded.connect(self._update_main_window)
+        
         quit_action = QAction("退出", menu)
         quit_action.triggered.connect(self._quit)
         menu.addAction(quit_action)
@@ -550,25 +934,201 @@ class SystemTray:
             self._show_window()
             
     def _show_window(self):
+        self.window.mark_active()
         self.window.show()
         self.window.activateWindow()
         self.window.input_box.setFocus()
         
+    def _rebuild_profile_menu(self):
+        self.profile_menu.clear()
+        active = self.window.config_manager.active_profile
+        for name, profile in self.window.config_manager.profiles.items():
+            action = QAction(f"{name} ({profile['model']})", self.profile_menu)
+            action.setCheckable(True)
+            action.setChecked(name == active)
+            action.triggered.connect(lambda checked, n=name: self._switch_profile(n))
+            self.profile_menu.addAction(action)
+        
+    def _switch_profile(self, name):
+        try:
+            self.window.translator.switch_profile(name)
+        except ConfigError as e:
+            self.tray.showMessage("配置方案", str(e))
+            
+    def _show_history(self):
+        if self._history_window is None:
+            from ui.history_window import HistoryWindow
+            self._history_window = HistoryWindow(self.window.history)
+        self._history_window.open()
+        
+    def _show_main_window(self):
+        """主控制窗口：粘贴翻译、长文档模式（与悬浮窗共用翻译服务）"""
+        if self._main_window is None:
+            from ui.main_window import MainWindow
+            config_manager = self.window.config_manager
+            self._main_window = MainWindow(get_service(config_manager), document=config_manager.get('document'))
+        self.window.mark_active()
+        self._main_window.show()
+        self._main_window.raise_()
+        self._main_window.activateWindow()
+        
+    def _update_main_window(self):
+        """配置重新加载后更新长文档模式参数"""
+        if self._main_window is not None:
+            self._main_window.document_config = self.window.config_manager.get('document') or {}
+        
+    def _drop_main_window(self):
+        """空闲回收：释放隐藏中的主控制窗口"""
+        if self._main_window is not None and not self._main_window.isVisible():
+            self._main_window.cancel_document()
+            self._main_window.deleteLater()
+            self._main_window = None
+        
+    def _drop_history_window(self):
+        """空闲回收：释放隐藏中的历史窗口"""
+        if self._history_window is not None and not self._history_window.isVisible():
+            self._history_window.deleteLater()
+            self._history_window = None
+        
+    def _show_diagnostics(self):
+        QMessageBox.information(None, "诊断信息", diagnostics.report())
+        
+    def _show_usage(self):
+        QMessageBox.information(None, "用量报告", self.window.translator.usage.report())
+        
     def _quit(self):
         self.tray.hide()
+        self.window.history.close()
+        usage = getattr(self.window.translator, 'usage', None)
+        if usage is not None:
+            usage.save()
+        stop_recording()
         QApplication.quit()
         
     def show(self):
         self.tray.show()
 
 
+def _forward_to_running_instance() -> bool:
+    """已有实例运行时让它显示悬浮窗（对方可能还在启动，稍等重试）"""
+    for _ in range(20):
+        reply = single_instance.send({"cmd": "activate"})
+        if reply is not None:
+            return True
+        time.sleep(0.1)
+    return False
+
+
 def main():
+    # 单实例：再次启动时唤起已运行的实例后退出
+    instance = single_instance.claim()
+    if instance is None:
+        if _forward_to_running_instance():
+            print("翻译助手已在运行，已唤起悬浮窗")
+        else:
+            print("翻译助手已在运行，但没有响应")
+        return
+    
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
     
-    window = FloatingTranslator()
+    config_manager = ConfigManager('config.json')
+    config_manager.start()
+    select_backend(config_manager.get('platform', 'auto'))
+    
+    # GUI 线程卡顿监测（调用栈和时长写入日志，托盘「诊断信息」中有直方图）
+    watchdog_config = config_manager.get('watchdog') or {}
+    if watchdog_config.get('enabled', True):
+        watchdog = StallWatchdog(
+            threshold_ms=float(watchdog_config.get('threshold_ms', 50)),
+            log_dir=watchdog_config.get('log_dir', 'logs/stalls')
+        )
+        watchdog.start()
+        app.aboutToQuit.connect(watchdog.stop)
+    
+    # 会话轨迹记录（配置 trace.enabled 或命令行 --trace）
+    trace_config = config_manager.get('trace') or {}
+    if trace_config.get('enabled') or '--trace' in sys.argv:
+        start_recording(trace_config.get('dir', 'logs/traces'), source="floating")
+    
+    # 渲染模式需在创建窗口前确定
+    render_mode.configure(
+        config_manager.get('render_mode', render_mode.AUTO),
+        float(config_manager.get('frame_budget_ms', 33))
+    )
+    stream_renderer().set_rate(float(config_manager.get('stream_render_hz', 30)))
+    
+    window = FloatingTranslator(config_manager)
     tray = SystemTray(window)
     
+    # 隐藏一段时间后释放对照框、历史窗口、历史块缓存、多余的译文缓存和连接池
+    idle_config = config_manager.get('idle') or {}
+    trim_after = float(idle_config.get('trim_after_minutes', 10))
+    if trim_after > 0:
+        trimmer = IdleTrimmer(lambda: not window.isVisible(), trim_after)
+        trimmer.register("对照框", window._drop_comparison_box)
+        trimmer.register("历史窗口", tray._drop_history_window)
+        trimmer.register("主控制窗口", tray._drop_main_window)
+        trimmer.register("历史缓存", window.history.trim)
+        cache_floor = int(idle_config.get('cache_keep_entries', 200))
+        trimmer.register("译文缓存", lambda: window.service.trim(cache_floor))
+        trimmer.register("连接池", window.translator.release_pools)
+        # 空闲回收关闭了连接池，趁用户输入时后台重新建连
+        trimmer.resumed.connect(window.translator.warm_up)
+        window.idle_trimmer = trimmer
+    
+    # 悬浮窗、托盘、命令行和本机接口共用一个翻译服务（缓存、去重、调度、连接池）
+    service = get_service(config_manager)
+    
+    def translate_command(message):
+        name = message.get('target')
+        targets = window.translator.targets
+        target = next((t for t in targets if t.name == name), None) if name else targets[0]
+        if target is None:
+            raise ValueError(f"未知翻译目标 {name}，可用: {', '.join(t.name for t in targets)}")
+        return service.translate(message['text'], target, feature="cli")
+    
+    # 跨线程信号排队到 GUI 线程执行
+    instance.register("activate", lambda message: window.show_requested.emit())
+    instance.register("translate", translate_command)
+    instance.start()
+    app.aboutToQuit.connect(instance.stop)
+    
+    # 本机 OpenAI 兼容接口（共用连接池、缓存和限流）
+    server_config = config_manager.get('server') or {}
+    if server_config.get('enabled'):
+        from local_server import LocalServer
+        try:
+            server = LocalServer(
+                service,
+                port=int(server_config.get('port', 8765)),
+                token=server_config.get('token'),
+                max_concurrent=int(server_config.get('max_concurrent', 8))
+            )
+            server.start()
+        except OSError as e:
+            print(f"[本机接口] 启动失败: {e}")
+    
+    # 剪贴板预翻译属于整个程序（不依赖任何窗口）：按 speculative 配置启停，只在运行时出现在诊断信息中
+    clipboard = {"config": None, "watcher": None}
+    
+    def update_clipboard_watcher():
+        speculative = config_manager.get('speculative') or {}
+        config = speculative if speculative.get('enabled') else None
+        if config == clipboard["config"]:
+            return
+        if clipboard["watcher"] is not None:
+            clipboard["watcher"].stop()
+            clipboard["watcher"].deleteLater()
+            clipboard["watcher"] = None
+        if config is not None:
+            from ui.clipboard_watcher import ClipboardWatcher
+            clipboard["watcher"] = ClipboardWatcher(service, config, app)
+        clipboard["config"] = config
+    
+    update_clipboard_watcher()
+    window.config_reloaded.connect(update_clipboard_watcher)
+    
     # 动态计算窗口大小 - 屏幕宽度的 1/3
     screen = app.primaryScreen().geometry()
     window_width = int(screen.width() / 3)
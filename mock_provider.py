@@ -0,0 +1,211 @@
+"""
+Mock Provider
+模拟翻译服务 + 虚拟时钟，用于无网络的回放、基准和 CI
+
+- VirtualClock: 按 (时间, 序号) 顺序执行计划任务，时间只在 advance_to 时前进
+- VirtualTimer: QTimer 的子集接口（单次触发），挂在虚拟时钟上
+- MockTranslator: 与 Translator 接口一致；延迟和译文可按原文取自录制的轨迹，
+  否则按文本长度确定性地计算。传入虚拟时钟时异步完成，否则真实 sleep。
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+from translation_cache import prompt_version
+
+
+class _Signal:
+    """极简信号，只支持 connect / emit"""
+
+    def __init__(self):
+        self._slots: List[Callable] = []
+
+    def connect(self, slot: Callable):
+        self._slots.append(slot)
+
+    def emit(self, *args):
+        for slot in list(self._slots):
+            slot(*args)
+
+
+class VirtualClock:
+    """虚拟时钟（毫秒）"""
+
+    def __init__(self, start_ms: float = 0.0):
+        self.now_ms = start_ms
+        self._queue = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def call_at(self, when_ms: float, callback: Callable[[], None]) -> list:
+        """在虚拟时间 when_ms 执行 callback，返回可用于 cancel 的句柄"""
+        entry = [max(when_ms, self.now_ms), next(self._seq), callback]
+        with self._lock:
+            heapq.heappush(self._queue, entry)
+        return entry
+
+    def call_later(self, delay_ms: float, callback: Callable[[], None]) -> list:
+        return self.call_at(self.now_ms + delay_ms, callback)
+
+    @staticmethod
+    def cancel(entry: list):
+        entry[2] = None
+
+    def advance_to(self, when_ms: float):
+        """前进到 when_ms，依次执行到期的任务（任务中新加入的到期任务也会执行）"""
+        while True:
+            with self._lock:
+                if not self._queue or self._queue[0][0] > when_ms:
+                    break
+                due, _, callback = heapq.heappop(self._queue)
+            self.now_ms = due
+            if callback is not None:
+                callback()
+        self.now_ms = max(self.now_ms, when_ms)
+
+    def run_until_idle(self, limit_ms: float = 600000):
+        """执行所有剩余任务（最多前进 limit_ms）"""
+        with self._lock:
+            last = max((e[0] for e in self._queue), default=self.now_ms)
+        self.advance_to(min(last, self.now_ms + limit_ms))
+
+
+class VirtualTimer:
+    """挂在虚拟时钟上的单次定时器，接口同 QTimer 常用部分"""
+
+    def __init__(self, clock: VirtualClock):
+        self.clock = clock
+        self.timeout = _Signal()
+        self._entry = None
+        self._interval = 0
+
+    def setSingleShot(self, single: bool):
+        pass
+
+    def start(self, interval_ms: Optional[int] = None):
+        self.stop()
+        if interval_ms is not None:
+            self._interval = interval_ms
+        self._entry = self.clock.call_later(self._interval, self._fire)
+
+    def stop(self):
+        if self._entry is not None:
+            VirtualClock.cancel(self._entry)
+            self._entry = None
+
+    def isActive(self) -> bool:
+        return self._entry is not None
+
+    def interval(self) -> int:
+        return self._interval
+
+    def _fire(self):
+        self._entry = None
+        self.timeout.emit()
+
+
+class MockTarget(NamedTuple):
+    """与 translator.TranslationTarget 字段一致"""
+    name: str
+    label: str
+    system_prompt: str
+
+
+class MockTranslator:
+    """确定性的模拟翻译服务（无网络）"""
+
+    config_manager = None
+    model = "mock"
+
+    def __init__(
+        self,
+        clock: Optional[VirtualClock] = None,
+        base_latency_ms: float = 300.0,
+        per_char_ms: float = 15.0,
+        recorded: Optional[List[dict]] = None
+    ):
+        """初始化
+
+        Args:
+            clock: 虚拟时钟；为 None 时真实 sleep
+            base_latency_ms: 基础延迟
+            per_char_ms: 每个字符增加的延迟
+            recorded: 录制的请求（session_trace.iter_requests 的结果），按原文匹配复用其延迟和译文
+        """
+        self.clock = clock
+        self.base_latency_ms = base_latency_ms
+        self.per_char_ms = per_char_ms
+        self.targets = [MockTarget("en", "🇬🇧 译文", "")]
+        self._recorded = list(recorded or [])
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.scheduled = 0
+
+    def _next(self, text: str):
+        """下一次请求的 (延迟毫秒, 译文)"""
+        with self._lock:
+            self.requests += 1
+            for i, item in enumerate(self._recorded):
+                if item['text'] == text:
+                    del self._recorded[i]
+                    return item['latency_ms'], item['result']
+        return self.base_latency_ms + self.per_char_ms * len(text), f"[mock] {text}"
+
+    def warm_up(self):
+        pass
+
+    def serving_models(self):
+        return {self.model}
+
+    def target_version(self, target) -> str:
+        return prompt_version(target.system_prompt)
+
+    def translate(
+        self,
+        chinese_text: str,
+        target=None,
+        model: Optional[str] = None,
+        feature: Optional[str] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        on_model: Optional[Callable[[str], None]] = None
+    ) -> str:
+        """同步翻译（真实 sleep 模拟延迟）"""
+        if not chinese_text.strip():
+            return ""
+        latency_ms, result = self._next(chinese_text)
+        time.sleep(latency_ms / 1000)
+        if on_delta:
+            on_delta(result)
+        if on_model:
+            on_model(self.model)
+        return result
+
+    def translate_async(self, chinese_text: str, callback: Callable[[str], None]):
+        """在虚拟时钟上异步完成，到期后调用 callback(译文)"""
+        latency_ms, result = self._next(chinese_text)
+        self.clock.call_later(latency_ms, lambda: callback(result))
+        with self._lock:
+            self.scheduled += 1
+
+    def translate_targets(self, chinese_text: str, on_result=None, on_delta=None, targets=None,
+                          on_model=None) -> Dict[str, str]:
+        """与 Translator.translate_targets 一致；有虚拟时钟时异步完成并立即返回空结果"""
+        results = {}
+        for target in (self.targets if targets is None else targets):
+            if self.clock is not None:
+                self.translate_async(
+                    chinese_text,
+                    lambda result, t=target: on_result and on_result(t, result, None)
+                )
+                continue
+            results[target.name] = self.translate(
+                chinese_text, target,
+                on_delta=(lambda delta, t=target: on_delta(t, delta)) if on_delta else None,
+                on_model=(lambda model, t=target: on_model(t, model)) if on_model else None
+            )
+            if on_result:
+                on_result(target, results[target.name], None)
+        return results
@@ -0,0 +1,250 @@
+"""
+Model Router
+按请求选择模型 - 短而简单的输入走快模型，长或复杂的输入走强模型
+
+路由按方案生效：顶层的 router 是所有方案的默认值，方案中可以写自己的 router（或 null 关闭），
+models 中的模型名必须是该方案端点上可用的模型。
+
+配置示例（models 按从快到强排列，最后一个视为最强模型，不限复杂度）：
+"router": {
+    "enabled": true,
+    "models": [
+        {"model": "fast-model", "max_complexity": 40},
+        {"model": "medium-model", "max_complexity": 200},
+        {"model": "strong-model"}
+    ],
+    "override": null,
+    "log": "logs/router.jsonl",
+    "log_max_kb": 1024
+}
+
+每个模型维护滚动的延迟 (EWMA) 和错误率统计；在能胜任（复杂度不超过
+max_complexity）的模型中按顺序选第一个状态良好（错误率不高、延迟不超过
+可选的 max_latency_ms）的模型。启用时每次决策及其结果写入 JSONL 日志，便于离线调参；
+日志超过 log_max_kb 后改名为 .1（只保留一份旧日志）。
+"""
+
+import os
+import re
+import json
+import time
+import threading
+from typing import Dict, List, NamedTuple, Optional, Set
+
+
+CJK_PATTERN = re.compile(r'[\u4e00-\u9fff\u3400-\u4dbf\uf900-\ufaff]')
+LATIN_PATTERN = re.compile(r'[A-Za-z]')
+CODE_PATTERN = re.compile(r'[`{}<>\[\]=;]|https?://')
+SENTENCE_END_PATTERN = re.compile(r'[。！？!?.；;]')
+
+EWMA_ALPHA = 0.2
+# 错误率高于此值的模型暂不参与选择（除非没有别的模型可选）
+MAX_ERROR_RATE = 0.5
+# 最近一次失败超过这么久后重新放行，让统计有机会恢复
+RECOVERY_SECONDS = 60
+
+# 各方案的路由器可能写同一个日志文件
+_log_lock = threading.Lock()
+
+
+class InputFeatures(NamedTuple):
+    """输入文本特征"""
+    chars: int
+    cjk_ratio: float
+    latin_ratio: float
+    lines: int
+    sentences: int
+    has_code: bool
+
+    @property
+    def complexity(self) -> float:
+        """复杂度估计：以字符数为基础，混合文字、多行、多句、代码会加权"""
+        mixed = min(self.cjk_ratio, self.latin_ratio) * 2
+        score = self.chars * (1 + mixed)
+        score += 30 * (self.lines - 1) + 10 * max(0, self.sentences - 1)
+        if self.has_code:
+            score += 100
+        return score
+
+
+def extract_features(text: str) -> InputFeatures:
+    """提取路由用的输入特征"""
+    chars = len(text)
+    cjk = len(CJK_PATTERN.findall(text))
+    latin = len(LATIN_PATTERN.findall(text))
+    letters = max(1, cjk + latin)
+    return InputFeatures(
+        chars=chars,
+        cjk_ratio=cjk / letters,
+        latin_ratio=latin / letters,
+        lines=text.count('\n') + 1,
+        sentences=len(SENTENCE_END_PATTERN.findall(text)),
+        has_code=bool(CODE_PATTERN.search(text))
+    )
+
+
+class ModelStats:
+    """单个模型的滚动延迟与错误率"""
+
+    def __init__(self):
+        self.latency_ms: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.last_error_at = 0.0
+
+    def record(self, latency_ms: float, ok: bool):
+        self.requests += 1
+        if not ok:
+            self.last_error_at = time.monotonic()
+        if ok:
+            if self.latency_ms is None:
+                self.latency_ms = latency_ms
+            else:
+                self.latency_ms += EWMA_ALPHA * (latency_ms - self.latency_ms)
+        self.error_rate += EWMA_ALPHA * ((0.0 if ok else 1.0) - self.error_rate)
+
+    def to_dict(self) -> dict:
+        return {
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+        }
+
+
+class RouteDecision(NamedTuple):
+    """一次路由决策"""
+    model: str
+    reason: str
+    features: InputFeatures
+    started: float
+
+
+class ModelRouter:
+    """按输入特征和模型实时表现选择模型"""
+
+    def __init__(self, config: Optional[dict] = None, profile: str = ""):
+        """初始化
+
+        Args:
+            config: 方案配置（读取其中的 router）
+            profile: 方案名，写入日志
+        """
+        self.profile = profile
+        self._lock = threading.Lock()
+        self._stats: Dict[str, ModelStats] = {}
+        self.models: List[dict] = []
+        self.enabled = False
+        self.override: Optional[str] = None
+        self.log_path: Optional[str] = None
+        self.log_max_bytes = 1024 * 1024
+        self.update_config(config or {})
+
+    def update_config(self, config: dict):
+        """应用配置（保留已有的统计数据）"""
+        router = config.get('router') or {}
+        with self._lock:
+            self.models = [m for m in router.get('models', []) if m.get('model')]
+            self.enabled = bool(router.get('enabled', True)) and bool(self.models)
+            self.override = router.get('override') or None
+            self.log_path = router.get('log', 'logs/router.jsonl')
+            self.log_max_bytes = int(router.get('log_max_kb', 1024)) * 1024
+            for m in self.models:
+                self._stats.setdefault(m['model'], ModelStats())
+
+    def choose(self, text: str, default_model: str, override: Optional[str] = None) -> RouteDecision:
+        """为一次请求选择模型
+
+        Args:
+            text: 待翻译文本
+            default_model: 未启用路由时使用的模型（当前方案的模型）
+            override: 调用方指定的模型，优先于一切策略
+
+        Returns:
+            路由决策
+        """
+        features = extract_features(text)
+        started = time.monotonic()
+        with self._lock:
+            forced = override or self.override
+            if forced:
+                return RouteDecision(forced, "override", features, started)
+            if not self.enabled:
+                return RouteDecision(default_model, "disabled", features, started)
+
+            complexity = features.complexity
+            capable = [
+                m for i, m in enumerate(self.models)
+                if i == len(self.models) - 1 or complexity <= m.get('max_complexity', float('inf'))
+            ]
+            # 按配置顺序（快在前）取第一个状态良好的模型
+            reason = f"complexity={complexity:.0f}"
+            chosen = next((m for m in capable if self._healthy(m)), None)
+            if chosen is None:
+                # 都不理想时选预期延迟最低的
+                chosen = min(capable, key=self._expected_latency)
+                reason += ",degraded"
+            return RouteDecision(chosen['model'], reason, features, started)
+
+    def serving_models(self, default_model: str) -> Set[str]:
+        """按当前配置可能被选中的模型（不含调用方临时指定的模型）"""
+        with self._lock:
+            if self.override:
+                return {self.override}
+            if not self.enabled:
+                return {default_model}
+            return {m['model'] for m in self.models}
+
+    def _healthy(self, model: dict) -> bool:
+        """错误率和延迟都在允许范围内"""
+        stats = self._stats[model['model']]
+        recovered = time.monotonic() - stats.last_error_at > RECOVERY_SECONDS
+        if stats.error_rate > MAX_ERROR_RATE and not recovered:
+            return False
+        max_latency = model.get('max_latency_ms')
+        return not (max_latency and stats.latency_ms is not None and stats.latency_ms > max_latency)
+
+    def _expected_latency(self, model: dict) -> float:
+        stats = self._stats[model['model']]
+        if stats.latency_ms is None:
+            return 0.0
+        return stats.latency_ms * (1 + stats.error_rate)
+
+    def record(self, decision: RouteDecision, ok: bool, error_kind: Optional[str] = None):
+        """记录一次请求结果，更新统计并写入日志"""
+        latency_ms = (time.monotonic() - decision.started) * 1000
+        with self._lock:
+            stats = self._stats.setdefault(decision.model, ModelStats())
+            stats.record(latency_ms, ok)
+            log_path = self.log_path
+            max_bytes = self.log_max_bytes
+        # 未启用路由时没有决策可调，不写日志
+        if not log_path or decision.reason == "disabled":
+            return
+
+        line = json.dumps({
+            "ts": round(time.time(), 3),
+            "profile": self.profile,
+            "model": decision.model,
+            "reason": decision.reason,
+            "features": decision.features._asdict(),
+            "complexity": round(decision.features.complexity, 1),
+            "latency_ms": round(latency_ms, 1),
+            "ok": ok,
+            "error": error_kind,
+        }, ensure_ascii=False)
+        try:
+            directory = os.path.dirname(log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with _log_lock:
+                if max_bytes > 0 and os.path.exists(log_path) and os.path.getsize(log_path) >= max_bytes:
+                    os.replace(log_path, log_path + ".1")
+                with open(log_path, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+        except OSError as e:
+            print(f"[路由] 写日志失败: {e}")
+
+    def stats(self) -> Dict[str, dict]:
+        """各模型的滚动统计"""
+        with self._lock:
+            return {name: s.to_dict() for name, s in self._stats.items()}
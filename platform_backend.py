@@ -0,0 +1,270 @@
+"""
+Platform Backend
+平台相关调用（前台窗口、强制激活、读取焦点控件文本、前台程序名、模拟粘贴）的统一接口
+
+- win32     Windows：user32 / kernel32
+- x11       Linux 桌面：python-xlib，按 EWMH 读取和激活前台窗口
+- null      无界面环境（CI、基准、回放）：所有调用为空操作
+
+启动时调用 select_backend 选择，未选择时首次 get_backend 按平台自动选择。
+其他模块不直接调用 ctypes.windll 或 pynput，导入时不依赖任何平台；
+模拟按键用到的 pynput 在第一次粘贴时才导入。
+"""
+
+import os
+import sys
+import time
+import ctypes
+from typing import Optional
+
+AUTO = "auto"
+BACKENDS = ("win32", "x11", "null")
+
+
+class PlatformBackend:
+    """平台接口，默认实现均为空操作"""
+
+    name = ""
+
+    def foreground_window(self) -> Optional[int]:
+        """当前前台窗口句柄"""
+        return None
+
+    def activate_window(self, handle: int):
+        """强制把窗口置前并获得焦点"""
+        pass
+
+    def focused_text(self) -> str:
+        """前台窗口中焦点控件的文本"""
+        return ""
+
+    def foreground_process(self) -> str:
+        """前台窗口所属程序的可执行文件名（如 KeePass.exe），未知时为空"""
+        return ""
+
+    def paste(self):
+        """向前台窗口发送粘贴快捷键（Ctrl+V）"""
+        pass
+
+
+class NullBackend(PlatformBackend):
+    """无界面环境：无前台窗口、无焦点文本、激活和粘贴为空操作"""
+
+    name = "null"
+
+
+class _PynputPaste:
+    """用 pynput 模拟 Ctrl+V（Win32 / X11 共用），第一次粘贴时才导入 pynput"""
+
+    _keyboard = None
+
+    def paste(self):
+        from pynput.keyboard import Key, Controller
+
+        if self._keyboard is None:
+            self._keyboard = Controller()
+        self._keyboard.press(Key.ctrl)
+        time.sleep(0.05)
+        self._keyboard.press('v')
+        time.sleep(0.05)
+        self._keyboard.release('v')
+        self._keyboard.release(Key.ctrl)
+
+
+class Win32Backend(_PynputPaste, PlatformBackend):
+    """Windows 实现"""
+
+    name = "win32"
+
+    WM_GETTEXT = 0x000D
+    WM_GETTEXTLENGTH = 0x000E
+    SW_RESTORE = 9
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+    def __init__(self):
+        self.user32 = ctypes.windll.user32
+        self.kernel32 = ctypes.windll.kernel32
+
+    def foreground_window(self) -> Optional[int]:
+        return self.user32.GetForegroundWindow() or None
+
+    def activate_window(self, handle: int):
+        """强制激活窗口（绕过 Windows 限制）"""
+        user32 = self.user32
+        try:
+            current_thread_id = self.kernel32.GetCurrentThreadId()
+            foreground_hwnd = user32.GetForegroundWindow()
+            foreground_thread_id = user32.GetWindowThreadProcessId(foreground_hwnd, None)
+
+            # 附着线程输入
+            if current_thread_id != foreground_thread_id:
+                user32.AttachThreadInput(foreground_thread_id, current_thread_id, True)
+
+            # 强制置前
+            user32.SetForegroundWindow(handle)
+            user32.ShowWindow(handle, self.SW_RESTORE)
+            user32.BringWindowToTop(handle)
+
+            # 解除附着
+            if current_thread_id != foreground_thread_id:
+                user32.AttachThreadInput(foreground_thread_id, current_thread_id, False)
+
+        except Exception as e:
+            print(f"强制激活失败: {e}")
+
+    def focused_text(self) -> str:
+        """通过 WM_GETTEXT 读取焦点编辑控件文本"""
+        user32 = self.user32
+        try:
+            hwnd = user32.GetForegroundWindow()
+            if not hwnd:
+                return ""
+
+            # 附着到前台线程才能取得其焦点控件
+            thread_id = user32.GetWindowThreadProcessId(hwnd, None)
+            current_thread_id = self.kernel32.GetCurrentThreadId()
+            user32.AttachThreadInput(current_thread_id, thread_id, True)
+            focus_hwnd = user32.GetFocus()
+            user32.AttachThreadInput(current_thread_id, thread_id, False)
+
+            if not focus_hwnd:
+                return ""
+
+            length = user32.SendMessageW(focus_hwnd, self.WM_GETTEXTLENGTH, 0, 0)
+            if length > 0:
+                buffer = ctypes.create_unicode_buffer(length + 1)
+                user32.SendMessageW(focus_hwnd, self.WM_GETTEXT, length + 1, buffer)
+                return buffer.value
+        except Exception:
+            pass
+        return ""
+
+    def foreground_process(self) -> str:
+        try:
+            hwnd = self.user32.GetForegroundWindow()
+            if not hwnd:
+                return ""
+            pid = ctypes.c_ulong()
+            self.user32.GetWindowThreadProcessId(hwnd, ctypes.byref(pid))
+            handle = self.kernel32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid.value)
+            if not handle:
+                return ""
+            try:
+                size = ctypes.c_ulong(260)
+                buffer = ctypes.create_unicode_buffer(size.value)
+                if self.kernel32.QueryFullProcessImageNameW(handle, 0, buffer, ctypes.byref(size)):
+                    return os.path.basename(buffer.value)
+            finally:
+                self.kernel32.CloseHandle(handle)
+        except Exception:
+            pass
+        return ""
+
+
+class X11Backend(_PynputPaste, PlatformBackend):
+    """X11 实现（EWMH _NET_ACTIVE_WINDOW）
+
+    X11 没有读取其他程序控件文本的通用方法，focused_text 返回空，
+    文本捕获在 Linux 上依赖输入框本身。
+    """
+
+    name = "x11"
+
+    def __init__(self):
+        from Xlib import X, display, protocol
+
+        self._X = X
+        self._protocol = protocol
+        self.display = display.Display()
+        self.root = self.display.screen().root
+        self._active_atom = self.display.intern_atom('_NET_ACTIVE_WINDOW')
+        self._pid_atom = self.display.intern_atom('_NET_WM_PID')
+
+    def foreground_window(self) -> Optional[int]:
+        try:
+            prop = self.root.get_full_property(self._active_atom, self._X.AnyPropertyType)
+            if prop and prop.value:
+                return int(prop.value[0]) or None
+        except Exception:
+            pass
+        return None
+
+    def activate_window(self, handle: int):
+        try:
+            window = self.display.create_resource_object('window', handle)
+            # source=2 表示来自桌面工具的请求，窗口管理器不会拦截抢焦点
+            event = self._protocol.event.ClientMessage(
+                window=window,
+                client_type=self._active_atom,
+                data=(32, [2, self._X.CurrentTime, 0, 0, 0])
+            )
+            mask = self._X.SubstructureRedirectMask | self._X.SubstructureNotifyMask
+            self.root.send_event(event, event_mask=mask)
+            window.set_input_focus(self._X.RevertToParent, self._X.CurrentTime)
+            self.display.flush()
+        except Exception as e:
+            print(f"强制激活失败: {e}")
+
+    def foreground_process(self) -> str:
+        handle = self.foreground_window()
+        if not handle:
+            return ""
+        try:
+            window = self.display.create_resource_object('window', handle)
+            prop = window.get_full_property(self._pid_atom, self._X.AnyPropertyType)
+            if prop and prop.value:
+                with open(f"/proc/{int(prop.value[0])}/comm", "r") as f:
+                    return f.read().strip()
+        except Exception:
+            pass
+        return ""
+
+
+_backend: Optional[PlatformBackend] = None
+
+
+def _create(name: str) -> PlatformBackend:
+    if name == "win32":
+        return Win32Backend()
+    if name == "x11":
+        return X11Backend()
+    if name == "null":
+        return NullBackend()
+    raise ValueError(f"未知的平台后端: {name}（可选 {', '.join(BACKENDS)}）")
+
+
+def select_backend(name: str = AUTO) -> PlatformBackend:
+    """选择平台后端
+
+    Args:
+        name: win32 / x11 / null / auto；auto 时按环境变量 PLATFORM_BACKEND、
+              操作系统和 DISPLAY 自动选择，无法初始化时退回 null
+    """
+    global _backend
+    if name == AUTO:
+        name = os.environ.get("PLATFORM_BACKEND", AUTO)
+    if name != AUTO:
+        _backend = _create(name)
+        return _backend
+
+    if sys.platform == "win32":
+        candidates = ["win32"]
+    elif os.environ.get("DISPLAY") and os.environ.get("QT_QPA_PLATFORM") != "offscreen":
+        candidates = ["x11"]
+    else:
+        candidates = []
+    _backend = NullBackend()
+    for candidate in candidates:
+        try:
+            _backend = _create(candidate)
+            break
+        except Exception as e:
+            print(f"[平台] {candidate} 后端不可用，使用 null: {e}")
+    return _backend
+
+
+def get_backend() -> PlatformBackend:
+    """当前平台后端（未选择时自动选择）"""
+    if _backend is None:
+        select_backend()
+    return _backend
@@ -0,0 +1,145 @@
+"""
+Resilience Helpers
+请求重试退避与熔断器
+
+- 指数退避 + 全抖动 (full jitter)
+- 解析 Retry-After 响应头
+- 熔断器：连续失败后快速失败，冷却后放行单个探测请求
+"""
+
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+
+def backoff_delay(attempt: int, base: float = 0.5, cap: float = 8.0) -> float:
+    """计算第 attempt 次重试前的等待时间（全抖动指数退避）
+
+    Args:
+        attempt: 已失败的次数（从 1 开始）
+        base: 基础等待时间（秒）
+        cap: 等待时间上限（秒）
+
+    Returns:
+        [0, min(cap, base * 2^(attempt-1))] 之间的随机秒数
+    """
+    ceiling = min(cap, base * (2 ** max(0, attempt - 1)))
+    return random.uniform(0, ceiling)
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """解析 Retry-After / retry-after-ms 响应头
+
+    Args:
+        headers: 响应头（支持 .get 的映射）
+
+    Returns:
+        建议等待的秒数，无法解析时返回 None
+    """
+    if not headers:
+        return None
+
+    value = headers.get('retry-after-ms')
+    if value:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+
+    value = headers.get('retry-after')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """熔断器
+
+    closed    - 正常放行，记录连续失败次数
+    open      - 失败次数达到阈值后打开，冷却期内直接拒绝
+    half_open - 冷却结束后放行一个探测请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        """初始化
+
+        Args:
+            failure_threshold: 连续失败多少次后打开熔断
+            reset_timeout: 打开后多久允许探测（秒）
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def configure(self, failure_threshold: int, reset_timeout: float):
+        """修改阈值（配置热加载），保留当前状态和失败计数"""
+        with self._lock:
+            self.failure_threshold = failure_threshold
+            self.reset_timeout = reset_timeout
+
+    def retry_in(self) -> float:
+        """距离允许探测还有多少秒"""
+        with self._lock:
+            if self._state != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def allow(self) -> bool:
+        """是否允许发出请求"""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+                self._probe_in_flight = False
+            # half_open: 只放行一个探测请求
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+            return True
+
+    def record_success(self):
+        """记录一次成功"""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """请求因与服务端无关的原因中止（调用方回调出错、被中断等）：不计成败，只归还探测名额"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """记录一次失败"""
+        with self._lock:
+            self._failures += 1
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,146 @@
+"""
+Session Trace Recorder
+会话轨迹记录 - 为性能问题复现记录按键、文本变化、热键、请求、响应、粘贴的时间线
+
+格式：JSON Lines（路径以 .gz 结尾时 gzip 压缩）
+- 第一行为文件头 {"v": 1, "start": <unix 时间>, "source": ...}
+- 之后每行一个事件 {"t": <相对开始的毫秒>, "k": <类型>, ...}
+
+事件类型：
+- key      按键（只记时间，不记内容）
+- text     输入框文本变化 {"text"}
+- hotkey   全局热键触发
+- submit   用户提交翻译 {"text"}
+- request  发出请求 {"id", "text"}
+- response 收到结果 {"id", "ok", "text" | "error"}
+- paste    粘贴
+
+未启用记录时 tracer() 返回空实现，调用开销可以忽略。
+"""
+
+import os
+import gzip
+import json
+import time
+import threading
+from typing import Iterator, List, Optional
+
+
+TRACE_VERSION = 1
+
+
+class NullRecorder:
+    """未启用记录时的空实现"""
+
+    enabled = False
+
+    def record(self, kind: str, **fields):
+        pass
+
+    def next_id(self) -> int:
+        return 0
+
+    def close(self):
+        pass
+
+
+class TraceRecorder:
+    """会话轨迹记录器（线程安全）"""
+
+    enabled = True
+
+    def __init__(self, path: str, source: str = "app"):
+        """初始化
+
+        Args:
+            path: 轨迹文件路径，.gz 结尾时压缩
+            source: 记录来源（窗口类型等），写入文件头
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._request_id = 0
+        if path.endswith('.gz'):
+            self._file = gzip.open(path, 'wt', encoding='utf-8')
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+        self._write({"v": TRACE_VERSION, "start": time.time(), "source": source})
+        print(f"[轨迹] 记录到 {path}")
+
+    def _write(self, event: dict):
+        self._file.write(json.dumps(event, ensure_ascii=False, separators=(',', ':')) + "\n")
+
+    def record(self, kind: str, **fields):
+        """记录一个事件"""
+        event = {"t": round((time.perf_counter() - self._start) * 1000, 2), "k": kind}
+        event.update(fields)
+        with self._lock:
+            if self._file is not None:
+                self._write(event)
+
+    def next_id(self) -> int:
+        """分配请求编号，用于关联 request / response"""
+        with self._lock:
+            self._request_id += 1
+            return self._request_id
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_recorder = NullRecorder()
+
+
+def tracer():
+    """当前的轨迹记录器"""
+    return _recorder
+
+
+def start_recording(directory: str = "logs/traces", source: str = "app", compress: bool = True) -> TraceRecorder:
+    """开始记录，文件名按启动时间生成"""
+    global _recorder
+    name = time.strftime('trace-%Y%m%d-%H%M%S') + ('.jsonl.gz' if compress else '.jsonl')
+    _recorder = TraceRecorder(os.path.join(directory, name), source)
+    return _recorder
+
+
+def stop_recording():
+    """停止记录"""
+    global _recorder
+    _recorder.close()
+    _recorder = NullRecorder()
+
+
+def load_trace(path: str) -> List[dict]:
+    """读取轨迹文件，返回事件列表（不含文件头）"""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        lines = (json.loads(line) for line in f if line.strip())
+        header = next(lines, None)
+        if header is None or header.get('v') != TRACE_VERSION:
+            raise ValueError(f"不支持的轨迹文件: {path}")
+        return sorted(lines, key=lambda e: e['t'])
+
+
+def iter_requests(events: List[dict]) -> Iterator[dict]:
+    """把 request / response 配对，给出每个请求的耗时和结果"""
+    pending = {}
+    for event in events:
+        if event['k'] == 'request':
+            pending[event['id']] = event
+        elif event['k'] == 'response' and event.get('id') in pending:
+            request = pending.pop(event['id'])
+            yield {
+                "id": event['id'],
+                "text": request.get('text', ''),
+                "sent": request['t'],
+                "latency_ms": event['t'] - request['t'],
+                "ok": event.get('ok', True),
+                "result": event.get('text', event.get('error', '')),
+            }
@@ -0,0 +1,205 @@
+"""
+Single Instance
+单实例锁 + 本机 IPC - 再次启动或命令行调用时把请求转发给已运行的实例
+
+- 目录：锁、socket 和密钥都放在只有当前用户能访问（0700）的运行目录中：
+  $XDG_RUNTIME_DIR/aquatype，没有时 ~/.cache/aquatype；Windows 为 %LOCALAPPDATA%\\aquatype
+- 锁：运行目录下的锁文件，持有期间独占（fcntl.flock / msvcrt.locking），进程退出自动释放
+- 通道：Windows 命名管道 / 其他系统 Unix socket（multiprocessing.connection，HMAC 认证，
+  密钥文件以 O_EXCL | O_NOFOLLOW 新建，只有当前用户可读）
+- 消息：{"cmd": 命令, ...} → {"ok": bool, "result" | "error"}
+
+只导入标准库，命令行转发不需要加载 Qt 和翻译模块。
+"""
+
+import os
+import sys
+import getpass
+import stat
+import secrets
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict, Optional
+
+
+APP_NAME = "aquatype"
+
+
+def _user_tag() -> str:
+    try:
+        user = getpass.getuser()
+    except Exception:
+        user = str(os.getpid())
+    return "".join(ch for ch in user if ch.isalnum()) or "user"
+
+
+def _runtime_dir() -> str:
+    """当前用户私有的运行目录（不存在时以 0700 创建）
+
+    Raises:
+        OSError: 目录不属于当前用户、是符号链接或权限过宽
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+        path = os.path.join(base, APP_NAME)
+        os.makedirs(path, exist_ok=True)
+        return path
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(os.path.expanduser("~"), ".cache")
+    path = os.path.join(base, APP_NAME)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    info = os.lstat(path)
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise OSError(f"运行目录 {path} 不属于当前用户")
+    if stat.S_IMODE(info.st_mode) & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def _runtime_path(suffix: str) -> str:
+    return os.path.join(_runtime_dir(), APP_NAME + suffix)
+
+
+def address() -> str:
+    if sys.platform == "win32":
+        return rf"\\.\pipe\{APP_NAME}-{_user_tag()}"
+    return _runtime_path(".sock")
+
+
+def _family() -> str:
+    return "AF_PIPE" if sys.platform == "win32" else "AF_UNIX"
+
+
+def _authkey(create: bool) -> Optional[bytes]:
+    """读取（或由主实例生成）IPC 认证密钥
+
+    新建时先删除旧文件再以 O_EXCL 创建，不会写进别人事先放好的文件或符号链接。
+    """
+    nofollow = getattr(os, "O_NOFOLLOW", 0)
+    if create:
+        path = _runtime_path(".key")
+        key = secrets.token_bytes(32)
+        try:
+            os.unlink(path)  # 持有锁说明旧密钥已无人使用
+        except FileNotFoundError:
+            pass
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | nofollow | getattr(os, "O_BINARY", 0), 0o600)
+        with os.fdopen(fd, "wb") as f:
+            f.write(key)
+        return key
+    try:
+        fd = os.open(_runtime_path(".key"), os.O_RDONLY | nofollow | getattr(os, "O_BINARY", 0))
+        with os.fdopen(fd, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+class InstanceLock:
+    """进程生命周期内持有的单实例锁"""
+
+    def __init__(self):
+        self.path = _runtime_path(".lock")
+        self._file = None
+
+    def acquire(self) -> bool:
+        """非阻塞获取，已被其他进程持有时返回 False"""
+        f = open(self.path, "a+")
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class InstanceServer:
+    """主实例上的 IPC 服务：每个连接一个线程，按 cmd 分发给处理函数"""
+
+    def __init__(self, lock: InstanceLock):
+        self.lock = lock
+        self.handlers: Dict[str, Callable[[dict], object]] = {"ping": lambda message: os.getpid()}
+        if _family() == "AF_UNIX" and os.path.exists(address()):
+            os.unlink(address())  # 持有锁说明旧 socket 已无人监听
+        self._listener = Listener(address(), _family(), authkey=_authkey(create=True))
+        self._running = False
+
+    def register(self, cmd: str, handler: Callable[[dict], object]):
+        """注册命令处理函数 handler(message) -> result，在 IPC 线程中调用"""
+        self.handlers[cmd] = handler
+
+    def start(self):
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="instance-ipc", daemon=True).start()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if not self._running:
+                    break
+                continue  # 认证失败等，继续等待下一个连接
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            try:
+                message = conn.recv()
+                handler = self.handlers.get(message.get("cmd"))
+                if handler is None:
+                    reply = {"ok": False, "error": f"未知命令: {message.get('cmd')}"}
+                else:
+                    reply = {"ok": True, "result": handler(message)}
+            except EOFError:
+                return
+            except Exception as e:
+                reply = {"ok": False, "error": str(e), "kind": getattr(e, 'kind', 'error')}
+            try:
+                conn.send(reply)
+            except OSError:
+                pass
+
+    def stop(self):
+        self._running = False
+        self._listener.close()
+        if _family() == "AF_UNIX" and os.path.exists(address()):
+            os.unlink(address())
+        self.lock.release()
+
+
+def send(message: dict, timeout: float = 2.0) -> Optional[dict]:
+    """把消息发给正在运行的实例并等待回复；没有实例时返回 None"""
+    key = _authkey(create=False)
+    if key is None:
+        return None
+    try:
+        with Client(address(), _family(), authkey=key) as conn:
+            conn.send(message)
+            if not conn.poll(timeout):
+                return {"ok": False, "error": "运行中的实例没有响应"}
+            return conn.recv()
+    except (OSError, EOFError):
+        return None
+    except Exception as e:
+        # 密钥不匹配等
+        return {"ok": False, "error": str(e)}
+
+
+def claim() -> Optional[InstanceServer]:
+    """尝试成为主实例：成功返回（未启动的）InstanceServer，已有实例运行时返回 None"""
+    lock = InstanceLock()
+    if not lock.acquire():
+        return None
+    return InstanceServer(lock)
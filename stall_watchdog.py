@@ -0,0 +1,267 @@
+"""
+Stall Watchdog
+界面卡顿监测 - 发现 GUI 线程长时间没有响应时，记录卡顿时长和主线程的 Python 调用栈
+
+- GUI 线程上的 QTimer 每 interval 毫秒打一次心跳，只记下时间
+- 后台线程定期检查心跳：心跳晚到时用 sys._current_frames 抓取主线程的调用栈（晚到半个阈值就开始抓，
+  短卡顿也有调用栈），卡顿持续期间每隔 sample_ms 再抓一次（最多 MAX_SAMPLES 个，相同的栈只保留一份）
+- 心跳恢复后按两次心跳的间隔得到准确的卡顿时长，计入直方图并写入日志；
+  卡顿超过 hang_seconds 仍未恢复时先写一条 "hang" 记录，进程被强行结束也不会丢
+
+日志为 JSON Lines（每天一个文件），每行一次卡顿：
+{"time": <unix 时间>, "host": ..., "pid": ..., "kind": "stall" | "hang", "ms": 卡顿毫秒,
+ "place": 首次抓到的栈中最内层的本项目帧, "stacks": [[帧, ...], ...]}
+帧格式为 "文件名:行号 函数名"（只保留文件名，便于不同机器的日志合并统计），最内层在最后。
+
+配置示例：
+"watchdog": {
+    "enabled": true,
+    "threshold_ms": 50,
+    "log_dir": "logs/stalls"
+}
+
+汇总多台机器的日志：python stall_watchdog.py logs/stalls/*.jsonl [--top 10]
+"""
+
+import os
+import sys
+import glob
+import json
+import time
+import socket
+import argparse
+import threading
+import traceback
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+import diagnostics
+
+
+# 直方图分桶上限（毫秒）
+BUCKETS = (100, 250, 500, 1000, 2000, 5000)
+MAX_SAMPLES = 8
+MAX_DEPTH = 40
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _bucket_labels(threshold_ms: float) -> List[str]:
+    bounds = [threshold_ms] + [b for b in BUCKETS if b > threshold_ms]
+    labels = [f"{low:g}-{high:g}ms" for low, high in zip(bounds, bounds[1:])]
+    return labels + [f"≥{bounds[-1]:g}ms"]
+
+
+def capture_stack(frame) -> Tuple[List[str], str]:
+    """调用栈 → (["文件名:行号 函数名", ...], 最内层的本项目帧)，最内层在最后
+
+    本项目帧用于按位置汇总：卡在标准库或第三方库里时，算到调用它的本项目代码上。
+    """
+    frames = traceback.extract_stack(frame, limit=MAX_DEPTH)
+    stack = [f"{os.path.basename(f.filename)}:{f.lineno} {f.name}" for f in frames]
+    place = next((text for f, text in zip(reversed(frames), reversed(stack))
+                  if os.path.abspath(f.filename).startswith(PROJECT_DIR)), stack[-1] if stack else "?")
+    return stack, place
+
+
+class StallWatchdog:
+    """GUI 线程卡顿监测（需在 GUI 线程中创建和启动）"""
+
+    def __init__(self, threshold_ms: float = 50, interval_ms: int = 20, sample_ms: float = 250,
+                 hang_seconds: float = 10, log_dir: Optional[str] = "logs/stalls"):
+        """初始化
+
+        Args:
+            threshold_ms: 心跳晚到多少毫秒算一次卡顿
+            interval_ms: 心跳间隔（毫秒）
+            sample_ms: 卡顿持续期间抓取调用栈的间隔（毫秒）
+            hang_seconds: 卡顿超过多少秒仍未恢复时先写一条 hang 记录
+            log_dir: 日志目录，None 表示不写日志
+        """
+        from PyQt5.QtCore import Qt, QTimer
+
+        self.threshold = threshold_ms / 1000
+        self.interval = interval_ms / 1000
+        self.sample_every = sample_ms / 1000
+        self.hang_after = hang_seconds
+        self.log_dir = log_dir
+        self._main_ident = threading.get_ident()
+        self._host = socket.gethostname()
+        self._labels = _bucket_labels(threshold_ms)
+        self._histogram = [0] * len(self._labels)
+        self._places = Counter()  # 卡顿时最内层的本项目调用位置
+        self._worst = 0.0
+        self._lock = threading.Lock()
+        # GUI 线程写、后台线程读：最近一次心跳，以及已经结束的卡顿 (开始心跳, 时长)
+        self._last_beat = time.monotonic()
+        self._ended = deque()
+        # 后台线程独占：正在进行的卡顿 [开始心跳, 调用栈列表, 首个栈的本项目帧, 上次抓取时间, 是否已写 hang]
+        self._current: Optional[list] = None
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self._timer = QTimer()
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._beat)
+
+    def start(self):
+        self._last_beat = time.monotonic()
+        self._timer.start(int(self.interval * 1000))
+        self._running = True
+        self._thread = threading.Thread(target=self._watch, name="stall-watchdog", daemon=True)
+        self._thread.start()
+        diagnostics.register("界面卡顿", self.stats)
+
+    def stop(self):
+        self._running = False
+        self._timer.stop()
+        diagnostics.unregister("界面卡顿")
+
+    def _beat(self):
+        """心跳（GUI 线程），只做最少的工作"""
+        now = time.monotonic()
+        late = now - self._last_beat - self.interval
+        if late >= self.threshold:
+            self._ended.append((self._last_beat, late))
+        self._last_beat = now
+
+    def _watch(self):
+        poll = max(0.005, self.threshold / 4)
+        while self._running:
+            time.sleep(poll)
+            while self._ended:
+                start, late = self._ended.popleft()
+                current = self._current
+                if current is not None and current[0] == start:
+                    self._current = None
+                    self._record(late, current[1], current[2])
+                else:
+                    # 卡顿在下一次检查前就结束了，没来得及抓栈
+                    self._record(late, [], None)
+            now = time.monotonic()
+            beat = self._last_beat
+            # 晚到一半阈值就开始抓栈，短卡顿也能留下调用栈；最终不足阈值的不记录
+            if now - beat - self.interval >= self.threshold / 2:
+                self._sample(beat, now)
+
+    def _sample(self, beat: float, now: float):
+        """卡顿进行中：按间隔抓取主线程调用栈"""
+        current = self._current
+        if current is None or current[0] != beat:
+            current = self._current = [beat, [], None, 0.0, False]
+        start, stacks, place, sampled_at, hung = current
+        if len(stacks) < MAX_SAMPLES and now - sampled_at >= self.sample_every:
+            frame = sys._current_frames().get(self._main_ident)
+            if frame is not None:
+                stack, frame_place = capture_stack(frame)
+                del frame
+                if stack not in stacks:
+                    stacks.append(stack)
+                if place is None:
+                    current[2] = frame_place
+            current[3] = now
+        if not hung and now - start >= self.hang_after:
+            current[4] = True
+            self._write(now - start - self.interval, stacks, current[2], "hang")
+
+    def _record(self, seconds: float, stacks: List[List[str]], place: Optional[str]):
+        ms = seconds * 1000
+        index = sum(1 for bound in BUCKETS if ms >= bound and bound > self.threshold * 1000)
+        with self._lock:
+            self._histogram[index] += 1
+            self._worst = max(self._worst, ms)
+            if place is not None:
+                self._places[place] += 1
+        self._write(seconds, stacks, place, "stall")
+
+    def _write(self, seconds: float, stacks: List[List[str]], place: Optional[str], kind: str):
+        if not self.log_dir:
+            return
+        record = {
+            "time": round(time.time(), 3), "host": self._host, "pid": os.getpid(),
+            "kind": kind, "ms": round(seconds * 1000, 1), "place": place, "stacks": stacks,
+        }
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            path = os.path.join(self.log_dir, f"stalls-{time.strftime('%Y%m%d')}.jsonl")
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+        except OSError as e:
+            print(f"[卡顿监测] 写日志失败: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            histogram = list(self._histogram)
+            worst = self._worst
+            places = self._places.most_common(3)
+        stats = {
+            "阈值": f"{self.threshold * 1000:g} ms",
+            "卡顿次数": sum(histogram),
+            "最长卡顿": f"{worst:.0f} ms",
+        }
+        for label, count in zip(self._labels, histogram):
+            stats[label] = count
+        for rank, (place, count) in enumerate(places, 1):
+            stats[f"常见位置 {rank}"] = f"{place}（{count} 次）"
+        return stats
+
+
+def summarize(paths: List[str], top: int = 10) -> str:
+    """汇总卡顿日志（可来自多台机器）：直方图、按主机统计、按调用位置排序的累计卡顿时长"""
+    records = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        pass
+    if not records:
+        return "没有卡顿记录"
+
+    # hang 记录之后同一进程的下一条 stall 就是它恢复时的完整记录；没有后续 stall 的 hang 视为未恢复
+    stalls, pending = [], {}
+    for r in sorted(records, key=lambda r: r.get("time", 0)):
+        process = (r.get("host"), r.get("pid"))
+        if r.get("kind") == "hang":
+            pending[process] = r
+        else:
+            pending.pop(process, None)
+            stalls.append(r)
+    hangs = list(pending.values())
+
+    lines = [f"{len(stalls)} 次卡顿，{len(hangs)} 次无响应后未恢复，"
+             f"来自 {len({r.get('host') for r in records})} 台机器"]
+    histogram = Counter(sum(1 for bound in BUCKETS if r["ms"] >= bound) for r in stalls)
+    labels = [f"<{BUCKETS[0]}ms"] + _bucket_labels(BUCKETS[0])
+    lines.append("时长分布: " + "  ".join(f"{label} {histogram[i]}" for i, label in enumerate(labels)))
+
+    hosts: Dict[str, List[float]] = {}
+    for r in stalls + hangs:
+        hosts.setdefault(r.get("host", "?"), []).append(r["ms"])
+    lines.append("\n按机器:")
+    for host, values in sorted(hosts.items(), key=lambda item: -sum(item[1])):
+        lines.append(f"  {host:<24} {len(values):>5} 次  累计 {sum(values) / 1000:>7.1f} s  最长 {max(values):>7.0f} ms")
+
+    places: Dict[str, List[float]] = {}
+    for r in stalls + hangs:
+        key = r.get("place") or "（未抓到调用栈）"
+        places.setdefault(key, []).append(r["ms"])
+    lines.append(f"\n按调用位置（累计时长前 {top}）:")
+    for place, values in sorted(places.items(), key=lambda item: -sum(item[1]))[:top]:
+        lines.append(f"  {sum(values) / 1000:>7.1f} s  {len(values):>5} 次  最长 {max(values):>7.0f} ms  {place}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="汇总界面卡顿日志")
+    parser.add_argument("paths", nargs="*", default=["logs/stalls/*.jsonl"], help="日志文件（支持通配符）")
+    parser.add_argument("--top", type=int, default=10, help="列出累计时长最多的几个调用位置")
+    args = parser.parse_args()
+    paths = sorted({p for pattern in args.paths for p in glob.glob(pattern)})
+    print(summarize(paths, args.top))
+
+
+if __name__ == "__main__":
+    main()
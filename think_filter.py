@@ -0,0 +1,54 @@
+"""
+Think Filter
+去掉推理模型输出中的 <think>…</think> 部分
+
+- THINK_PATTERN: 完整响应中的思考段（连同其后的空白）
+- ThinkFilter:   流式输出逐块过滤，只放行可以显示的部分
+
+只依赖标准库，基准测试和回放不需要安装 openai。
+"""
+
+import re
+
+
+# 去除 <think> 标签内容
+THINK_PATTERN = re.compile(r'<think>.*?</think>\s*', flags=re.DOTALL)
+
+
+class ThinkFilter:
+    """流式输出中去掉开头的 <think>…</think> 和前导空白，其余内容原样放行"""
+
+    def __init__(self):
+        self._head = ""
+        self._state = "head"  # head / think / body
+        self._emitted = False
+
+    def feed(self, delta: str) -> str:
+        """输入一个数据块，返回可以显示的部分"""
+        if self._state == "head":
+            self._head += delta
+            head = self._head.lstrip()
+            if "<think>".startswith(head):
+                return ""  # 还不能确定是否以 <think> 开头
+            if head.startswith("<think>"):
+                self._state = "think"
+                delta, self._head = self._head, ""
+            else:
+                self._state = "body"
+                delta, self._head = head, ""
+        if self._state == "think":
+            self._head += delta
+            end = self._head.find("</think>")
+            if end < 0:
+                return ""
+            self._state = "body"
+            delta, self._head = self._head[end + len("</think>"):], ""
+        if not self._emitted:
+            delta = delta.lstrip()
+            self._emitted = bool(delta)
+        return delta
+
+    def flush(self) -> str:
+        """流结束：返回仍在等待判断的开头部分（未闭合的 <think> 丢弃）"""
+        head, self._head = self._head, ""
+        return head.strip() if self._state == "head" else ""
@@ -0,0 +1,202 @@
+"""
+Trace Replay
+在 QT_QPA_PLATFORM=offscreen 下确定性地回放会话轨迹
+
+- 时间由虚拟时钟驱动：防抖定时器换成 VirtualTimer，翻译请求交给 MockTranslator，
+  请求延迟和译文按原文取自录制的 response（没有则按文本长度计算）
+- 相同的轨迹每次回放得到完全相同的时间线，便于改动前后对比延迟
+
+运行方法：
+    python trace_replay.py logs/traces/trace-xxx.jsonl.gz [--target input|floating] [--runs 2]
+
+target:
+- input    驱动 ui.floating_input.FloatingInputWindow（输入即翻译，500ms 防抖）
+- floating 驱动 main.FloatingTranslator（Enter 提交翻译；自动粘贴关闭，不发送真实按键）
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from typing import List
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtWidgets import QApplication
+
+from mock_provider import MockTranslator, VirtualClock, VirtualTimer
+from platform_backend import select_backend
+from session_trace import load_trace, iter_requests
+
+
+class TraceReplayer:
+    """轨迹回放器"""
+
+    def __init__(self, events: List[dict], target: str = "input", use_recorded: bool = True):
+        """初始化
+
+        Args:
+            events: load_trace 读取的事件
+            target: input / floating
+            use_recorded: 是否复用录制的响应延迟和译文
+        """
+        self.events = events
+        self.target = target
+        self.use_recorded = use_recorded
+        self.timeline: List[tuple] = []
+
+    def _log(self, kind: str, detail: str = ""):
+        self.timeline.append((round(self.clock.now_ms, 2), kind, detail))
+
+    def run(self) -> List[tuple]:
+        """回放一遍，返回虚拟时间线 [(毫秒, 类型, 内容)]"""
+        app = QApplication.instance() or QApplication(sys.argv)
+        select_backend("null")
+        self.clock = VirtualClock()
+        self.timeline = []
+        recorded = list(iter_requests(self.events)) if self.use_recorded else None
+        self.mock = MockTranslator(self.clock, recorded=recorded)
+
+        if self.target == "floating":
+            handlers = self._setup_floating()
+        else:
+            handlers = self._setup_input()
+
+        for event in self.events:
+            self.clock.advance_to(event['t'])
+            handler = handlers.get(event['k'])
+            if handler:
+                handler(event)
+            app.processEvents()
+        self.clock.run_until_idle()
+        app.processEvents()
+        self.window.hide()
+        return self.timeline
+
+    def _setup_input(self) -> dict:
+        from ui.floating_input import FloatingInputWindow
+
+        window = FloatingInputWindow()
+        self.window = window
+
+        # 防抖定时器换成虚拟定时器
+        timer = VirtualTimer(self.clock)
+        timer.timeout.connect(window._do_translate)
+        window._translate_timer = timer
+
+        def on_request(text):
+            self._log("request", text)
+            self.mock.translate_async(text, on_response)
+
+        def on_response(result):
+            self._log("response", result)
+            window.show_translation(result)
+
+        window.translate_requested.connect(on_request)
+
+        def on_text(event):
+            self._log("text", event['text'])
+            window.input_edit.setText(event['text'])
+
+        def on_hotkey(event):
+            self._log("hotkey")
+            window.activate()
+
+        def on_paste(event):
+            self._log("paste")
+            window._on_enter_pressed()
+
+        return {"text": on_text, "hotkey": on_hotkey, "paste": on_paste}
+
+    def _setup_floating(self) -> dict:
+        from main import FloatingTranslator
+        from history_store import HistoryStore
+
+        self._history_dir = tempfile.TemporaryDirectory()
+        window = FloatingTranslator(
+            translator=self.mock,
+            history=HistoryStore(self._history_dir.name),
+            global_hotkey=False
+        )
+        window._auto_paste = False
+        self.window = window
+
+        window.translation_done.connect(lambda original, result: self._log("response", result))
+        window.translation_failed.connect(lambda original, kind, message: self._log("error", kind))
+
+        def on_text(event):
+            self._log("text", event['text'])
+            window.input_box.setText(event['text'])
+
+        def on_hotkey(event):
+            self._log("hotkey")
+            window._wake_up()
+
+        def on_submit(event):
+            window.input_box.setText(event['text'])
+            self._log("request", event['text'])
+            scheduled = self.mock.scheduled
+            window._on_translate_and_paste()
+            # 翻译在工作线程中提交给模拟服务，等它登记到虚拟时钟后再继续
+            deadline = time.monotonic() + 2
+            while self.mock.scheduled == scheduled and time.monotonic() < deadline:
+                time.sleep(0.001)
+
+        return {"text": on_text, "hotkey": on_hotkey, "submit": on_submit}
+
+
+def summarize(timeline: List[tuple]) -> dict:
+    """从时间线计算请求数和 "最后一次输入 → 结果显示" 延迟"""
+    last_text = None
+    latencies = []
+    requests = 0
+    for t, kind, _ in timeline:
+        if kind == "text":
+            last_text = t
+        elif kind == "request":
+            requests += 1
+        elif kind == "response" and last_text is not None:
+            latencies.append(t - last_text)
+    summary = {"text_events": sum(1 for e in timeline if e[1] == "text"), "requests": requests}
+    if latencies:
+        latencies.sort()
+        summary.update({
+            "input_to_result_median_ms": statistics.median(latencies),
+            "input_to_result_p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        })
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="确定性回放会话轨迹")
+    parser.add_argument("trace", help="轨迹文件 (.jsonl / .jsonl.gz)")
+    parser.add_argument("--target", choices=("input", "floating"), default="input")
+    parser.add_argument("--runs", type=int, default=2, help="回放次数（多次回放会校验结果一致）")
+    parser.add_argument("--synthetic", action="store_true", help="不复用录制的响应，按文本长度模拟延迟")
+    args = parser.parse_args()
+
+    events = load_trace(args.trace)
+    recorded = list(iter_requests(events))
+    if recorded:
+        real = sorted(r['latency_ms'] for r in recorded)
+        print(f"录制: {len(recorded)} 个请求, 延迟中位数 {statistics.median(real):.0f} ms")
+
+    first = None
+    for run in range(args.runs):
+        replayer = TraceReplayer(events, args.target, use_recorded=not args.synthetic)
+        timeline = replayer.run()
+        if first is None:
+            first = timeline
+            for key, value in summarize(timeline).items():
+                print(f"回放 {key}: {value:.1f}" if isinstance(value, float) else f"回放 {key}: {value}")
+        elif timeline != first:
+            print(f"❌ 第 {run + 1} 次回放结果与第 1 次不一致")
+            sys.exit(1)
+    if args.runs > 1:
+        print(f"✅ {args.runs} 次回放结果一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Translation Cache
+译文缓存 - 按 (翻译目标, 规范化原文) 缓存译文，LRU 淘汰
+
+每条记录同时保存生成它的模型、提示词版本和时间，
+配置变化后调用方可以据此判断记录是否过期。
+"""
+
+import re
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+def normalize_key(text: str) -> str:
+    """缓存键：去掉首尾空白，连续空白合并为一个空格"""
+    return WHITESPACE_PATTERN.sub(' ', text.strip())
+
+
+def prompt_version(system_prompt: str, glossary: str = "") -> str:
+    """提示词版本（内容摘要），提示词或术语表改动后旧译文不再视为最新
+
+    Args:
+        glossary: 对该目标生效的术语表的版本（内容摘要等），没有术语表时为空
+    """
+    if glossary:
+        system_prompt += "\0" + glossary
+    return hashlib.sha1(system_prompt.encode('utf-8')).hexdigest()[:8]
+
+
+class CacheEntry(NamedTuple):
+    """缓存记录"""
+    result: str
+    model: str
+    prompt_version: str
+    created: float
+    speculative: bool = False  # 由预翻译写入、尚未被用户使用
+
+
+class TranslationCache:
+    """线程安全的 LRU 译文缓存"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str, target: str = "en") -> Optional[CacheEntry]:
+        key = (target, normalize_key(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def contains(self, text: str, target: str = "en") -> bool:
+        """是否已缓存（不计入命中统计、不调整 LRU 顺序）"""
+        with self._lock:
+            return (target, normalize_key(text)) in self._entries
+
+    def put(
+        self,
+        text: str,
+        result: str,
+        target: str = "en",
+        model: str = "",
+        version: str = "",
+        speculative: bool = False
+    ) -> Optional[CacheEntry]:
+        """写入译文，返回被挤出的记录（用于统计浪费的预翻译）"""
+        key = (target, normalize_key(text))
+        entry = CacheEntry(result, model, version, time.time(), speculative)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                return self._entries.popitem(last=False)[1]
+        return None
+
+    def mark_used(self, text: str, target: str = "en"):
+        """预翻译的记录被用户使用后清除 speculative 标记"""
+        key = (target, normalize_key(text))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.speculative:
+                self._entries[key] = entry._replace(speculative=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def trim(self, keep: int) -> int:
+        """只保留最近使用的 keep 条（空闲时调用），返回淘汰的条数"""
+        with self._lock:
+            dropped = max(0, len(self._entries) - keep)
+            for _ in range(dropped):
+                self._entries.popitem(last=False)
+        return dropped
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "条目": len(self),
+            "命中": self.hits,
+            "未命中": self.misses,
+            "命中率": f"{self.hits / total:.0%}" if total else "-",
+        }
@@ -0,0 +1,359 @@
+"""
+Translation Service
+带缓存和优先级的翻译服务
+
+- 交互请求（用户点击 / 回车）先查缓存，未命中时在调用线程直接请求，不排队
+- 后台和预翻译请求进入优先级队列，由少量工作线程按优先级执行，
+  不会挤占交互请求的连接和额度
+- 同一原文同时只请求一次：交互请求遇到尚未开始的后台任务时直接接手，
+  已在进行中（包括其他交互请求）则等待其结果
+- 过期的缓存（超过 ttl，或由其他模型 / 旧版提示词 / 旧版术语表生成）照常立即返回，
+  同时以最低优先级在后台重新翻译，结果不同时通过 on_refresh 通知界面
+- 可选的预热缓存（warm_cache.WarmCache，只读）排在 LRU 缓存之前；
+  预热条目不受 ttl 限制，只在模型或提示词变化后让位于运行时缓存中的新译文
+"""
+
+import os
+import time
+import heapq
+import itertools
+import threading
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+
+import diagnostics
+from translation_cache import TranslationCache, normalize_key
+
+
+# 优先级（数值越小越先执行）
+INTERACTIVE = 0
+BACKGROUND = 1
+SPECULATIVE = 2
+REVALIDATE = 3
+
+# 后台队列中各优先级请求在用量统计里的功能名
+FEATURES = {INTERACTIVE: "translate", BACKGROUND: "background", SPECULATIVE: "speculative",
+            REVALIDATE: "revalidate"}
+
+
+class _OwnerAborted(Exception):
+    """发起请求的调用方自己的流式回调出错（如本机接口的客户端断开），等待同一结果的请求应自行重试"""
+
+
+class BudgetExceeded(Exception):
+    """用量已到该优先级的暂停线，后台 / 预翻译请求不再发出"""
+
+    kind = "budget"
+    retryable = False
+
+
+class TranslationService:
+    """翻译服务（线程安全）"""
+
+    def __init__(self, translator, cache: Optional[TranslationCache] = None, workers: int = 2,
+                 ttl: Optional[float] = None, revalidate: bool = True, warm=None):
+        """初始化
+
+        Args:
+            translator: Translator 或 MockTranslator
+            cache: 译文缓存，默认新建
+            workers: 后台队列的工作线程数
+            ttl: 缓存记录多少秒后视为过期，None 表示只按模型和提示词版本判断
+            revalidate: 命中过期记录时是否在后台重新翻译
+            warm: 预热缓存 WarmCache，None 表示不使用
+        """
+        self.translator = translator
+        self.cache = cache if cache is not None else TranslationCache()
+        self.ttl = ttl
+        self.revalidate = revalidate
+        self.warm = warm
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._queue = []
+        self._seq = itertools.count()
+        self._inflight: Dict[Tuple[str, str], Tuple[int, Future]] = {}
+        self._speculative = {"提交": 0, "完成": 0, "失败": 0, "预算暂停": 0, "命中": 0, "未使用即淘汰": 0}
+        self._revalidation = {"过期命中": 0, "重新翻译": 0, "译文变化": 0}
+
+        for i in range(workers):
+            threading.Thread(target=self._worker, name=f"translate-bg-{i}", daemon=True).start()
+        diagnostics.register("翻译缓存", self.stats)
+
+    def _target(self, target=None):
+        return target if target is not None else self.translator.targets[0]
+
+    def store(self, text: str, result: str, target=None, speculative: bool = False, model: Optional[str] = None):
+        """写入缓存（不经过本服务翻译的结果也可以存进来）
+
+        Args:
+            model: 实际给出译文的模型（Translator.translate 的 on_model），默认取当前方案的模型
+        """
+        target = self._target(target)
+        evicted = self.cache.put(
+            text, result, target.name,
+            model=model if model is not None else self.translator.model,
+            version=self.translator.target_version(target),
+            speculative=speculative
+        )
+        with self._lock:
+            if speculative:
+                self._speculative["完成"] += 1
+            if evicted is not None and evicted.speculative:
+                self._speculative["未使用即淘汰"] += 1
+
+    def _speculative_hit(self):
+        with self._lock:
+            self._speculative["命中"] += 1
+
+    def _outdated(self, entry, target) -> bool:
+        # 启用路由时同一方案会用到多个模型，由其中任一模型生成的译文都算最新
+        return (entry.model not in self.translator.serving_models()
+                or entry.prompt_version != self.translator.target_version(target))
+
+    def is_stale(self, entry, target) -> bool:
+        """记录是否过期：超过 ttl，或模型 / 提示词版本与当前不同"""
+        if self.ttl is not None and time.time() - entry.created > self.ttl:
+            return True
+        return self._outdated(entry, target)
+
+    def _lookup(self, text: str, target):
+        """预热缓存 → LRU 缓存，返回 (记录, 是否过期)"""
+        warm = self.warm.get(text, target.name) if self.warm is not None else None
+        if warm is not None and not self._outdated(warm, target):
+            return warm, False
+        entry = self.cache.get(text, target.name)
+        if entry is not None:
+            return entry, self.is_stale(entry, target)
+        return warm, warm is not None
+
+    def contains(self, text: str, target=None) -> bool:
+        """预热缓存或 LRU 缓存中是否有记录（不计入统计）"""
+        target = self._target(target)
+        if self.warm is not None and self.warm.get(text, target.name) is not None:
+            return True
+        return self.cache.contains(text, target.name)
+
+    def cached(self, text: str, target=None, on_refresh: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """只查缓存，命中返回译文
+
+        命中过期记录时同样立即返回，并以最低优先级在后台重新翻译；
+        新译文与返回的不同时调用 on_refresh(新译文)（在工作线程中）。
+        """
+        target = self._target(target)
+        entry, stale = self._lookup(text, target)
+        if entry is None:
+            return None
+        if entry.speculative:
+            self._speculative_hit()
+            self.cache.mark_used(text, target.name)
+        if self.revalidate and stale:
+            with self._lock:
+                self._revalidation["过期命中"] += 1
+            self._revalidate(text, target, entry.result, on_refresh)
+        return entry.result
+
+    def _revalidate(self, text: str, target, shown: str, on_refresh):
+        future = self.submit(text, REVALIDATE, target)
+
+        def done(future):
+            if future.cancelled() or future.exception() is not None:
+                return
+            result = future.result()
+            if result != shown:
+                with self._lock:
+                    self._revalidation["译文变化"] += 1
+                if on_refresh:
+                    on_refresh(result)
+
+        future.add_done_callback(done)
+
+    def translate(self, text: str, target=None, on_delta=None, feature: Optional[str] = None) -> str:
+        """交互翻译：缓存 → 接手 / 等待进行中的同文请求 → 直接请求
+
+        Args:
+            on_delta: 流式回调；命中缓存或等待其他请求时整段回调一次
+            feature: 用量统计中的功能名，默认 translate
+        """
+        target = self._target(target)
+        result = self.cached(text, target)
+        if result is not None:
+            if on_delta:
+                on_delta(result)
+            return result
+
+        key = (target.name, normalize_key(text))
+        with self._lock:
+            priority, future = self._inflight.get(key, (None, None))
+            if future is not None and future.cancel():
+                future = None  # 还在排队：由当前线程接手
+            if future is None:
+                # 登记为进行中，同时到达的相同请求等待本次结果
+                own = Future()
+                own.set_running_or_notify_cancel()
+                self._inflight[key] = (INTERACTIVE, own)
+        if future is not None:
+            try:
+                result = future.result()
+            except Exception as e:
+                if priority == INTERACTIVE and not isinstance(e, _OwnerAborted):
+                    raise
+                # 后台请求失败或发起方中途放弃，交互请求自己重试
+                return self.translator.translate(text, target, feature=feature or FEATURES[INTERACTIVE], on_delta=on_delta)
+            if priority == SPECULATIVE:
+                self._speculative_hit()
+                self.cache.mark_used(text, target.name)
+            if on_delta:
+                on_delta(result)
+            return result
+
+        callback_failed = []
+
+        def forward(delta):
+            try:
+                on_delta(delta)
+            except BaseException:
+                callback_failed.append(True)
+                raise
+
+        try:
+            served = []
+            result = self.translator.translate(text, target, feature=feature or FEATURES[INTERACTIVE],
+                                               on_delta=forward if on_delta else None, on_model=served.append)
+            self.store(text, result, target, model=served[-1] if served else None)
+            own.set_result(result)
+            return result
+        except BaseException as e:
+            # 只是本调用方的回调出错时，不把它的异常交给等待同一结果的其他请求
+            own.set_exception(_OwnerAborted(str(e)) if callback_failed else e)
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key, (None, None))[1] is own:
+                    del self._inflight[key]
+
+    def submit(self, text: str, priority: int = BACKGROUND, target=None) -> Future:
+        """提交到后台队列；同一原文已在队列或进行中时返回同一个 Future"""
+        target = self._target(target)
+        key = (target.name, normalize_key(text))
+        with self._lock:
+            if key in self._inflight:
+                return self._inflight[key][1]
+            future = Future()
+            self._inflight[key] = (priority, future)
+            heapq.heappush(self._queue, (priority, next(self._seq), key, text, target, future))
+            if priority == SPECULATIVE:
+                self._speculative["提交"] += 1
+            self._ready.notify()
+        return future
+
+    def pretranslate(self, text: str) -> Optional[Future]:
+        """预翻译（最低优先级）；已缓存或已在请求中时跳过"""
+        target = self._target()
+        if self.contains(text, target):
+            return None
+        with self._lock:
+            if (target.name, normalize_key(text)) in self._inflight:
+                return None
+        return self.submit(text, SPECULATIVE, target)
+
+    def pending(self, priority: Optional[int] = None) -> int:
+        """排队中的任务数（可按优先级过滤）"""
+        with self._lock:
+            return sum(1 for item in self._queue if priority is None or item[0] == priority)
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._queue:
+                    self._ready.wait()
+                priority, _, key, text, target, future = heapq.heappop(self._queue)
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                usage = getattr(self.translator, 'usage', None)
+                if usage is not None and not usage.allow(priority):
+                    raise BudgetExceeded("已接近用量预算，暂停后台请求")
+                served = []
+                result = self.translator.translate(text, target, feature=FEATURES.get(priority, "background"),
+                                                   on_model=served.append)
+                self.store(text, result, target, speculative=priority == SPECULATIVE,
+                           model=served[-1] if served else None)
+                if priority == REVALIDATE:
+                    with self._lock:
+                        self._revalidation["重新翻译"] += 1
+                future.set_result(result)
+            except Exception as e:
+                if priority == SPECULATIVE:
+                    with self._lock:
+                        self._speculative["预算暂停" if isinstance(e, BudgetExceeded) else "失败"] += 1
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    if self._inflight.get(key, (None, None))[1] is future:
+                        del self._inflight[key]
+
+    def trim(self, keep: int):
+        """空闲回收：LRU 缓存只保留最近使用的 keep 条，预热缓存交还已读入的页面"""
+        dropped = self.cache.trim(keep)
+        if self.warm is not None:
+            self.warm.trim()
+        if dropped:
+            print(f"[译文缓存] 空闲回收 {dropped} 条，保留 {len(self.cache)} 条")
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        speculative = dict(self._speculative)
+        for key, value in speculative.items():
+            stats[f"预翻译{key}"] = value
+        done = speculative["完成"]
+        if done:
+            stats["预翻译命中率"] = f"{speculative['命中'] / done:.0%}"
+        stats.update(self._revalidation)
+        if self.warm is not None:
+            stats.update(self.warm.stats())
+        return stats
+
+
+_service: Optional[TranslationService] = None
+_service_lock = threading.Lock()
+
+
+def _load_warm(path: Optional[str]):
+    if not path or not os.path.exists(path):
+        return None
+    from warm_cache import WarmCache
+    try:
+        warm = WarmCache(path)
+    except (OSError, ValueError) as e:
+        print(f"[预热缓存] 无法加载 {path}: {e}")
+        return None
+    print(f"[预热缓存] {path}：{len(warm)} 条")
+    return warm
+
+
+def get_service(config_manager=None) -> TranslationService:
+    """进程内共享的翻译服务
+
+    悬浮窗、主窗口、托盘、命令行和本机接口都通过它翻译，共用一个 Translator
+    （即一个 HTTP 连接池）、一份缓存和一个后台队列。首次调用时按配置创建。
+
+    Args:
+        config_manager: 共享的配置管理器，首次调用未传入时读取 config.json
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            from translator import Translator
+            if config_manager is None:
+                from config_manager import ConfigManager
+                config_manager = ConfigManager('config.json')
+                config_manager.start()
+            cache_config = config_manager.get('cache') or {}
+            ttl_hours = cache_config.get('ttl_hours')
+            _service = TranslationService(
+                Translator(config_manager=config_manager),
+                ttl=float(ttl_hours) * 3600 if ttl_hours else None,
+                revalidate=bool(cache_config.get('revalidate', True)),
+                warm=_load_warm(cache_config.get('warm_path'))
+            )
+        return _service
@@ -3,29 +3,28 @@ OpenAI API Translator Module
 调用 OpenAI 兼容 API 进行中译英翻译
 """
 
-import json
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import httpx
+import openai
 from openai import OpenAI
 
+import http_transport
+from candidates import CandidateStyle, FieldStream, build_prompt, build_styles, parse_candidates
+from config_manager import ConfigManager
+from glossary import Glossary, load_glossary
+from model_router import ModelRouter
+from resilience import CircuitBreaker, backoff_delay, parse_retry_after
+from think_filter import THINK_PATTERN, ThinkFilter
+from translation_cache import prompt_version
+from usage_tracker import Usage, UsageTracker, estimate_usage
 
-class Translator:
-    """翻译器类，封装 OpenAI API 调用"""
-    
-    def __init__(self, config_path: str = "config.json"):
-        """初始化翻译器
-        
-        Args:
-            config_path: 配置文件路径
-        """
-        with open(config_path, 'r', encoding='utf-8') as f:
-            config = json.load(f)
-        
-        self.client = OpenAI(
-            api_key=config['api_key'],
-            base_url=config['api_base']
-        )
-        self.model = config.get('model', 'gpt-3.5-turbo')
-        
-        self.system_prompt = """你是一个专业的中英翻译专家。请将用户输入的中文翻译成自然流畅的英文。
+
+SYSTEM_PROMPT = """你是一个专业的中英翻译专家。请将用户输入的中文翻译成自然流畅的英文。
 
 翻译要求：
 1. 保持原文的语气和风格
@@ -36,43 +35,652 @@ class Translator:
 
 注意：用户输入可能是从键盘实时捕获的，可能有一些拼写错误或不完整的句子，请尽量理解其意图并翻译。"""
 
-    def translate(self, chinese_text: str) -> str:
+# 配置中 targets 未写 prompt 时，按 language / style 生成系统提示词
+TARGET_PROMPT_TEMPLATE = """你是一个专业的翻译专家。请将用户输入的中文翻译成自然流畅的{language}。
+
+翻译要求：
+1. {style}
+2. 译文要地道自然，符合{language}的表达习惯
+3. 只输出翻译结果，不要添加任何解释
+
+注意：用户输入可能是从键盘实时捕获的，可能有一些拼写错误或不完整的句子，请尽量理解其意图并翻译。"""
+
+
+class TranslationTarget(NamedTuple):
+    """一个翻译目标（目标语言 / 风格）"""
+    name: str
+    label: str
+    system_prompt: str
+
+
+DEFAULT_TARGETS = [TranslationTarget("en", "🇬🇧 译文", SYSTEM_PROMPT)]
+
+
+def build_targets(config: dict) -> List[TranslationTarget]:
+    """根据配置中的 targets 生成翻译目标列表（跳过 "enabled": false 的目标），第一个为主目标（用于粘贴）"""
+    targets = []
+    for item in config.get('targets') or []:
+        if not item.get('enabled', True):
+            continue
+        prompt = item.get('prompt')
+        if not prompt:
+            prompt = TARGET_PROMPT_TEMPLATE.format(
+                language=item.get('language', '英文'),
+                style=item.get('style', '保持原文的语气和风格')
+            )
+        targets.append(TranslationTarget(item['name'], item.get('label', item['name']), prompt))
+    return targets or list(DEFAULT_TARGETS)
+
+
+class TranslationError(Exception):
+    """翻译失败基类
+
+    kind 用于 UI 和统计区分错误类型，retryable 表示是否可以重试
+    """
+
+    kind = "error"
+    retryable = False
+
+
+class TranslationTimeout(TranslationError):
+    """请求超时 (phase: connect / first_token / total)"""
+
+    kind = "timeout"
+    retryable = True
+
+    def __init__(self, phase: str, seconds: float):
+        self.phase = phase
+        self.seconds = seconds
+        names = {"connect": "连接", "first_token": "首字", "total": "总"}
+        super().__init__(f"{names.get(phase, phase)}超时 ({seconds:g}s)")
+
+
+class ConnectionFailed(TranslationError):
+    """网络连接失败"""
+
+    kind = "connection"
+    retryable = True
+
+
+class RateLimited(TranslationError):
+    """触发限流 (HTTP 429)"""
+
+    kind = "rate_limited"
+    retryable = True
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class ProviderError(TranslationError):
+    """服务端返回错误状态码"""
+
+    kind = "provider"
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        self.status_code = status_code
+        # 5xx 和 408 可重试，其余 4xx 不重试
+        self.retryable = status_code is None or status_code >= 500 or status_code == 408
+        super().__init__(message)
+
+
+class AuthenticationFailed(TranslationError):
+    """API Key 无效或无权限"""
+
+    kind = "auth"
+
+
+class CircuitOpen(TranslationError):
+    """熔断中，快速失败"""
+
+    kind = "circuit_open"
+
+    def __init__(self, retry_in: float):
+        self.retry_in = retry_in
+        super().__init__(f"服务暂不可用，{retry_in:.0f}s 后重试")
+
+
+class ProfileClient:
+    """单个配置方案的客户端、熔断器与超时参数
+
+    每个方案各自持有一个 OpenAI 客户端，底层共用进程内的连接池（http_transport），
+    连接按端点区分，切换方案不需要重新建连。
+    """
+
+    def __init__(self, name: str, profile: dict):
+        self.name = name
+        self.api_key = profile['api_key']
+        self.api_base = profile['api_base']
+        # 路由按方案生效，模型统计随端点走
+        self.router = ModelRouter(profile=name)
+        self.breaker = CircuitBreaker()
+        self.update(profile)
+
+        self._client: Optional[OpenAI] = None
+        self._client_lock = threading.Lock()
+        self.warmed = False
+
+    @property
+    def client(self) -> OpenAI:
+        """按需创建客户端（空闲回收后下次请求时重建）"""
+        with self._client_lock:
+            if self._client is None:
+                # 重试由 Translator 负责，关闭 SDK 自带重试
+                self._client = OpenAI(
+                    api_key=self.api_key,
+                    base_url=self.api_base,
+                    max_retries=0,
+                    http_client=http_transport.get_transport().client
+                )
+            return self._client
+
+    def update(self, profile: dict):
+        """更新不影响连接的参数（模型、路由、超时、重试、熔断阈值）"""
+        self.model = profile.get('model', 'gpt-3.5-turbo')
+        self.router.update_config(profile)
+
+        timeouts = profile.get('timeouts', {})
+        self.connect_timeout = float(timeouts.get('connect', 5))
+        self.first_token_timeout = float(timeouts.get('first_token', 15))
+        self.total_timeout = float(timeouts.get('total', 60))
+
+        retry = profile.get('retry', {})
+        self.max_attempts = int(retry.get('max_attempts', 3))
+        self.backoff_base = float(retry.get('base_delay', 0.5))
+        self.backoff_cap = float(retry.get('max_delay', 8))
+
+        breaker = profile.get('circuit_breaker', {})
+        self.breaker.configure(
+            failure_threshold=int(breaker.get('failure_threshold', 5)),
+            reset_timeout=float(breaker.get('reset_timeout', 30))
+        )
+
+    def same_endpoint(self, profile: dict) -> bool:
+        return profile['api_key'] == self.api_key and profile['api_base'] == self.api_base
+
+    def warm_up(self):
+        """预先建立连接（TLS 握手等），失败忽略"""
+        try:
+            self.client.models.list(timeout=self.connect_timeout + self.first_token_timeout)
+            self.warmed = True
+        except Exception as e:
+            print(f"[翻译] 方案 {self.name} 预热失败: {e}")
+
+    def release(self):
+        """丢弃客户端，下次使用时重新创建（连接属于共享连接池，不在这里关闭）"""
+        with self._client_lock:
+            self._client = None
+            self.warmed = False
+
+
+class Translator:
+    """翻译器类，封装 OpenAI API 调用"""
+
+    def __init__(self, config_path: str = "config.json", config_manager: Optional[ConfigManager] = None):
+        """初始化翻译器
+
+        Args:
+            config_path: 配置文件路径（未传入 config_manager 时使用）
+            config_manager: 共享的配置管理器，配置变化时自动切换客户端
+        """
+        if config_manager is None:
+            config_manager = ConfigManager(config_path)
+            config_manager.start()
+        self.config_manager = config_manager
+
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, ProfileClient] = {}
+        self.targets: List[TranslationTarget] = list(DEFAULT_TARGETS)
+        self.candidate_styles: List[CandidateStyle] = []  # 为空表示不启用多候选
+        self._candidate_json_mode = False
+        self.usage = UsageTracker(path=None)
+        self.glossary: Optional[Glossary] = None
+        self._glossary_source = None  # (路径, 修改时间)
+        self._glossary_config = {}
+        # 多目标并发请求的线程池
+        self._executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="translate")
+        self._apply_config(config_manager.config)
+        config_manager.subscribe(self._apply_config)
+
+    def _apply_config(self, config: dict):
+        """应用（重新加载后的）配置
+
+        端点不变的方案保留原客户端；端点变化或被删除的方案直接换新，
+        进行中的请求仍用旧客户端完成，旧端点的空闲连接由共享连接池按 keep-alive 时长回收。
+        """
+        http_transport.configure(config.get('http') or {})
+        with self._lock:
+            profiles = {}
+            for name, profile in config['profiles'].items():
+                current = self._profiles.get(name)
+                if current is not None and current.same_endpoint(profile):
+                    current.update(profile)
+                    profiles[name] = current
+                else:
+                    profiles[name] = ProfileClient(name, profile)
+            self._profiles = profiles
+            self.targets = build_targets(config)
+            candidates = config.get('candidates') or {}
+            self.candidate_styles = build_styles(candidates) if candidates.get('enabled') else []
+            self._candidate_json_mode = bool(candidates.get('response_format', False))
+        self.usage.update_config(config)
+        self._update_glossary(config.get('glossary') or {})
+
+    def _update_glossary(self, glossary_config: dict):
+        """按配置加载术语表（源文件未变化时沿用已加载的）"""
+        self._glossary_config = glossary_config
+        path = glossary_config.get('path')
+        if not path:
+            self.glossary, self._glossary_source = None, None
+            return
+        try:
+            source = (path, os.path.getmtime(path))
+        except OSError:
+            print(f"[术语表] 找不到 {path}")
+            self.glossary, self._glossary_source = None, None
+            return
+        if source == self._glossary_source:
+            return
+        start = time.perf_counter()
+        self.glossary = load_glossary(path)
+        self._glossary_source = source
+        print(f"[术语表] 已加载 {len(self.glossary)} 条 ({(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    def _glossary_for(self, target: TranslationTarget) -> Optional[Glossary]:
+        """对该目标生效的术语表"""
+        targets = self._glossary_config.get('targets')
+        if targets and target.name not in targets:
+            return None
+        return self.glossary
+
+    def target_version(self, target: TranslationTarget) -> str:
+        """目标的提示词版本：系统提示词加上生效的术语表内容（缓存据此判断译文是否过期）"""
+        glossary = self._glossary_for(target)
+        if glossary is None:
+            return prompt_version(target.system_prompt)
+        max_terms = int(self._glossary_config.get('max_terms', 50))
+        return prompt_version(target.system_prompt, f"{glossary.digest}:{max_terms}")
+
+    def _glossary_prompt(self, target: TranslationTarget, chinese_text: str) -> str:
+        """命中的术语段，追加在系统提示词之后"""
+        glossary = self._glossary_for(target)
+        if glossary is None:
+            return ""
+        return glossary.prompt_for(chinese_text, int(self._glossary_config.get('max_terms', 50)))
+
+    @property
+    def active(self) -> ProfileClient:
+        """当前方案"""
+        name = self.config_manager.active_profile
+        with self._lock:
+            # 重新加载的瞬间方案表可能尚未更新，退回第一个方案
+            return self._profiles.get(name) or next(iter(self._profiles.values()))
+
+    @property
+    def model(self) -> str:
+        return self.active.model
+
+    @property
+    def client(self) -> OpenAI:
+        return self.active.client
+
+    def serving_models(self) -> Set[str]:
+        """当前方案下可能给出译文的模型（启用路由时为路由中的各个模型）"""
+        profile = self.active
+        return profile.router.serving_models(profile.model)
+
+    def profile_names(self) -> List[str]:
+        with self._lock:
+            return list(self._profiles)
+
+    def switch_profile(self, name: str):
+        """切换方案，进行中的请求继续使用原方案完成"""
+        self.config_manager.set_active_profile(name)
+
+    def warm_up(self):
+        """后台预热所有尚未预热的方案"""
+        with self._lock:
+            pending = [p for p in self._profiles.values() if not p.warmed]
+        for profile in pending:
+            threading.Thread(target=profile.warm_up, daemon=True).start()
+
+    def release_pools(self):
+        """空闲回收：关闭共享连接池中的空闲连接（进行中的请求不受影响），下次请求时重新建连"""
+        with self._lock:
+            profiles = list(self._profiles.values())
+        for profile in profiles:
+            profile.release()
+        http_transport.release()
+
+    def translate(
+        self,
+        chinese_text: str,
+        target: Optional[TranslationTarget] = None,
+        model: Optional[str] = None,
+        feature: Optional[str] = None,
+        on_delta: Optional[Callable[[str], None]] = None,
+        on_model: Optional[Callable[[str], None]] = None
+    ) -> str:
         """翻译中文到英文
-        
+
         Args:
             chinese_text: 待翻译的中文文本
-            
+            target: 翻译目标，默认为主目标
+            model: 指定模型，跳过路由策略
+            feature: 用量统计中的功能名，默认按目标区分（translate / target:名称）
+            on_delta: 流式回调，收到新的译文片段时调用（已去掉 <think> 部分），在调用线程中执行
+            on_model: 成功时以实际给出译文的模型调用（启用路由时不一定是方案的模型）
+
         Returns:
             翻译后的英文文本
+
+        Raises:
+            TranslationError: 超时、限流、熔断等失败，按子类区分
         """
         if not chinese_text.strip():
             return ""
-        
+
+        primary = self.targets[0]
+        target = target or primary
+        if feature is None:
+            feature = "translate" if target.name == primary.name else f"target:{target.name}"
+        system_prompt = target.system_prompt + self._glossary_prompt(target, chinese_text)
+        # 整个请求固定使用开始时的方案，期间切换方案不影响本次请求
+        profile = self.active
+        decision = profile.router.choose(chinese_text, profile.model, model)
+        try:
+            result = self._translate_with_retry(
+                profile, decision.model, system_prompt, chinese_text, feature, on_delta
+            )
+        except TranslationError as e:
+            profile.router.record(decision, ok=False, error_kind=e.kind)
+            raise
+        profile.router.record(decision, ok=True)
+        if on_model:
+            on_model(decision.model)
+        return result
+
+    def translate_candidates(
+        self,
+        chinese_text: str,
+        styles: Optional[List[CandidateStyle]] = None,
+        target: Optional[TranslationTarget] = None,
+        on_candidate: Optional[Callable[[str, str], None]] = None
+    ) -> Dict[str, str]:
+        """一次请求生成多种风格的候选译文（JSON 输出）
+
+        Args:
+            styles: 候选风格，默认按配置 candidates.styles
+            target: 翻译目标（语言），默认为主目标
+            on_candidate: 每个候选在流中完整出现时立即回调 (风格名, 译文)，在调用线程中执行
+
+        Returns:
+            风格名 -> 译文（按 styles 顺序；输出不是 JSON 时整段作为第一种风格）
+
+        Raises:
+            TranslationError: 同 translate
+        """
+        if not chinese_text.strip():
+            return {}
+        styles = styles or self.candidate_styles or build_styles({})
+        target = target or self.targets[0]
+        system_prompt = (target.system_prompt + self._glossary_prompt(target, chinese_text)
+                         + build_prompt(styles))
+        names = {s.name for s in styles}
+        parser = FieldStream()
+        surfaced = {}
+
+        def on_delta(delta):
+            for name, text in parser.feed(delta):
+                if name in names and name not in surfaced and text.strip():
+                    surfaced[name] = text.strip()
+                    if on_candidate:
+                        on_candidate(name, surfaced[name])
+
+        profile = self.active
+        decision = profile.router.choose(chinese_text, profile.model)
+        response_format = {"type": "json_object"} if self._candidate_json_mode else None
+        try:
+            raw = self._translate_with_retry(
+                profile, decision.model, system_prompt, chinese_text, "candidates", on_delta, response_format
+            )
+        except TranslationError as e:
+            profile.router.record(decision, ok=False, error_kind=e.kind)
+            raise
+        profile.router.record(decision, ok=True)
+
+        results = parse_candidates(raw, styles)
+        for name, text in results.items():
+            if name not in surfaced and on_candidate:
+                on_candidate(name, text)
+        return results
+
+    def _translate_with_retry(
+        self,
+        profile: ProfileClient,
+        model: str,
+        system_prompt: str,
+        chinese_text: str,
+        feature: str,
+        on_delta: Optional[Callable[[str], None]] = None,
+        response_format: Optional[dict] = None
+    ) -> str:
+        """带熔断、退避重试和总期限的请求
+
+        已经向 on_delta 输出过内容的请求失败后不再重试（调用方无法撤回已显示的片段）
+        """
+        deadline = time.monotonic() + profile.total_timeout
+        attempt = 0
+        emitted = []
+
+        def forward(delta):
+            emitted.append(delta)
+            on_delta(delta)
+
+        while True:
+            if not profile.breaker.allow():
+                raise CircuitOpen(profile.breaker.retry_in())
+
+            attempt += 1
+            try:
+                result, usage = self._request(
+                    profile, model, system_prompt, chinese_text, deadline, forward if on_delta else None,
+                    response_format
+                )
+            except TranslationError as e:
+                if e.retryable:
+                    profile.breaker.record_failure()
+                else:
+                    # 非服务端故障（如鉴权失败、请求有误）不计入熔断：不清零失败计数，
+                    # 也不能让半开状态的探测因此判定服务已恢复，只归还探测名额
+                    profile.breaker.release()
+
+                if not e.retryable or attempt >= profile.max_attempts or emitted:
+                    raise
+
+                delay = backoff_delay(attempt, profile.backoff_base, profile.backoff_cap)
+                if isinstance(e, RateLimited) and e.retry_after is not None:
+                    delay = max(delay, e.retry_after)
+                if time.monotonic() + delay >= deadline:
+                    raise
+                print(f"[翻译] {e.kind} 失败，{delay:.2f}s 后第 {attempt + 1} 次尝试")
+                time.sleep(delay)
+                continue
+            except BaseException:
+                # 服务端错误都已转换为 TranslationError，这里是 on_delta 回调出错、被中断等；
+                # 不计入熔断，但必须归还半开状态的探测名额，否则该方案会一直熔断
+                profile.breaker.release()
+                raise
+
+            profile.breaker.record_success()
+            self._record_usage(profile, model, system_prompt + chinese_text, result, usage, feature)
+            return THINK_PATTERN.sub('', result).strip()
+
+    def _record_usage(self, profile: ProfileClient, model: str, prompt: str, raw: str, usage, feature: str):
+        """记录用量；<think> 部分计为思考 token（服务端未细分时按字数比例拆分）"""
+        thinking = "".join(THINK_PATTERN.findall(raw))
+        if usage is None:
+            recorded = estimate_usage(prompt, THINK_PATTERN.sub('', raw), thinking)
+        else:
+            recorded = Usage.from_response(usage)
+            if not recorded.reasoning and thinking:
+                recorded = recorded._replace(reasoning=round(recorded.completion * len(thinking) / len(raw)))
+        self.usage.record(recorded, model, profile.name, feature)
+
+    def translate_targets(
+        self,
+        chinese_text: str,
+        on_result: Optional[Callable[[TranslationTarget, str, Optional[TranslationError]], None]] = None,
+        on_delta: Optional[Callable[[TranslationTarget, str], None]] = None,
+        targets: Optional[List[TranslationTarget]] = None,
+        on_model: Optional[Callable[[TranslationTarget, str], None]] = None
+    ) -> Dict[str, str]:
+        """并发翻译到所有配置的目标，总耗时约等于最慢的一个
+
+        Args:
+            chinese_text: 待翻译的中文文本
+            on_result: 每个目标完成时立即回调 (target, 译文, 错误)，在工作线程中调用
+            on_delta: 流式增量回调 (target, 增量)，在工作线程中调用
+            targets: 只翻译这些目标（默认全部）
+            on_model: 每个目标成功时以 (target, 给出译文的模型) 回调，先于 on_result
+
+        Returns:
+            目标名 -> 译文（失败的目标不包含在内）
+        """
+        targets = list(self.targets if targets is None else targets)
+        futures = {
+            self._executor.submit(
+                self.translate, chinese_text, t,
+                on_delta=(lambda delta, t=t: on_delta(t, delta)) if on_delta else None,
+                on_model=(lambda model, t=t: on_model(t, model)) if on_model else None
+            ): t
+            for t in targets
+        }
+        results = {}
+        for future in as_completed(futures):
+            target = futures[future]
+            error = None
+            try:
+                results[target.name] = future.result()
+            except TranslationError as e:
+                error = e
+            except Exception as e:
+                # 意外错误也只影响这一个目标，其余目标照常回调（界面据此结束「翻译中」状态）
+                error = TranslationError(f"{type(e).__name__}: {e}")
+                error.__cause__ = e
+            if on_result:
+                on_result(target, results.get(target.name, ""), error)
+        return results
+
+    def _request(
+        self,
+        profile: ProfileClient,
+        model: str,
+        system_prompt: str,
+        chinese_text: str,
+        deadline: float,
+        on_delta: Optional[Callable[[str], None]] = None,
+        response_format: Optional[dict] = None
+    ) -> Tuple[str, Optional[object]]:
+        """发送一次流式请求，受连接 / 首字 / 总时长三个期限约束
+
+        response_format 为 {"type": "json_object"} 等结构化输出要求，None 表示不传
+
+        Returns:
+            (原始输出, usage)；服务端没有在流末尾返回 usage 时为 None
+        """
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TranslationTimeout("total", profile.total_timeout)
+
+        # read 超时约束首个数据块到达时间及之后的数据块间隔
+        timeout = httpx.Timeout(
+            connect=min(profile.connect_timeout, remaining),
+            read=min(profile.first_token_timeout, remaining),
+            write=min(profile.connect_timeout, remaining),
+            pool=min(profile.connect_timeout, remaining)
+        )
+
+        parts = []
+        usage = None
+        visible = ThinkFilter() if on_delta else None
+        options = {"stream_options": {"include_usage": True}} if self.usage.stream_usage else {}
+        if response_format:
+            options["response_format"] = response_format
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
+            stream = profile.client.chat.completions.create(
+                model=model,
                 messages=[
-                    {"role": "system", "content": self.system_prompt},
+                    {"role": "system", "content": system_prompt},
                     {"role": "user", "content": chinese_text}
                 ],
                 temperature=0.3,
-                max_tokens=1000
+                max_tokens=1000,
+                stream=True,
+                timeout=timeout,
+                **options
             )
-            result = response.choices[0].message.content.strip()
-            
-            # 去除 <think> 标签内容
-            import re
-            result = re.sub(r'<think>.*?</think>\s*', '', result, flags=re.DOTALL)
-            
-            return result.strip()
-        except Exception as e:
-            return f"翻译错误: {str(e)}"
+            try:
+                for chunk in stream:
+                    if time.monotonic() > deadline:
+                        raise TranslationTimeout("total", profile.total_timeout)
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        content = chunk.choices[0].delta.content
+                        parts.append(content)
+                        if visible is not None:
+                            delta = visible.feed(content)
+                            if delta:
+                                on_delta(delta)
+                    # include_usage 时最后一个数据块没有 choices，只带 usage
+                    if getattr(chunk, 'usage', None):
+                        usage = chunk.usage
+                if visible is not None:
+                    tail = visible.flush()
+                    if tail:
+                        on_delta(tail)
+            finally:
+                stream.close()
+        except TranslationError:
+            raise
+        except openai.APITimeoutError as e:
+            raise self._timeout(profile, deadline, e.__cause__) from e
+        except openai.APIConnectionError as e:
+            raise ConnectionFailed(f"连接失败: {e}") from e
+        except openai.RateLimitError as e:
+            retry_after = parse_retry_after(e.response.headers)
+            raise RateLimited("请求过于频繁", retry_after) from e
+        except openai.AuthenticationError as e:
+            raise AuthenticationFailed("API Key 无效") from e
+        except openai.APIStatusError as e:
+            raise ProviderError(f"服务错误 {e.status_code}: {e.message}", e.status_code) from e
+        # 以下几类发生在读取流的过程中，SDK 不做包装：首字 / 数据块间隔超时、中途断线、SSE 中的错误事件
+        except httpx.TimeoutException as e:
+            raise self._timeout(profile, deadline, e) from e
+        except httpx.TransportError as e:
+            raise ConnectionFailed(f"连接中断: {e}") from e
+        except openai.APIError as e:
+            raise ProviderError(f"服务错误: {e.message}") from e
+
+        return "".join(parts), usage
+
+    @staticmethod
+    def _timeout(profile: ProfileClient, deadline: float, cause) -> TranslationTimeout:
+        """按超时发生的阶段生成 TranslationTimeout"""
+        if isinstance(cause, httpx.ConnectTimeout):
+            return TranslationTimeout("connect", profile.connect_timeout)
+        if time.monotonic() >= deadline:
+            return TranslationTimeout("total", profile.total_timeout)
+        return TranslationTimeout("first_token", profile.first_token_timeout)
 
 
 if __name__ == "__main__":
     # 测试翻译功能
     translator = Translator()
     test_text = "你好，世界！今天天气真不错。"
-    result = translator.translate(test_text)
+    try:
+        result = translator.translate(test_text)
+    except TranslationError as e:
+        result = f"[{e.kind}] {e}"
     print(f"原文: {test_text}")
     print(f"译文: {result}")
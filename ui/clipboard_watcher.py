@@ -0,0 +1,89 @@
+"""
+Clipboard Watcher
+剪贴板预翻译 - 复制了以中文为主的文本时，在后台以最低优先级提前翻译写入缓存，
+之后「粘贴翻译」直接从缓存取结果
+
+限制：
+- 长度在 min_chars ~ max_chars 之间，中文占比不低于 min_chinese_ratio
+- 每分钟最多 max_per_minute 次预翻译
+- 从 excluded_apps 中的程序（密码管理器等）复制的内容不处理
+"""
+
+import time
+from collections import deque
+
+from PyQt5.QtCore import QObject
+from PyQt5.QtWidgets import QApplication
+
+import diagnostics
+from model_router import extract_features
+from platform_backend import get_backend
+
+
+DEFAULT_EXCLUDED_APPS = ("KeePass.exe", "KeePassXC.exe", "1Password.exe", "Bitwarden.exe")
+
+
+class ClipboardWatcher(QObject):
+    """监听 QClipboard.dataChanged 并提交预翻译"""
+
+    def __init__(self, service, config: dict = None, parent=None):
+        """初始化
+
+        Args:
+            service: TranslationService
+            config: speculative 配置段
+        """
+        super().__init__(parent)
+        config = config or {}
+        self.service = service
+        self.min_chars = int(config.get('min_chars', 2))
+        self.max_chars = int(config.get('max_chars', 2000))
+        self.min_chinese_ratio = float(config.get('min_chinese_ratio', 0.6))
+        self.max_per_minute = int(config.get('max_per_minute', 6))
+        self.excluded_apps = {
+            name.lower() for name in config.get('excluded_apps', DEFAULT_EXCLUDED_APPS)
+        }
+
+        self._recent = deque()  # 最近一分钟内的提交时间
+        self._last_text = ""
+        self.counters = {"变化": 0, "提交": 0, "长度不符": 0, "非中文": 0, "限流": 0, "排除程序": 0}
+
+        self.clipboard = QApplication.clipboard()
+        self.clipboard.dataChanged.connect(self._on_changed)
+        diagnostics.register("剪贴板预翻译", self.stats)
+
+    def _skip(self, reason: str):
+        self.counters[reason] += 1
+
+    def _on_changed(self):
+        self.counters["变化"] += 1
+        # 先看来源程序，被排除的程序复制的内容不读取
+        app = get_backend().foreground_process().lower()
+        if app and app in self.excluded_apps:
+            return self._skip("排除程序")
+
+        text = self.clipboard.text().strip()
+        if not text or text == self._last_text:
+            return
+        self._last_text = text
+        if not self.min_chars <= len(text) <= self.max_chars:
+            return self._skip("长度不符")
+        if extract_features(text).cjk_ratio < self.min_chinese_ratio:
+            return self._skip("非中文")
+
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 60:
+            self._recent.popleft()
+        if len(self._recent) >= self.max_per_minute:
+            return self._skip("限流")
+
+        if self.service.pretranslate(text) is not None:
+            self._recent.append(now)
+            self.counters["提交"] += 1
+
+    def stop(self):
+        self.clipboard.dataChanged.disconnect(self._on_changed)
+        diagnostics.unregister("剪贴板预翻译")
+
+    def stats(self) -> dict:
+        return dict(self.counters)
@@ -10,19 +10,71 @@ Translation Input Helper - Floating Input Window
 """
 
 import sys
-import ctypes
 import threading
 import time
 from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QLineEdit, QTextEdit, QPushButton, QApplication,
-    QGraphicsDropShadowEffect, QShortcut
+    QShortcut
 )
-from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QPoint
+from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QPoint, QEvent
 from PyQt5.QtGui import QFont, QColor, QKeySequence
 
-# Windows API
-user32 = ctypes.windll.user32
+from ui.render_mode import render_manager, apply_shadow, rounded_mask
+from session_trace import tracer
+from platform_backend import get_backend
+
+# 结果标签状态
+STATE_IDLE = "idle"
+STATE_TRANSLATING = "translating"
+STATE_RESULT = "result"
+STATE_ERROR = "error"
+
+WINDOW_STYLE = """
+    #container {
+        background-color: #1e1e2e;
+        border-radius: 12px;
+        border: 1px solid #45475a;
+    }
+    QLabel#titleLabel {
+        font-size: 14px;
+        font-weight: bold;
+        color: #89b4fa;
+        font-family: "Microsoft YaHei", "Segoe UI";
+    }
+    QLabel#hintLabel {
+        font-size: 11px;
+        color: #6c7086;
+        font-family: "Microsoft YaHei", "Segoe UI";
+    }
+    QLineEdit {
+        background-color: #313244;
+        border: 2px solid #45475a;
+        border-radius: 8px;
+        padding: 12px 16px;
+        font-size: 16px;
+        color: #f5e0dc;
+        font-family: "Microsoft YaHei", "Segoe UI";
+    }
+    QLineEdit:focus {
+        border: 2px solid #89b4fa;
+    }
+    QLabel#resultLabel {
+        background-color: #313244;
+        border-radius: 8px;
+        padding: 12px 16px;
+        font-size: 14px;
+        color: #94e2d5;
+        font-family: "Microsoft YaHei", "Segoe UI";
+        min-height: 40px;
+    }
+    QLabel#resultLabel[state="translating"] {
+        color: #6c7086;
+    }
+    QLabel#resultLabel[state="error"] {
+        color: #f38ba8;
+    }
+"""
 
 
 class FloatingInputWindow(QWidget):
@@ -38,6 +90,7 @@ class FloatingInputWindow(QWidget):
         self._target_hwnd = None  # 记录目标窗口
         self._current_translation = ""
         self._translating = False
+        self._trace_request_id = 0
         self._init_ui()
         self._setup_shortcuts()
         
@@ -49,30 +102,29 @@ class FloatingInputWindow(QWidget):
             Qt.WindowStaysOnTopHint |
             Qt.Tool
         )
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        # 性能模式下不使用透明背景，改用圆角遮罩
+        self._translucent = not render_manager().performance
+        if self._translucent:
+            self.setAttribute(Qt.WA_TranslucentBackground)
         self.setFixedWidth(500)
         
+        # 全部样式集中在一份样式表中，构造时解析一次；
+        # 结果标签的状态通过动态属性 state 切换，不再重复 setStyleSheet
+        self.setStyleSheet(WINDOW_STYLE)
+        
         # 主容器
         container = QWidget(self)
         container.setObjectName("container")
-        container.setStyleSheet("""
-            #container {
-                background-color: #1e1e2e;
-                border-radius: 12px;
-                border: 1px solid #45475a;
-            }
-        """)
+        self._container = container
         
-        # 阴影效果
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(0, 0, 0, 100))
-        shadow.setOffset(0, 5)
-        container.setGraphicsEffect(shadow)
+        # 阴影效果（性能模式下不加）
+        self._apply_render_mode()
+        render_manager().mode_changed.connect(self._apply_render_mode)
         
         # 布局
         main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(10, 10, 10, 10)
+        margin = 10 if self._translucent else 0
+        main_layout.setContentsMargins(margin, margin, margin, margin)
         main_layout.addWidget(container)
         
         layout = QVBoxLayout(container)
@@ -83,20 +135,11 @@ class FloatingInputWindow(QWidget):
         title_layout = QHBoxLayout()
         
         title = QLabel("⌨️ 翻译输入助手")
-        title.setStyleSheet("""
-            font-size: 14px;
-            font-weight: bold;
-            color: #89b4fa;
-            font-family: "Microsoft YaHei", "Segoe UI";
-        """)
+        title.setObjectName("titleLabel")
         title_layout.addWidget(title)
         
         hint = QLabel("Enter=粘贴 | Esc=取消")
-        hint.setStyleSheet("""
-            font-size: 11px;
-            color: #6c7086;
-            font-family: "Microsoft YaHei", "Segoe UI";
-        """)
+        hint.setObjectName("hintLabel")
         title_layout.addWidget(hint, 0, Qt.AlignRight)
         
         layout.addLayout(title_layout)
@@ -104,47 +147,22 @@ class FloatingInputWindow(QWidget):
         # 输入框
         self.input_edit = QLineEdit()
         self.input_edit.setPlaceholderText("输入中文...")
-        self.input_edit.setStyleSheet("""
-            QLineEdit {
-                background-color: #313244;
-                border: 2px solid #45475a;
-                border-radius: 8px;
-                padding: 12px 16px;
-                font-size: 16px;
-                color: #f5e0dc;
-                font-family: "Microsoft YaHei", "Segoe UI";
-            }
-            QLineEdit:focus {
-                border: 2px solid #89b4fa;
-            }
-        """)
         self.input_edit.textChanged.connect(self._on_text_changed)
         self.input_edit.returnPressed.connect(self._on_enter_pressed)
+        self.input_edit.installEventFilter(self)
         layout.addWidget(self.input_edit)
         
         # 翻译结果
         self.result_label = QLabel("翻译结果将显示在这里...")
+        self.result_label.setObjectName("resultLabel")
         self.result_label.setWordWrap(True)
-        self.result_label.setStyleSheet("""
-            QLabel {
-                background-color: #313244;
-                border-radius: 8px;
-                padding: 12px 16px;
-                font-size: 14px;
-                color: #94e2d5;
-                font-family: "Microsoft YaHei", "Segoe UI";
-                min-height: 40px;
-            }
-        """)
+        self._result_state = None
+        self._set_result_state(STATE_IDLE)
         layout.addWidget(self.result_label)
         
         # 状态栏
         self.status_label = QLabel("💡 按 Ctrl+Space 随时唤起")
-        self.status_label.setStyleSheet("""
-            font-size: 11px;
-            color: #6c7086;
-            font-family: "Microsoft YaHei", "Segoe UI";
-        """)
+        self.status_label.setObjectName("hintLabel")
         self.status_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.status_label)
         
@@ -153,75 +171,80 @@ class FloatingInputWindow(QWidget):
         self._translate_timer.setSingleShot(True)
         self._translate_timer.timeout.connect(self._do_translate)
         
+    def _apply_render_mode(self, mode=None):
+        """按当前渲染模式设置阴影"""
+        apply_shadow(self._container, 20, QColor(0, 0, 0, 100), 5)
+        
+    def resizeEvent(self, event):
+        """不透明窗口用圆角遮罩裁掉四角"""
+        if not self._translucent:
+            self.setMask(rounded_mask(self.rect(), 12))
+        super().resizeEvent(event)
+        
     def _setup_shortcuts(self):
         """设置快捷键"""
         # Esc 关闭
         esc = QShortcut(QKeySequence(Qt.Key_Escape), self)
         esc.activated.connect(self._on_escape)
         
+    def _set_result_state(self, state: str):
+        """切换结果标签状态，只有状态真正变化时才重新 polish"""
+        if state == self._result_state:
+            return
+        self._result_state = state
+        self.result_label.setProperty("state", state)
+        style = self.result_label.style()
+        style.unpolish(self.result_label)
+        style.polish(self.result_label)
+        
+    def eventFilter(self, obj, event):
+        """记录按键时间（轨迹记录）"""
+        if obj is self.input_edit and event.type() == QEvent.KeyPress:
+            tracer().record("key")
+        return super().eventFilter(obj, event)
+        
     def _on_text_changed(self, text):
         """文本变化 - 延迟翻译"""
+        tracer().record("text", text=text)
         self._translate_timer.stop()
         if text.strip():
-            self.result_label.setText("⏳ 翻译中...")
-            self.result_label.setStyleSheet("""
-                QLabel {
-                    background-color: #313244;
-                    border-radius: 8px;
-                    padding: 12px 16px;
-                    font-size: 14px;
-                    color: #6c7086;
-                    font-family: "Microsoft YaHei", "Segoe UI";
-                    min-height: 40px;
-                }
-            """)
+            if self._result_state != STATE_TRANSLATING:
+                self.result_label.setText("⏳ 翻译中...")
+                self._set_result_state(STATE_TRANSLATING)
             # 延迟 500ms 翻译（避免频繁请求）
             self._translate_timer.start(500)
         else:
             self.result_label.setText("翻译结果将显示在这里...")
+            self._set_result_state(STATE_IDLE)
             self._current_translation = ""
             
     def _do_translate(self):
         """执行翻译"""
         text = self.input_edit.text().strip()
         if text:
+            trace = tracer()
+            self._trace_request_id = trace.next_id()
+            trace.record("request", id=self._trace_request_id, text=text)
             self.translate_requested.emit(text)
             
     def show_translation(self, translation: str):
         """显示翻译结果"""
+        tracer().record("response", id=self._trace_request_id, ok=True, text=translation)
         self._current_translation = translation
         self.result_label.setText(translation)
-        self.result_label.setStyleSheet("""
-            QLabel {
-                background-color: #313244;
-                border-radius: 8px;
-                padding: 12px 16px;
-                font-size: 14px;
-                color: #94e2d5;
-                font-family: "Microsoft YaHei", "Segoe UI";
-                min-height: 40px;
-            }
-        """)
+        self._set_result_state(STATE_RESULT)
         self.status_label.setText("✅ 按 Enter 粘贴到目标窗口")
         
     def show_error(self, error: str):
         """显示错误"""
+        tracer().record("response", id=self._trace_request_id, ok=False, error=error)
         self.result_label.setText(f"❌ {error}")
-        self.result_label.setStyleSheet("""
-            QLabel {
-                background-color: #313244;
-                border-radius: 8px;
-                padding: 12px 16px;
-                font-size: 14px;
-                color: #f38ba8;
-                font-family: "Microsoft YaHei", "Segoe UI";
-                min-height: 40px;
-            }
-        """)
+        self._set_result_state(STATE_ERROR)
         
     def _on_enter_pressed(self):
         """按下 Enter - 粘贴结果"""
         if self._current_translation:
+            tracer().record("paste")
             self.paste_requested.emit(self._current_translation)
             self._close_and_paste()
             
@@ -237,12 +260,14 @@ class FloatingInputWindow(QWidget):
         
     def activate(self):
         """激活窗口"""
+        tracer().record("hotkey")
         # 记录当前前台窗口
-        self._target_hwnd = user32.GetForegroundWindow()
+        self._target_hwnd = get_backend().foreground_window()
         
         # 清空并显示
         self.input_edit.clear()
         self.result_label.setText("翻译结果将显示在这里...")
+        self._set_result_state(STATE_IDLE)
         self._current_translation = ""
         self.status_label.setText("💡 输入中文后自动翻译")
         
@@ -0,0 +1,159 @@
+"""
+History Window Module
+翻译历史搜索窗口
+
+搜索在工作线程执行（冷块需要解压，大量历史时可达数十毫秒），结果经信号回到 GUI 线程；
+每次搜索递增序号，新的查询开始后旧查询在下一个候选块前停止，过期结果直接丢弃。
+"""
+
+import time
+import threading
+from PyQt5.QtWidgets import (
+    QWidget, QVBoxLayout, QLabel, QLineEdit, QListWidget, QListWidgetItem,
+    QApplication
+)
+from PyQt5.QtCore import Qt, QTimer, pyqtSignal
+
+# 输入停顿多久后再搜索（毫秒），连续打字时只搜最后一次
+SEARCH_DEBOUNCE_MS = 100
+
+
+class HistoryWindow(QWidget):
+    """翻译历史搜索窗口"""
+
+    results_ready = pyqtSignal(int, object, float)  # (搜索序号, 结果列表, 耗时 ms) 从工作线程发出
+
+    def __init__(self, store, limit: int = 100):
+        """初始化
+
+        Args:
+            store: HistoryStore 实例
+            limit: 每次最多显示条数
+        """
+        super().__init__()
+        self.store = store
+        self.limit = limit
+        self._generation = 0
+        self.results_ready.connect(self._show_results)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._run_search)
+        self._init_ui()
+
+    def _init_ui(self):
+        """初始化UI"""
+        self.setWindowTitle("翻译历史")
+        self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.Tool)
+        self.resize(520, 480)
+
+        self.setStyleSheet("""
+            QWidget {
+                background-color: #1e1e2e;
+                color: #cdd6f4;
+                font-family: "Microsoft YaHei", "Segoe UI";
+            }
+            QLineEdit {
+                background-color: #313244;
+                border: 2px solid #45475a;
+                border-radius: 8px;
+                padding: 8px 12px;
+                font-size: 14px;
+                color: #f5e0dc;
+            }
+            QLineEdit:focus {
+                border: 2px solid #89b4fa;
+            }
+            QListWidget {
+                background-color: #313244;
+                border: 1px solid #45475a;
+                border-radius: 8px;
+                font-size: 13px;
+            }
+            QListWidget::item {
+                padding: 6px;
+                border-bottom: 1px solid #45475a;
+            }
+            QListWidget::item:selected {
+                background-color: #45475a;
+            }
+            QLabel#hint {
+                font-size: 11px;
+                color: #6c7086;
+            }
+        """)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(16, 16, 16, 16)
+        layout.setSpacing(10)
+
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText("🔍 搜索原文或译文...")
+        self.search_box.textChanged.connect(lambda text: self._search_timer.start())
+        layout.addWidget(self.search_box)
+
+        self.result_list = QListWidget()
+        self.result_list.setWordWrap(True)
+        self.result_list.itemDoubleClicked.connect(self._on_item_double_clicked)
+        layout.addWidget(self.result_list, 1)
+
+        self.hint_label = QLabel("双击复制译文")
+        self.hint_label.setObjectName("hint")
+        layout.addWidget(self.hint_label)
+
+    def _run_search(self):
+        self._on_search(self.search_box.text())
+
+    def _on_search(self, text: str):
+        """在工作线程中查询（输入变化经 SEARCH_DEBOUNCE_MS 防抖后调用），之前未完成的查询作废"""
+        self._generation += 1
+        threading.Thread(target=self._search_worker, args=(self._generation, text), daemon=True).start()
+
+    def _search_worker(self, generation: int, text: str):
+        """工作线程：查询历史，序号过期时提前停止"""
+        start = time.perf_counter()
+        entries = self.store.search(text, self.limit, cancelled=lambda: generation != self._generation)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if generation != self._generation:
+            return
+        try:
+            self.results_ready.emit(generation, entries, elapsed_ms)
+        except RuntimeError:
+            # 窗口在查询期间被空闲回收（deleteLater）
+            pass
+
+    def _show_results(self, generation: int, entries: list, elapsed_ms: float):
+        """刷新列表（GUI 线程），只接受最新一次查询的结果"""
+        if generation != self._generation:
+            return
+
+        self.result_list.setUpdatesEnabled(False)
+        self.result_list.clear()
+        for entry in entries:
+            stamp = time.strftime('%m-%d %H:%M', time.localtime(entry.timestamp))
+            item = QListWidgetItem(f"{stamp}  {entry.original}\n→ {entry.translated}")
+            item.setData(Qt.UserRole, entry.translated)
+            self.result_list.addItem(item)
+        self.result_list.setUpdatesEnabled(True)
+
+        self.hint_label.setText(f"{len(entries)} 条结果 ({elapsed_ms:.1f} ms) | 双击复制译文")
+
+    def _on_item_double_clicked(self, item):
+        """双击复制译文"""
+        QApplication.clipboard().setText(item.data(Qt.UserRole))
+        self.hint_label.setText("✅ 已复制译文")
+
+    def open(self):
+        """显示窗口并刷新最近记录"""
+        self._search_timer.stop()
+        self._on_search(self.search_box.text())
+        self.show()
+        self.raise_()
+        self.activateWindow()
+        self.search_box.setFocus()
+
+    def keyPressEvent(self, event):
+        """Esc 关闭"""
+        if event.key() == Qt.Key_Escape:
+            self.hide()
+        super().keyPressEvent(event)
@@ -7,8 +7,16 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
     QPushButton, QTextEdit, QFrame, QApplication
 )
+import threading
+
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
-from PyQt5.QtGui import QFont, QColor, QIcon, QPixmap, QPainter
+from PyQt5.QtGui import QFont, QColor, QIcon, QPixmap, QPainter, QTextCursor
+
+from document_mode import DocumentJob, is_document, WAITING, RUNNING, DONE, FAILED
+from ui.stream_renderer import stream_renderer
+
+# 文档模式进度中每段的标记
+STATE_MARKS = {WAITING: "·", RUNNING: "◐", DONE: "●", FAILED: "✖"}
 
 
 class MainWindow(QWidget):
@@ -17,12 +25,32 @@ class MainWindow(QWidget):
     # 信号
     translate_clicked = pyqtSignal(str)  # 传递要翻译的文本
     clear_clicked = pyqtSignal()
+    translation_ready = pyqtSignal(str, str)  # (original, translated) 由 service 完成的翻译
+    # 文档模式（从工作线程发出，信号带上任务对象以忽略已取消任务的残留结果）
+    document_chunk_ready = pyqtSignal(object, int, str, str)  # (job, 序号, 译文, 分隔符)
+    document_chunk_state = pyqtSignal(object, int, str)  # (job, 序号, 状态)
+    document_finished = pyqtSignal(object)
     
-    def __init__(self):
+    def __init__(self, service=None, document=None):
+        """初始化
+        
+        Args:
+            service: TranslationService；传入时窗口自行翻译（先查缓存，剪贴板预翻译的结果由 main 写入），
+                     否则只发出 translate_clicked
+            document: 长文档模式配置 min_chars / chunk_chars / workers（需要 service）
+        """
         super().__init__()
         self._last_clipboard = ""
+        self.service = service
+        self.document_config = document or {}
+        self._document_job = None
+        self._document_cursor = None
         self._init_ui()
         self._init_clipboard_monitor()
+        self.translation_ready.connect(self._on_translation_ready)
+        self.document_chunk_ready.connect(self._on_document_chunk)
+        self.document_chunk_state.connect(self._on_document_state)
+        self.document_finished.connect(self._on_document_finished)
         
     def _init_ui(self):
         """初始化UI"""
@@ -165,6 +193,13 @@ class MainWindow(QWidget):
         self.result_box.setPlaceholderText("翻译结果将显示在这里...")
         result_layout.addWidget(self.result_box)
         
+        # 文档模式进度：每段一个标记（· 等待 ◐ 翻译中 ● 完成 ✖ 失败）
+        self.document_progress = QLabel()
+        self.document_progress.setObjectName("hint")
+        self.document_progress.setWordWrap(True)
+        self.document_progress.hide()
+        result_layout.addWidget(self.document_progress)
+        
         layout.addWidget(result_frame, 1)
         
         # 按钮区域2
@@ -220,17 +255,110 @@ class MainWindow(QWidget):
         """翻译按钮点击"""
         text = self.input_box.toPlainText().strip()
         if text:
-            self.translate_clicked.emit(text)
+            self._request_translation(text)
         
     def _on_paste_translate(self):
         """粘贴并翻译"""
         clipboard_text = self.clipboard.text().strip()
         if clipboard_text:
             self.input_box.setPlainText(clipboard_text)
-            self.translate_clicked.emit(clipboard_text)
+            self._request_translation(clipboard_text)
+            
+    def _request_translation(self, text: str):
+        """有 service 时先查缓存（预翻译命中则立即显示），否则交给外部处理"""
+        if self.service is None:
+            self.translate_clicked.emit(text)
+            return
+        
+        self.cancel_document()
+        if is_document(text, int(self.document_config.get('min_chars', 300))):
+            self._start_document(text)
+            return
+        
+        cached = self.service.cached(text)
+        if cached is not None:
+            self.show_translation(text, cached)
+            return
+        
+        self.set_translating(True)
+        self.input_box.setPlainText(text)
+        # 译文边生成边显示（按帧率合并后在结果框末尾追加）
+        renderer = stream_renderer()
+        renderer.begin(self.result_box)
+        
+        def run():
+            try:
+                result = self.service.translate(text, on_delta=lambda delta: renderer.feed(self.result_box, delta))
+            except Exception as e:
+                result = f"❌ {e}"
+            self.translation_ready.emit(text, result)
+            
+        threading.Thread(target=run, daemon=True).start()
+        
+    def _on_translation_ready(self, original: str, translation: str):
+        stream_renderer().finish(self.result_box)
+        self.set_translating(False)
+        self.show_translation(original, translation)
+        
+    # ---- 文档模式 ----
+    
+    def _start_document(self, text: str):
+        """按段落并行翻译，结果按顺序追加到结果框"""
+        job = DocumentJob(
+            self.service, text,
+            chunk_chars=int(self.document_config.get('chunk_chars', 800)),
+            workers=int(self.document_config.get('workers', 4)),
+        )
+        job.on_ready = lambda i, result, sep: self.document_chunk_ready.emit(job, i, result, sep)
+        job.on_state = lambda i, state: self.document_chunk_state.emit(job, i, state)
+        job.on_finished = lambda: self.document_finished.emit(job)
+        self._document_job = job
+        
+        self.result_box.clear()
+        self._document_cursor = QTextCursor(self.result_box.document())
+        self.set_translating(True)
+        self._update_document_progress()
+        self.document_progress.show()
+        job.start()
+        
+    def cancel_document(self):
+        """取消进行中的长文档翻译"""
+        if self._document_job is not None:
+            self._document_job.cancel()
+            self._document_job = None
+            self.document_progress.hide()
+            self.set_translating(False)
+            
+    def _on_document_chunk(self, job, index: int, result: str, separator: str):
+        """段落按顺序到达：在文档末尾追加，不重排已有内容"""
+        if job is not self._document_job:
+            return
+        self._document_cursor.movePosition(QTextCursor.End)
+        self._document_cursor.insertText(result + separator)
+        
+    def _on_document_state(self, job, index: int, state: str):
+        if job is self._document_job:
+            self._update_document_progress()
+            
+    def _on_document_finished(self, job):
+        if job is not self._document_job:
+            return
+        self.set_translating(False)
+        self._update_document_progress()
+        self._document_job = None
+        
+    def _update_document_progress(self):
+        job = self._document_job
+        done, total = job.progress()
+        marks = "".join(STATE_MARKS[state] for state in job.states)
+        summary = f"📄 文档模式 {done}/{total} 段"
+        if done == total and job.elapsed:
+            summary += f"，用时 {job.elapsed:.1f}s（逐段串行约 {sum(job.durations):.1f}s）"
+        self.document_progress.setText(f"{summary}\n{marks}")
         
     def _on_clear_clicked(self):
         """清空按钮点击"""
+        self.cancel_document()
         self.input_box.clear()
         self.result_box.clear()
         self.clear_clicked.emit()
@@ -279,8 +407,11 @@ class MainWindow(QWidget):
 if __name__ == "__main__":
     import sys
     
+    from translation_service import get_service
+
     app = QApplication(sys.argv)
-    window = MainWindow()
+    service = get_service()
+    window = MainWindow(service, document=service.translator.config_manager.get('document'))
     window.translate_clicked.connect(lambda t: print(f"Translate: {t}"))
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,136 @@
+"""
+Render Mode Module
+渲染模式 - 画质模式 / 性能模式
+
+画质模式：透明背景、阴影、渐变、淡入淡出动画
+性能模式：不透明背景 + 圆角遮罩、无阴影、纯色背景、无动画
+
+auto 模式下从画质模式开始，监测动画帧间隔，
+连续若干帧超出预算后自动切换到性能模式。
+注：透明背景只在窗口构造时决定，运行中切换只影响阴影、渐变和动画。
+"""
+
+import time
+from collections import deque
+from typing import Optional
+
+from PyQt5.QtCore import QObject, pyqtSignal, QRectF
+from PyQt5.QtGui import QColor, QPainterPath, QRegion
+from PyQt5.QtWidgets import QGraphicsDropShadowEffect
+
+
+QUALITY = "quality"
+PERFORMANCE = "performance"
+AUTO = "auto"
+
+
+class RenderModeManager(QObject):
+    """渲染模式管理器（进程内共享）"""
+
+    mode_changed = pyqtSignal(str)  # 生效的模式 quality / performance
+
+    def __init__(self, mode: str = AUTO, frame_budget_ms: float = 33.0, slow_frames: int = 6):
+        """初始化
+
+        Args:
+            mode: quality / performance / auto
+            frame_budget_ms: 动画帧间隔预算（毫秒）
+            slow_frames: auto 模式下超出预算多少帧后切换
+        """
+        super().__init__()
+        self.requested_mode = mode
+        self.frame_budget_ms = frame_budget_ms
+        self.slow_frames = slow_frames
+        self._mode = PERFORMANCE if mode == PERFORMANCE else QUALITY
+        self._last_frame = None
+        self._slow_count = 0
+        self.frame_times = deque(maxlen=240)
+
+    @property
+    def mode(self) -> str:
+        return self._mode
+
+    @property
+    def performance(self) -> bool:
+        return self._mode == PERFORMANCE
+
+    def set_mode(self, mode: str):
+        """手动设置模式 (quality / performance / auto)"""
+        self.requested_mode = mode
+        self._slow_count = 0
+        self._switch(PERFORMANCE if mode == PERFORMANCE else QUALITY)
+
+    def _switch(self, mode: str):
+        if mode == self._mode:
+            return
+        self._mode = mode
+        print(f"[渲染] 切换到{'性能' if mode == PERFORMANCE else '画质'}模式")
+        self.mode_changed.emit(mode)
+
+    def watch_animation(self, animation):
+        """监测动画的帧间隔"""
+        self._last_frame = None
+        animation.valueChanged.connect(self._on_frame)
+
+    def _on_frame(self, _value=None):
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            interval_ms = (now - self._last_frame) * 1000
+            self.frame_times.append(interval_ms)
+            if interval_ms > self.frame_budget_ms:
+                self._slow_count += 1
+            else:
+                self._slow_count = max(0, self._slow_count - 1)
+            if self.requested_mode == AUTO and self._slow_count >= self.slow_frames:
+                self._switch(PERFORMANCE)
+        self._last_frame = now
+
+    def frame_stats(self) -> dict:
+        """最近动画帧间隔统计"""
+        frames = sorted(self.frame_times)
+        if not frames:
+            return {"frames": 0}
+        return {
+            "frames": len(frames),
+            "avg_ms": sum(frames) / len(frames),
+            "p95_ms": frames[min(len(frames) - 1, int(len(frames) * 0.95))],
+            "max_ms": frames[-1],
+        }
+
+
+_manager: Optional[RenderModeManager] = None
+
+
+def render_manager() -> RenderModeManager:
+    """获取共享的渲染模式管理器"""
+    global _manager
+    if _manager is None:
+        _manager = RenderModeManager()
+    return _manager
+
+
+def configure(mode: str = AUTO, frame_budget_ms: float = 33.0) -> RenderModeManager:
+    """根据配置初始化渲染模式（应在创建窗口之前调用）"""
+    manager = render_manager()
+    manager.frame_budget_ms = frame_budget_ms
+    manager.set_mode(mode)
+    return manager
+
+
+def apply_shadow(widget, blur: int, color: QColor, offset_y: int):
+    """画质模式加阴影，性能模式移除阴影"""
+    if render_manager().performance:
+        widget.setGraphicsEffect(None)
+        return
+    shadow = QGraphicsDropShadowEffect()
+    shadow.setBlurRadius(blur)
+    shadow.setColor(color)
+    shadow.setOffset(0, offset_y)
+    widget.setGraphicsEffect(shadow)
+
+
+def rounded_mask(rect, radius: float) -> QRegion:
+    """圆角遮罩，代替透明背景裁掉窗口四角"""
+    path = QPainterPath()
+    path.addRoundedRect(QRectF(rect), radius, radius)
+    return QRegion(path.toFillPolygon().toPolygon())
@@ -4,11 +4,13 @@ Result Window Module
 """
 
 from PyQt5.QtWidgets import (
-    QWidget, QLabel, QVBoxLayout, QGraphicsDropShadowEffect
+    QWidget, QLabel, QVBoxLayout
 )
 from PyQt5.QtCore import Qt, QTimer, QPropertyAnimation, QPoint
 from PyQt5.QtGui import QFont, QColor
 
+from ui.render_mode import render_manager, apply_shadow, rounded_mask
+
 
 class ResultWindow(QWidget):
     """翻译结果悬浮窗口"""
@@ -28,7 +30,10 @@ class ResultWindow(QWidget):
             Qt.WindowStaysOnTopHint | 
             Qt.Tool
         )
-        self.setAttribute(Qt.WA_TranslucentBackground)
+        # 性能模式下不使用透明背景，改用圆角遮罩
+        self._translucent = not render_manager().performance
+        if self._translucent:
+            self.setAttribute(Qt.WA_TranslucentBackground)
         
         # 主容器
         self.container = QWidget(self)
@@ -41,12 +46,9 @@ class ResultWindow(QWidget):
             }
         """)
         
-        # 添加阴影效果
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(20)
-        shadow.setColor(QColor(0, 0, 0, 80))
-        shadow.setOffset(0, 4)
-        self.container.setGraphicsEffect(shadow)
+        # 添加阴影效果（性能模式下不加）
+        self._apply_render_mode()
+        render_manager().mode_changed.connect(self._apply_render_mode)
         
         # 布局
         layout = QVBoxLayout(self.container)
@@ -88,17 +90,30 @@ class ResultWindow(QWidget):
         
         # 主布局
         main_layout = QVBoxLayout(self)
-        main_layout.setContentsMargins(10, 10, 10, 10)
+        margin = 10 if self._translucent else 0
+        main_layout.setContentsMargins(margin, margin, margin, margin)
         main_layout.addWidget(self.container)
         
         # 设置最小/最大尺寸
         self.setMinimumWidth(300)
         self.setMaximumWidth(500)
         
+    def _apply_render_mode(self, mode=None):
+        """按当前渲染模式设置阴影"""
+        apply_shadow(self.container, 20, QColor(0, 0, 0, 80), 4)
+        
+    def resizeEvent(self, event):
+        """不透明窗口用圆角遮罩裁掉四角"""
+        if not self._translucent:
+            self.setMask(rounded_mask(self.rect(), 12))
+        super().resizeEvent(event)
+        
     def _init_animation(self):
         """初始化动画"""
         self.fade_animation = QPropertyAnimation(self, b"windowOpacity")
         self.fade_animation.setDuration(300)
+        self.fade_animation.finished.connect(self._on_fade_finished)
+        render_manager().watch_animation(self.fade_animation)
         
         self.auto_hide_timer = QTimer()
         self.auto_hide_timer.timeout.connect(self._start_fade_out)
@@ -123,14 +138,19 @@ class ResultWindow(QWidget):
         y = screen.height() - self.height() - 80
         self.move(x, y)
         
-        # 显示窗口
-        self.setWindowOpacity(0)
-        self.show()
-        
-        # 淡入动画
-        self.fade_animation.setStartValue(0)
-        self.fade_animation.setEndValue(1)
-        self.fade_animation.start()
+        # 性能模式直接显示，不做淡入
+        if render_manager().performance:
+            self.fade_animation.stop()
+            self.setWindowOpacity(1)
+            self.show()
+        else:
+            self.setWindowOpacity(0)
+            self.show()
+            
+            # 淡入动画
+            self.fade_animation.setStartValue(0)
+            self.fade_animation.setEndValue(1)
+            self.fade_animation.start()
         
         # 启动自动隐藏计时器
         self.auto_hide_timer.start(self.auto_hide_seconds * 1000)
@@ -138,11 +158,18 @@ class ResultWindow(QWidget):
     def _start_fade_out(self):
         """开始淡出动画"""
         self.auto_hide_timer.stop()
+        if render_manager().performance:
+            self.hide()
+            return
         self.fade_animation.setStartValue(1)
         self.fade_animation.setEndValue(0)
-        self.fade_animation.finished.connect(self.hide)
         self.fade_animation.start()
         
+    def _on_fade_finished(self):
+        """淡出结束后隐藏"""
+        if self.fade_animation.endValue() == 0:
+            self.hide()
+        
     def keyPressEvent(self, event):
         """处理按键事件"""
         if event.key() == Qt.Key_Escape:
@@ -0,0 +1,146 @@
+"""
+Stream Renderer
+流式译文的限帧渲染 - 合并增量，按固定帧率刷新控件
+
+流式请求每秒可能回调上百次 delta，每次都 setText 会让自动换行的 QLabel 反复重新排版。
+这里工作线程只把 delta 追加到缓冲区，GUI 线程的定时器按 hz 把缓冲区一次性刷到控件上：
+- QTextEdit / QPlainTextEdit：在文档末尾用 QTextCursor 插入，只排版新增的部分
+- QLabel 等只有 setText 的控件：每帧最多 setText 一次
+
+统计每秒刷新帧数、合并的 delta 数和 GUI 线程耗时（诊断信息「流式渲染」）。
+"""
+
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QTextCursor
+
+import diagnostics
+
+
+class _Stream:
+    """一个控件上正在进行的流"""
+
+    __slots__ = ("widget", "text", "pending", "on_update", "append_only")
+
+    def __init__(self, widget, on_update):
+        self.widget = widget
+        self.text = ""
+        self.pending = []
+        self.on_update = on_update
+        # 文本框可以只插入新增部分，其余控件只能整体 setText
+        self.append_only = hasattr(widget, "document")
+
+
+class StreamRenderer(QObject):
+    """合并流式增量、按帧率刷新控件（feed 可在任意线程调用，其余方法在 GUI 线程调用）"""
+
+    def __init__(self, hz: float = 30.0, parent=None):
+        """初始化
+
+        Args:
+            hz: 每秒最多刷新几次（建议 30~60）
+        """
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._streams: Dict[int, _Stream] = {}
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._flush)
+        self.set_rate(hz)
+        # 最近的刷新记录 (时间, 耗时秒, 合并的 delta 数)
+        self._frames = deque(maxlen=1024)
+        self.deltas = 0
+        self.frames = 0
+        self.worst_ms = 0.0
+        diagnostics.register("流式渲染", self.stats)
+
+    def set_rate(self, hz: float):
+        self.hz = max(1.0, float(hz))
+        self._timer.setInterval(int(1000 / self.hz))
+
+    def begin(self, widget, on_update: Optional[Callable[[str], None]] = None):
+        """开始向 widget 流式输出（文本框立即清空，标签保留占位文本直到第一帧）
+
+        Args:
+            on_update: 每次刷新后调用 on_update(当前全文)，用于调整窗口大小等
+        """
+        if hasattr(widget, "document"):
+            widget.clear()
+        with self._lock:
+            self._streams[id(widget)] = _Stream(widget, on_update)
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def feed(self, widget, delta: str):
+        """追加增量（工作线程调用）；未 begin 或已 finish 的控件忽略"""
+        with self._lock:
+            stream = self._streams.get(id(widget))
+            if stream is not None:
+                stream.pending.append(delta)
+
+    def text(self, widget) -> str:
+        """已收到的全文（含尚未刷新的部分）"""
+        with self._lock:
+            stream = self._streams.get(id(widget))
+            return "" if stream is None else stream.text + "".join(stream.pending)
+
+    def finish(self, widget):
+        """结束流：丢弃尚未刷新的增量，由调用方设置最终文本"""
+        with self._lock:
+            self._streams.pop(id(widget), None)
+            if not self._streams:
+                self._timer.stop()
+
+    def _flush(self):
+        start = time.perf_counter()
+        with self._lock:
+            batch = [(s, "".join(s.pending), len(s.pending)) for s in self._streams.values() if s.pending]
+            for stream, _, _ in batch:
+                stream.pending.clear()
+        if not batch:
+            return
+        merged = 0
+        for stream, delta, count in batch:
+            merged += count
+            stream.text += delta
+            if stream.append_only:
+                cursor = QTextCursor(stream.widget.document())
+                cursor.movePosition(QTextCursor.End)
+                cursor.insertText(delta)
+            else:
+                stream.widget.setText(stream.text)
+            if stream.on_update:
+                stream.on_update(stream.text)
+        elapsed = time.perf_counter() - start
+        self.deltas += merged
+        self.frames += 1
+        self.worst_ms = max(self.worst_ms, elapsed * 1000)
+        self._frames.append((start, elapsed, merged))
+
+    def stats(self) -> dict:
+        """最近一秒的刷新情况（GUI 线程耗时 = 刷新函数本身 + 控件排版）"""
+        now = time.perf_counter()
+        recent = [f for f in list(self._frames) if now - f[0] <= 1.0]
+        return {
+            "帧率上限": f"{self.hz:.0f} Hz",
+            "最近一秒帧数": len(recent),
+            "最近一秒 GUI 耗时": f"{sum(f[1] for f in recent) * 1000:.1f} ms",
+            "累计帧数": self.frames,
+            "累计 delta": self.deltas,
+            "平均每帧合并": f"{self.deltas / self.frames:.1f}" if self.frames else "-",
+            "最坏一帧": f"{self.worst_ms:.1f} ms",
+        }
+
+
+_renderer: Optional[StreamRenderer] = None
+
+
+def stream_renderer() -> StreamRenderer:
+    """获取共享的流式渲染器（需在 QApplication 创建之后调用）"""
+    global _renderer
+    if _renderer is None:
+        _renderer = StreamRenderer()
+    return _renderer
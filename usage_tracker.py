@@ -0,0 +1,259 @@
+"""
+Usage Tracker
+Token 用量统计与预算
+
+- 每次请求记录 prompt / completion / reasoning / cached token（流式请求通过
+  stream_options.include_usage 在最后一个数据块拿到；服务端不返回时按字数估算）
+- 按小时滚动聚合，分模型、方案、功能（翻译、多目标、预翻译、后台刷新……）统计，
+  定期写入本地 JSON 文件
+- 预算接近上限时先暂停预翻译，再暂停后台请求，用户主动发起的翻译不受限制
+
+配置示例：
+"usage": {
+    "path": "logs/usage.json",
+    "stream_usage": true,
+    "budget": {"hourly_tokens": 200000, "daily_tokens": 2000000,
+               "speculative_at": 0.6, "background_at": 0.85},
+    "prices": {"MiniMax-M2.1": {"prompt": 2.1, "completion": 8.4}}
+}
+prices 为每百万 token 的价格，用于报告中的费用估算。
+
+运行方法：python usage_tracker.py [logs/usage.json] [--hours 24]
+"""
+
+import os
+import json
+import time
+import argparse
+import threading
+from typing import Dict, List, NamedTuple, Optional
+
+import diagnostics
+from model_router import CJK_PATTERN
+from translation_service import INTERACTIVE, SPECULATIVE
+
+
+# 保留多少小时的聚合数据
+KEEP_HOURS = 24 * 40
+# 写盘的最短间隔（秒）
+SAVE_INTERVAL = 30
+FIELDS = ("requests", "prompt", "completion", "reasoning", "cached", "estimated")
+
+
+class Usage(NamedTuple):
+    """一次请求的 token 用量"""
+    prompt: int
+    completion: int
+    reasoning: int = 0
+    cached: int = 0
+    estimated: bool = False
+
+    @property
+    def total(self) -> int:
+        return self.prompt + self.completion
+
+    @classmethod
+    def from_response(cls, usage) -> "Usage":
+        """从 OpenAI 的 usage 对象读取（各服务商的细分字段不一定都有）"""
+        completion_details = getattr(usage, 'completion_tokens_details', None)
+        prompt_details = getattr(usage, 'prompt_tokens_details', None)
+        return cls(
+            prompt=usage.prompt_tokens or 0,
+            completion=usage.completion_tokens or 0,
+            reasoning=getattr(completion_details, 'reasoning_tokens', 0) or 0,
+            cached=getattr(prompt_details, 'cached_tokens', 0) or 0,
+        )
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：每个汉字约 1 token，其余约 4 个字符 1 token"""
+    cjk = len(CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def estimate_usage(prompt: str, output: str, thinking: str = "") -> Usage:
+    """服务端没有返回 usage 时的估算值"""
+    reasoning = estimate_tokens(thinking)
+    return Usage(estimate_tokens(prompt), estimate_tokens(output) + reasoning, reasoning, 0, True)
+
+
+def _hour(timestamp: float) -> str:
+    return time.strftime('%Y-%m-%dT%H', time.localtime(timestamp))
+
+
+class UsageTracker:
+    """按小时滚动的用量聚合（线程安全）"""
+
+    def __init__(self, path: Optional[str] = "logs/usage.json"):
+        self._lock = threading.Lock()
+        # 小时 -> 维度键（total / model:x / profile:x / feature:x）-> 各字段计数
+        self._hours: Dict[str, Dict[str, List[int]]] = {}
+        self._dirty = False
+        self._last_save = 0.0
+        self.path = path
+        self.stream_usage = True
+        self.budget: dict = {}
+        self.prices: dict = {}
+        self._load()
+        diagnostics.register("Token 用量", self.stats)
+
+    def update_config(self, config: dict):
+        usage = config.get('usage') or {}
+        path = usage.get('path', 'logs/usage.json')
+        with self._lock:
+            self.stream_usage = bool(usage.get('stream_usage', True))
+            self.budget = usage.get('budget') or {}
+            self.prices = usage.get('prices') or {}
+            changed = path != self.path
+            self.path = path
+        if changed:
+            self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                hours = json.load(f).get('hours', {})
+        except (OSError, ValueError) as e:
+            print(f"[用量] 读取 {self.path} 失败: {e}")
+            return
+        with self._lock:
+            for hour, keys in hours.items():
+                bucket = self._hours.setdefault(hour, {})
+                for key, counts in keys.items():
+                    current = bucket.setdefault(key, [0] * len(FIELDS))
+                    for i, value in enumerate(counts[:len(FIELDS)]):
+                        current[i] += value
+
+    def record(self, usage: Usage, model: str, profile: str, feature: str):
+        """记录一次请求"""
+        counts = (1, usage.prompt, usage.completion, usage.reasoning, usage.cached, int(usage.estimated))
+        with self._lock:
+            bucket = self._hours.setdefault(_hour(time.time()), {})
+            for key in ("total", f"model:{model}", f"profile:{profile}", f"feature:{feature}"):
+                current = bucket.setdefault(key, [0] * len(FIELDS))
+                for i, value in enumerate(counts):
+                    current[i] += value
+            self._dirty = True
+        if time.monotonic() - self._last_save > SAVE_INTERVAL:
+            self.save()
+
+    def save(self):
+        """写入本地文件（丢弃超过保留期的小时）"""
+        with self._lock:
+            if not self._dirty or not self.path:
+                return
+            for hour in sorted(self._hours)[:-KEEP_HOURS]:
+                del self._hours[hour]
+            data = json.dumps({"hours": self._hours}, ensure_ascii=False)
+            self._dirty = False
+            self._last_save = time.monotonic()
+            path = self.path
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(path + '.tmp', path)
+        except OSError as e:
+            print(f"[用量] 写入失败: {e}")
+
+    def totals(self, hours: int = 24, prefix: str = "") -> Dict[str, List[int]]:
+        """最近若干小时按维度键汇总（prefix 过滤维度，如 "feature:"）"""
+        since = _hour(time.time() - (hours - 1) * 3600)
+        result: Dict[str, List[int]] = {}
+        with self._lock:
+            for hour, keys in self._hours.items():
+                if hour < since:
+                    continue
+                for key, counts in keys.items():
+                    if not key.startswith(prefix):
+                        continue
+                    current = result.setdefault(key[len(prefix):], [0] * len(FIELDS))
+                    for i, value in enumerate(counts):
+                        current[i] += value
+        return result
+
+    def _used(self, period_prefix: str) -> int:
+        with self._lock:
+            return sum(
+                keys["total"][1] + keys["total"][2]
+                for hour, keys in self._hours.items()
+                if hour.startswith(period_prefix) and "total" in keys
+            )
+
+    def budget_ratio(self) -> float:
+        """当前小时 / 当天预算中用得最多的比例，未配置预算时为 0"""
+        now = time.time()
+        ratios = [0.0]
+        hourly = self.budget.get('hourly_tokens')
+        if hourly:
+            ratios.append(self._used(_hour(now)) / hourly)
+        daily = self.budget.get('daily_tokens')
+        if daily:
+            ratios.append(self._used(_hour(now)[:10]) / daily)
+        return max(ratios)
+
+    def allow(self, priority: int) -> bool:
+        """该优先级的请求是否允许发出（交互请求始终允许）"""
+        if priority <= INTERACTIVE or not self.budget:
+            return True
+        ratio = self.budget_ratio()
+        if priority >= SPECULATIVE:
+            return ratio < float(self.budget.get('speculative_at', 0.6))
+        return ratio < float(self.budget.get('background_at', 0.85))
+
+    def cost(self, model: str, counts: List[int]) -> Optional[float]:
+        price = self.prices.get(model)
+        if not price:
+            return None
+        return (counts[1] * price.get('prompt', 0) + counts[2] * price.get('completion', 0)) / 1e6
+
+    def report(self, hours: int = 24) -> str:
+        """文本报告：按功能 / 模型 / 方案的 token 用量，从多到少"""
+        lines = [f"最近 {hours} 小时 Token 用量"]
+        for title, prefix in (("功能", "feature:"), ("模型", "model:"), ("方案", "profile:")):
+            totals = self.totals(hours, prefix)
+            if not totals:
+                continue
+            grand = sum(c[1] + c[2] for c in totals.values()) or 1
+            lines.append(f"[{title}]")
+            for name, c in sorted(totals.items(), key=lambda item: -(item[1][1] + item[1][2])):
+                line = (f"  {name:<16} {c[1] + c[2]:>10} ({(c[1] + c[2]) / grand:5.1%})  "
+                        f"请求 {c[0]:>5}  输入 {c[1]:>9}  输出 {c[2]:>9}  思考 {c[3]:>8}  缓存 {c[4]:>8}")
+                if c[5]:
+                    line += f"  估算 {c[5]} 次"
+                cost = self.cost(name, c) if prefix == "model:" else None
+                if cost is not None:
+                    line += f"  ≈ {cost:.4f}"
+                lines.append(line)
+        return "\n".join(lines)
+
+    def stats(self) -> dict:
+        today = self.totals(24).get("total", [0] * len(FIELDS))
+        stats = {
+            "24 小时请求": today[0],
+            "24 小时 token": today[1] + today[2],
+            "其中思考": today[3],
+        }
+        if self.budget:
+            stats["预算使用"] = f"{self.budget_ratio():.0%}"
+        features = self.totals(24, "feature:")
+        if features:
+            top = max(features.items(), key=lambda item: item[1][1] + item[1][2])
+            stats["用量最多的功能"] = top[0]
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Token 用量报告")
+    parser.add_argument("path", nargs="?", default="logs/usage.json")
+    parser.add_argument("--hours", type=int, default=24)
+    args = parser.parse_args()
+    print(UsageTracker(args.path).report(args.hours))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Warm Cache
+预热译文缓存 - 把事先知道的常用语（客服回复模板等）离线批量翻译，写成只读的紧凑文件
+
+文件布局（小端）：
+- 文件头   魔数 AQWC、版本、条目数、哈希表槽数、哈希表偏移
+- 记录区   每条：键长、译文长、模型名长、提示词版本(8 字节)、生成时间，随后是键、译文、模型名（UTF-8）
+           键为 "翻译目标\\0规范化原文"
+- 哈希表   2 的幂个槽，每槽 (64 位键哈希, 记录偏移)，偏移为 0 表示空槽，线性探测，装载率不超过 1/2
+
+启动时只 mmap 文件并读文件头（O(1)，不随条目数增长），查找时按需读入少量页面，
+几乎不增加常驻内存。TranslationService 先查这里，再查运行时的 LRU 缓存。
+
+构建是增量的：已有文件中模型和提示词版本都没变的条目直接沿用，只翻译新增或变化的短语。
+写入临时文件后原子替换；Windows 上文件被映射时无法替换，请在退出程序后构建。
+
+运行方法：
+    python warm_cache.py phrases.txt [-o cache/warm.bin] [--targets en,ja] [--workers 4] [--force]
+phrases.txt 每行一条短语，空行和 # 开头的行忽略。
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from translation_cache import CacheEntry, normalize_key
+
+
+MAGIC = b"AQWC"
+VERSION = 1
+# 文件头: 魔数, 版本, 条目数, 槽数, 哈希表偏移
+HEADER = struct.Struct('<4sIIIQ')
+# 记录头: 键字节数, 译文字节数, 模型名字节数, 提示词版本, 生成时间(秒)
+RECORD = struct.Struct('<HIB8sI')
+SLOT = struct.Struct('<QQ')
+
+
+def _key(text: str, target: str) -> bytes:
+    return f"{target}\0{normalize_key(text)}".encode('utf-8')
+
+
+def _hash(key: bytes) -> int:
+    # 0 保留给空槽
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), 'little') or 1
+
+
+class WarmCache:
+    """只读的预热缓存（线程安全：只读 mmap）"""
+
+    def __init__(self, path: str):
+        """映射文件（只读文件头，O(1)）
+
+        Raises:
+            ValueError: 文件格式不对
+        """
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, self.count, self._slots, self._table = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} 不是预热缓存文件")
+        except Exception:
+            self._file.close()
+            raise
+        self._mask = self._slots - 1
+        self.hits = 0
+        self.lookups = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _find(self, key: bytes) -> Optional[int]:
+        """返回记录偏移，不存在时为 None"""
+        h = _hash(key)
+        slot = h & self._mask
+        while True:
+            slot_hash, offset = SLOT.unpack_from(self._mmap, self._table + slot * SLOT.size)
+            if offset == 0:
+                return None
+            if slot_hash == h:
+                key_len = struct.unpack_from('<H', self._mmap, offset)[0]
+                start = offset + RECORD.size
+                if self._mmap[start:start + key_len] == key:
+                    return offset
+            slot = (slot + 1) & self._mask
+
+    def _read(self, offset: int) -> Tuple[bytes, CacheEntry]:
+        key_len, result_len, model_len, version, created = RECORD.unpack_from(self._mmap, offset)
+        start = offset + RECORD.size
+        key = self._mmap[start:start + key_len]
+        start += key_len
+        result = self._mmap[start:start + result_len].decode('utf-8')
+        start += result_len
+        model = self._mmap[start:start + model_len].decode('utf-8')
+        return key, CacheEntry(result, model, version.decode('ascii'), float(created))
+
+    def get(self, text: str, target: str = "en") -> Optional[CacheEntry]:
+        self.lookups += 1
+        offset = self._find(_key(text, target))
+        if offset is None:
+            return None
+        self.hits += 1
+        return self._read(offset)[1]
+
+    def items(self) -> Iterator[Tuple[bytes, CacheEntry]]:
+        """按文件顺序遍历 (键, 记录)"""
+        offset = HEADER.size
+        for _ in range(self.count):
+            key, entry = self._read(offset)
+            yield key, entry
+            key_len, result_len, model_len = RECORD.unpack_from(self._mmap, offset)[:3]
+            offset += RECORD.size + key_len + result_len + model_len
+
+    def trim(self):
+        """让系统收回已读入的映射页（空闲时调用），之后查找时按需重新读入"""
+        if hasattr(self._mmap, 'madvise') and hasattr(mmap, 'MADV_DONTNEED'):
+            self._mmap.madvise(mmap.MADV_DONTNEED)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def stats(self) -> dict:
+        return {
+            "预热条目": self.count,
+            "预热命中": self.hits,
+            "预热文件": f"{os.path.getsize(self.path) / 1024:.0f} KB",
+        }
+
+
+def write(path: str, entries: Dict[bytes, CacheEntry]):
+    """写入预热缓存文件（临时文件 + 原子替换）"""
+    slots = 8
+    while slots < len(entries) * 2:
+        slots *= 2
+    table = bytearray(slots * SLOT.size)
+    records = []
+    offset = HEADER.size
+    for key in sorted(entries):
+        entry = entries[key]
+        result = entry.result.encode('utf-8')
+        model = entry.model.encode('utf-8')[:255]
+        version = entry.prompt_version.encode('ascii')[:8].ljust(8, b'\0')
+        record = RECORD.pack(len(key), len(result), len(model), version, int(entry.created)) + key + result + model
+        h = _hash(key)
+        slot = h & (slots - 1)
+        while SLOT.unpack_from(table, slot * SLOT.size)[1]:
+            slot = (slot + 1) & (slots - 1)
+        SLOT.pack_into(table, slot * SLOT.size, h, offset)
+        records.append(record)
+        offset += len(record)
+    table_offset = (offset + 7) // 8 * 8
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(entries), slots, table_offset))
+        for record in records:
+            f.write(record)
+        f.write(b'\0' * (table_offset - offset))
+        f.write(table)
+    os.replace(path + '.tmp', path)
+
+
+def read_corpus(path: str) -> List[str]:
+    """每行一条短语，去重并保持顺序"""
+    phrases = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                phrases.setdefault(normalize_key(line), None)
+    return list(phrases)
+
+
+def build(corpus: List[str], path: str, translator, targets=None, workers: int = 4,
+          force: bool = False, log=print) -> dict:
+    """增量构建
+
+    Args:
+        corpus: 短语列表
+        path: 输出文件；已存在时沿用其中模型和提示词版本未变的条目
+        translator: Translator（需要 model 属性和 translate(text, target, feature=...)）
+        targets: 翻译目标列表，默认只有主目标
+        force: 忽略已有条目，全部重新翻译
+
+    Returns:
+        统计 {"沿用", "翻译", "失败", "删除"}
+    """
+    targets = targets or translator.targets[:1]
+    model = getattr(translator, 'model', '')
+    previous: Dict[bytes, CacheEntry] = {}
+    if os.path.exists(path) and not force:
+        try:
+            old = WarmCache(path)
+            previous = dict(old.items())
+            old.close()
+        except (OSError, ValueError, struct.error) as e:
+            log(f"[预热缓存] 旧文件无法读取，全部重新翻译: {e}")
+
+    entries: Dict[bytes, CacheEntry] = {}
+    todo = []
+    for target in targets:
+        version = translator.target_version(target)
+        for phrase in corpus:
+            key = _key(phrase, target.name)
+            if len(key) > 0xFFFF:
+                continue
+            entry = previous.get(key)
+            if entry is not None and entry.model == model and entry.prompt_version == version:
+                entries[key] = entry
+            else:
+                todo.append((key, phrase, target, version))
+    stats = {"沿用": len(entries), "翻译": 0, "失败": 0,
+             "删除": len(set(previous) - {item[0] for item in todo} - set(entries))}
+    log(f"[预热缓存] {len(corpus)} 条短语 × {len(targets)} 个目标：沿用 {len(entries)}，需翻译 {len(todo)}")
+
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(translator.translate, phrase, target, feature="prewarm"): (key, phrase, version)
+            for key, phrase, target, version in todo
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            key, phrase, version = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                stats["失败"] += 1
+                log(f"[预热缓存] 失败 {phrase[:20]}: {e}")
+                continue
+            with lock:
+                entries[key] = CacheEntry(result, model, version, time.time())
+                stats["翻译"] += 1
+            if done % 50 == 0:
+                log(f"[预热缓存] {done}/{len(todo)}")
+
+    write(path, entries)
+    log(f"[预热缓存] 写入 {path}：{len(entries)} 条，{os.path.getsize(path) / 1024:.0f} KB")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="批量翻译常用语，生成预热缓存文件")
+    parser.add_argument("corpus", help="短语文件，每行一条")
+    parser.add_argument("-o", "--output", default="cache/warm.bin")
+    parser.add_argument("--targets", help="翻译目标名，逗号分隔（默认主目标）")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="忽略已有条目，全部重新翻译")
+    args = parser.parse_args()
+
+    from translator import Translator
+    translator = Translator()
+    targets = None
+    if args.targets:
+        names = args.targets.split(',')
+        targets = [t for t in translator.targets if t.name in names]
+        if len(targets) != len(names):
+            print(f"未知翻译目标，可用: {', '.join(t.name for t in translator.targets)}")
+            sys.exit(1)
+    stats = build(read_corpus(args.corpus), args.output, translator, targets, args.workers, args.force)
+    print(" | ".join(f"{k} {v}" for k, v in stats.items()))
+    translator.usage.save()
+
+
+if __name__ == "__main__":
+    main()